@@ -0,0 +1,41 @@
+"""add links inserted_at
+
+Revision ID: 349cfe356f04
+Revises: 9f872036daef
+Create Date: 2026-10-17 05:59:42.017933
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '349cfe356f04'
+down_revision: Union[str, Sequence[str], None] = '9f872036daef'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite can't add a column with a non-constant default to a table with
+    # rows, so add it empty, backfill it and then set the default
+    op.add_column('links', sa.Column('inserted_at', sa.DateTime(timezone=True), nullable=True))
+    op.execute('UPDATE links SET inserted_at = created_at')
+    with op.batch_alter_table('links') as batch_op:
+        batch_op.alter_column(
+            'inserted_at',
+            existing_type=sa.DateTime(timezone=True),
+            server_default=sa.text('(CURRENT_TIMESTAMP)'),
+            nullable=False,
+        )
+    op.create_index(op.f('ix_links_inserted_at'), 'links', ['inserted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_links_inserted_at'), table_name='links')
+    with op.batch_alter_table('links') as batch_op:
+        batch_op.drop_column('inserted_at')
@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 from app.api.routes.link import link_router
+from app.api.routes.qr import qr_router
 
 api_router = APIRouter()
 
 api_router.include_router(router=link_router)
+api_router.include_router(router=qr_router)
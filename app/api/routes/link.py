@@ -1,50 +1,99 @@
-from urllib.parse import urlparse
-from fastapi import APIRouter, status, Request
+from typing import Annotated, AsyncIterator, List, Optional, Tuple
+from fastapi import APIRouter, Header, HTTPException, status, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from app.core.config import config
+from app.core.exception import AppException
+from app.core.resolver import host_resolver
 from app.models.response import Response, Status
-from app.models.input import OriginalUrlInput
-from app.services.link import LinkService
-from app.db.init import SessionDep
-from app.services.qr import QrGeneratorService
+from app.models.input import (
+    BatchLinkInput,
+    ExpandLinksInput,
+    PRIVATE_HOST_MESSAGE,
+    OriginalUrlInput,
+    SortIDInput,
+)
+from app.services.link import AsyncLinkService
+from app.services.group_commit import link_group_commit
+from app.db.init import AsyncSessionDep
+from app.services.qr_pool import get_qr, get_qr_many, qr_render_pool
+from app.api.routes.qr import qr_url
 import base64
-from io import BytesIO
-from app.core.rate_limit import rate_limit
+import json
+from app.core.rate_limit import get_identifier, rate_limit
+from app.core.idempotency import idempotency_store
 
 link_router = APIRouter()
 
+# URLs validated, inserted and streamed back per step of a batch request
+BATCH_CHUNK_SIZE = 500
 
-def normalize_url(url: str) -> str:
+
+async def render_qr_base64(data: str) -> str:
     """
-    Normalize a URL by converting scheme and netloc to lowercase and removing trailing slashes.
+    Render a QR code for the given data as a base64-encoded PNG.
+
+    Images are served from the QR image cache when the same data was
+    rendered before, and rendered in the QR render pool otherwise.
 
     Args:
-        url (str): The URL to normalize.
+        data (str): The data to encode in the QR code.
 
     Returns:
-        str: The normalized URL.
+        str: The base64-encoded PNG image.
+
+    Raises:
+        HTTPException: 503 if QR rendering is saturated.
     """
-    parsed = urlparse(url)
-    normalized = parsed._replace(
-        scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower().rstrip("/")
+    png = await get_qr(data)
+    return base64.b64encode(png).decode("utf-8")
+
+
+async def render_qr_base64_many(data: List[str]) -> List[str]:
+    """Render the QR codes of many values as base64-encoded PNGs."""
+    return [
+        base64.b64encode(png).decode("utf-8") for png in await get_qr_many(data)
+    ]
+
+
+def _idempotency_key(request: Request, idempotency_key: str) -> Tuple[str, str]:
+    # Keys are scoped to the client, one client can't replay another's
+    return (get_identifier(request), idempotency_key)
+
+
+def _is_idempotent_replay(request: Request) -> bool:
+    """Whether the request retries an Idempotency-Key stored or running."""
+    idempotency_key = request.headers.get("Idempotency-Key")
+    return idempotency_key is not None and idempotency_store.has(
+        _idempotency_key(request, idempotency_key)
     )
-    return normalized.geturl()
 
 
 @link_router.post("/link", status_code=status.HTTP_200_OK, response_model=Response)
-@rate_limit(times=5, seconds=60)
-def generate_new_link(
+@rate_limit(times=5, seconds=60, exempt=_is_idempotent_replay)
+async def generate_new_link(
     request: Request,
     url: OriginalUrlInput,
-    session: SessionDep,
+    session: AsyncSessionDep,
+    idempotency_key: Annotated[
+        Optional[str], Header(alias="Idempotency-Key", max_length=255)
+    ] = None,
 ) :
     """
     Generate a new short link for the provided original URL.
 
     Validates the input URL, normalizes it, and creates a unique short link
-    stored in the database.
+    stored in the database. The response links the QR code image at
+    `qr_url` and, unless `qr` is false, also inlines it as a base64 PNG.
+    Retries that send the same `Idempotency-Key` header get the first
+    response back without creating anything and don't count against the
+    rate limit.
 
     Args:
-        url (str): The original URL as a query parameter.
-        session (SessionDep): Database session dependency.
+        url (OriginalUrlInput): The original URL and whether to inline the QR code.
+        session (AsyncSessionDep): Async database session dependency.
+        idempotency_key (Optional[str]): Client chosen key of the request.
 
     Returns:
         Response: JSON response with success status and the short link data.
@@ -52,23 +101,232 @@ def generate_new_link(
     Raises:
         ValidationError: If the URL is invalid.
         DbException: If database operations fail.
+        HTTPException: 422 if the host resolves to a private address or the
+            idempotency key was used for another URL, 503 if QR rendering is
+            saturated.
     """
-    # Normalize and create short link
-    normalized_url = normalize_url(str(url.link))
-    link_service = LinkService(session=session)
-    qr_service = QrGeneratorService()
-    new_link = link_service.generate_new_link(original_link=normalized_url)
 
-    # Generate QR code
-    qr_img = qr_service.generate_qr_image(data=new_link)
+    async def create() -> Response:
+        # Failed or timed out lookups give no verdict and don't hard block
+        if await host_resolver.is_private_async(url.host):
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=PRIVATE_HOST_MESSAGE,
+            )
+
+        # Reject before creating anything rather than after
+        if url.qr and qr_render_pool.saturated:
+            raise qr_render_pool.reject()
+
+        # The validated link is already in canonical form
+        new_link = await link_group_commit.create(session, url.link)
+        data = {"link": new_link, "qr_url": qr_url(new_link.rsplit("/", 1)[-1])}
+
+        if url.qr:
+            data["qr"] = await render_qr_base64(new_link)
+
+        return Response(
+            status=Status.success,
+            data=data,
+            message="Successfully generated the link",
+        )
+
+    if idempotency_key is None:
+        return await create()
+
+    # Replays skip the checks in create() along with the work
+    key = _idempotency_key(request, idempotency_key)
+    return await idempotency_store.run(key, (url.link, url.qr), create)
 
-    # Convert image to base64
-    buffer = BytesIO()
-    qr_img.save(buffer, "PNG")
-    qr_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
 
+def validate_links(links: List[str]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    Validate and normalize a list of URLs in one pass.
+
+    Args:
+        links (List[str]): The submitted URLs.
+
+    Returns:
+        List[Tuple[Optional[str], Optional[str]]]: Per URL either the
+            normalized URL and None, or None and the validation message.
+    """
+    results = []
+    for link in links:
+        try:
+            url = OriginalUrlInput(link=link)
+        except ValidationError as e:
+            results.append((None, e.errors()[0]["msg"]))
+            continue
+        if host_resolver.is_private(url.host):
+            results.append((None, PRIVATE_HOST_MESSAGE))
+            continue
+        results.append((url.link, None))
+    return results
+
+
+def _ndjson(line: dict) -> str:
+    return json.dumps(line, separators=(",", ":")) + "\n"
+
+
+async def stream_batch_links(
+    links: List[str], qr: bool, link_service: AsyncLinkService
+) -> AsyncIterator[str]:
+    """
+    Create short links chunk by chunk and yield one NDJSON line per URL.
+
+    Args:
+        links (List[str]): The submitted URLs.
+        qr (bool): Whether to include a base64 PNG QR code per link.
+        link_service (AsyncLinkService): Service bound to the request session.
+
+    Yields:
+        str: NDJSON lines with the index of the URL in the request.
+    """
+    for start in range(0, len(links), BATCH_CHUNK_SIZE):
+        # Validation resolves host names, keep it off the event loop
+        validated = await run_in_threadpool(
+            validate_links, links[start : start + BATCH_CHUNK_SIZE]
+        )
+        valid = [url for url, _ in validated if url is not None]
+        try:
+            short_links = await link_service.generate_new_links(valid)
+        except AppException:
+            yield _ndjson(
+                {
+                    "index": start,
+                    "status": Status.failed.value,
+                    "message": "Failed to generate the links",
+                }
+            )
+            return
+
+        try:
+            qr_codes = await render_qr_base64_many(short_links) if qr else []
+        except HTTPException:
+            yield _ndjson(
+                {
+                    "index": start,
+                    "status": Status.failed.value,
+                    "message": "QR code rendering is overloaded",
+                }
+            )
+            return
+
+        lines = []
+        created = iter(zip(short_links, qr_codes or [None] * len(short_links)))
+        for offset, (url, error) in enumerate(validated):
+            if url is None:
+                line = {
+                    "index": start + offset,
+                    "status": Status.failed.value,
+                    "message": error,
+                }
+            else:
+                short_link, qr_base64 = next(created)
+                line = {
+                    "index": start + offset,
+                    "status": Status.success.value,
+                    "link": short_link,
+                }
+                if qr:
+                    line["qr"] = qr_base64
+            lines.append(_ndjson(line))
+        yield "".join(lines)
+
+
+@link_router.post("/links/batch", status_code=status.HTTP_200_OK)
+@rate_limit(times=5, seconds=60)
+async def generate_new_links(
+    request: Request,
+    batch: BatchLinkInput,
+    session: AsyncSessionDep,
+):
+    """
+    Generate short links for many URLs in one request.
+
+    URLs are validated, inserted with multi-row INSERTs and answered in
+    chunks, so memory stays flat for large batches. Each response line is a
+    JSON object with the `index` of the URL in the request and either the
+    `link` (plus `qr` if requested) or the validation `message`.
+
+    Args:
+        batch (BatchLinkInput): The URLs and whether to render QR codes.
+        session (AsyncSessionDep): Async database session dependency.
+
+    Returns:
+        StreamingResponse: `application/x-ndjson` stream of results.
+    """
+    if batch.qr and qr_render_pool.saturated:
+        raise qr_render_pool.reject()
+
+    link_service = AsyncLinkService(session=session)
+    return StreamingResponse(
+        stream_batch_links(batch.links, batch.qr, link_service),
+        media_type="application/x-ndjson",
+    )
+
+
+def expanded_link(sort_id: str, fields: Optional[dict]) -> dict:
+    """Build the response entry of one short ID of an expand request."""
+    if fields is None:
+        return {"sort_id": sort_id, "status": "not_found"}
+    return {
+        "sort_id": sort_id,
+        "status": "found",
+        "link": f"{config.frontend_url}/{sort_id}",
+        **fields,
+    }
+
+
+@link_router.post(
+    "/links/expand", status_code=status.HTTP_200_OK, response_model=Response
+)
+@rate_limit(times=5, seconds=60)
+async def expand_links(
+    request: Request,
+    expand: ExpandLinksInput,
+    session: AsyncSessionDep,
+):
+    """
+    Resolve many short IDs to their original URLs without counting clicks.
+
+    Links are served from the in-process caches where possible and the
+    rest are read with one query. Each entry of `data.links` matches the
+    short ID at the same position of the request and has a `status` of
+    "found", "not_found" or "invalid".
+
+    Args:
+        expand (ExpandLinksInput): The short IDs and whether to include
+            clicks and timestamps.
+        session (AsyncSessionDep): Async database session dependency.
+
+    Returns:
+        Response: JSON response with one entry per requested short ID.
+
+    Raises:
+        AppException: If the lookup fails.
+    """
+    errors = {}
+    for sort_id in expand.sort_ids:
+        try:
+            SortIDInput(sort_id=sort_id)
+        except ValidationError as e:
+            errors[sort_id] = e.errors()[0]["msg"]
+
+    link_service = AsyncLinkService(session=session)
+    found = await link_service.expand_links(
+        [sort_id for sort_id in expand.sort_ids if sort_id not in errors],
+        metadata=expand.metadata,
+    )
+
+    links = [
+        {"sort_id": sort_id, "status": "invalid", "message": errors[sort_id]}
+        if sort_id in errors
+        else expanded_link(sort_id, found.get(sort_id))
+        for sort_id in expand.sort_ids
+    ]
     return Response(
         status=Status.success,
-        data={"link": new_link, "qr": qr_base64},
-        message="Successfully generated the link",
+        data={"links": links},
+        message=f"Resolved {sum(link['status'] == 'found' for link in links)} links",
     )
@@ -0,0 +1,137 @@
+from typing import Optional
+from fastapi import APIRouter, Query, Request, status
+from fastapi.responses import Response
+from pydantic import ValidationError
+from app.core.config import config
+from app.core.exception import LinkNotFound
+from app.db.init import AsyncSessionDep
+from app.models.input import SortIDInput
+from app.services.link import AsyncLinkService
+from app.services.qr import (
+    MEDIA_TYPES,
+    QrFormat,
+    QrImageCache,
+    QrStyle,
+)
+from app.services.qr_pool import get_qr
+
+qr_router = APIRouter()
+
+# A short ID always encodes the same short link, its image never changes
+QR_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def qr_url(sort_id: str) -> str:
+    """Return the URL of the QR code image of a short ID."""
+    return f"{config.frontend_url}/api/qr/{sort_id}"
+
+
+def qr_etag(data: str, style: QrStyle = QrStyle(), fmt: QrFormat = "png") -> str:
+    """Return the strong ETag of the QR code image of `data` in `style` and `fmt`."""
+    return f'"{QrImageCache.key_digest(data, style, fmt)}"'
+
+
+def negotiate_format(accept: Optional[str]) -> QrFormat:
+    """
+    Pick the image format preferred by an Accept header.
+
+    Args:
+        accept (Optional[str]): The header value.
+
+    Returns:
+        QrFormat: "svg" if the client prefers SVG over PNG, otherwise "png".
+    """
+    quality = {fmt: 0.0 for fmt in MEDIA_TYPES}
+    formats = {media_type: fmt for fmt, media_type in MEDIA_TYPES.items()}
+    for item in (accept or "").split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        if media_type not in formats:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        quality[formats[media_type]] = max(quality[formats[media_type]], q)
+    # Ties and wildcards go to PNG
+    return "svg" if quality["svg"] > quality["png"] else "png"
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag.
+
+    Args:
+        if_none_match (str): The header value, a list of ETags or "*".
+        etag (str): The current ETag of the resource.
+
+    Returns:
+        bool: Whether the client's copy is current.
+    """
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        # If-None-Match uses the weak comparison
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@qr_router.get("/qr/{short_id}", status_code=status.HTTP_200_OK)
+async def get_qr_code(
+    request: Request,
+    short_id: str,
+    session: AsyncSessionDep,
+    fmt: Optional[QrFormat] = Query(default=None, alias="format"),
+):
+    """
+    Return the QR code of a short link as a PNG or SVG image.
+
+    The format is taken from the `format` query parameter, or negotiated
+    from the `Accept` header. The image only depends on the short ID and
+    format, so it is sent with a strong ETag and an immutable
+    `Cache-Control` for browsers and CDNs. Requests with a matching
+    `If-None-Match` get a 304 without any lookup.
+
+    Args:
+        short_id (str): The short ID of the link.
+        session (AsyncSessionDep): Async database session dependency.
+        fmt (Optional[QrFormat]): "png" or "svg", overrides `Accept`.
+
+    Returns:
+        Response: The QR code image, or 304 Not Modified.
+
+    Raises:
+        LinkNotFound: If the short ID is invalid or unknown.
+        HTTPException: 503 if QR rendering is saturated.
+        AppException: If the lookup or rendering fails.
+    """
+    try:
+        SortIDInput(sort_id=short_id)
+    except ValidationError:
+        raise LinkNotFound(f"Link {short_id} not found")
+
+    headers = {"Cache-Control": QR_CACHE_CONTROL}
+    if fmt is None:
+        fmt = negotiate_format(request.headers.get("accept"))
+        headers["Vary"] = "Accept"
+
+    data = f"{config.frontend_url}/{short_id}"
+    etag = qr_etag(data, fmt=fmt)
+    headers["ETag"] = etag
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Doesn't count a click, and is served from memory for recent links
+    found = await AsyncLinkService(session=session).expand_links(
+        [short_id], metadata=False
+    )
+    if short_id not in found:
+        raise LinkNotFound(f"Link {short_id} not found")
+
+    image = await get_qr(data, QrStyle(), fmt)
+    return Response(content=image, media_type=MEDIA_TYPES[fmt], headers=headers)
@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+from typing import Optional, Sequence
+from app.core.config import config
+from app.core.logger import get_logger
+from app.db.init import Database
+from app.services.importer import LinkImporter, read_records
+
+logger = get_logger(__name__)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Bulk import links from a CSV or NDJSON export.
+
+    Usage:
+        python -m app.cli.import_links [--job NAME] [--chunk-size N]
+            [--format csv|ndjson] [--rejects FILE] [--resolve-hosts] FILE
+    """
+    parser = argparse.ArgumentParser(
+        description="Load links from another shortener into the links table."
+    )
+    parser.add_argument(
+        "file",
+        help="CSV with a header or NDJSON, .gz allowed. Columns: original_url "
+        "(or url), optional sort_id, clicks and ISO 8601 created_at.",
+    )
+    parser.add_argument(
+        "--job",
+        help="Checkpoint name, defaults to the absolute input path. Run the "
+        "same job again to resume after the last committed chunk.",
+    )
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    parser.add_argument(
+        "--chunk-size", type=int, default=10_000, help="Records per transaction."
+    )
+    parser.add_argument(
+        "--rejects", help="Append invalid records to this NDJSON file."
+    )
+    parser.add_argument(
+        "--resolve-hosts",
+        action="store_true",
+        help="Resolve every host name like the API does (slow).",
+    )
+    parser.add_argument(
+        "--database-url",
+        default=config.database_url,
+        help="Target database, defaults to DATABASE_URL.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+
+    database = Database(args.database_url, pool_size=1, max_overflow=0)
+    rejects = open(args.rejects, "a", encoding="utf-8") if args.rejects else None
+    importer = LinkImporter(
+        database,
+        job=args.job or os.path.abspath(args.file),
+        chunk_size=args.chunk_size,
+        resolve_hosts=args.resolve_hosts,
+        rejects=rejects,
+    )
+    try:
+        report = importer.run(read_records(args.file, fmt=args.format))
+    except Exception:
+        # Committed chunks stay imported, the job resumes after the last one
+        logger.exception(f"Import failed after {importer.stats['records']} records")
+        print(json.dumps({**importer.stats, "job": importer.job, "failed": True}))
+        return 1
+    finally:
+        if rejects is not None:
+            rejects.close()
+        database.engine.dispose()
+
+    logger.info(
+        f"Import finished: {report['inserted']} inserted, {report['skipped']} "
+        f"skipped, {report['invalid']} invalid, {report['records_per_s']} records/s"
+    )
+    # Imported links reach the next snapshot build via their inserted_at
+    print(json.dumps(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,56 @@
+import argparse
+from typing import Optional, Sequence
+from sqlmodel import Session
+from app.core.logger import get_logger
+from app.db.init import db
+from app.services.access_log import ingest_access_logs
+
+logger = get_logger(__name__)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Apply click counts from CDN/nginx access logs to the links table.
+
+    Usage:
+        python -m app.cli.ingest_logs [--batch-size N] [--cache-status HIT] FILE...
+    """
+    parser = argparse.ArgumentParser(
+        description="Count short ID redirects in access logs as link clicks."
+    )
+    parser.add_argument(
+        "files", nargs="+", help="Access logs in combined format, .gz allowed."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10_000,
+        help="Distinct short IDs per database write.",
+    )
+    parser.add_argument(
+        "--cache-status",
+        default=None,
+        help="Only count lines whose last field equals this cache status, "
+        "e.g. HIT, so requests the origin already counted are skipped.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+
+    with Session(db.engine) as session:
+        totals = ingest_access_logs(
+            session,
+            args.files,
+            batch_size=args.batch_size,
+            cache_status=args.cache_status,
+        )
+    logger.info(
+        f"Ingested {totals['clicks']} clicks from {totals['lines']} lines "
+        f"in {totals['files']} files"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,43 @@
+import argparse
+from typing import Optional, Sequence
+from sqlmodel import Session
+from app.core.config import config
+from app.core.logger import get_logger
+from app.db.init import db
+from app.services.snapshot import build_snapshot
+
+logger = get_logger(__name__)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Build and publish the redirect snapshot shared by the app workers.
+
+    Usage:
+        python -m app.cli.snapshot [--full] [--path PATH]
+    """
+    parser = argparse.ArgumentParser(
+        description="Publish the memory-mapped sort_id -> original_url snapshot."
+    )
+    parser.add_argument(
+        "--path",
+        default=config.redirect_snapshot_path,
+        help="Snapshot file, defaults to REDIRECT_SNAPSHOT_PATH.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Rebuild from every link instead of adding new links only.",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.path:
+        parser.error("--path or REDIRECT_SNAPSHOT_PATH is required")
+
+    with Session(db.engine) as session:
+        build_snapshot(session, args.path, full=args.full)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
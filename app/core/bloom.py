@@ -0,0 +1,72 @@
+import hashlib
+import math
+from typing import Any, Dict
+
+
+class BloomFilter:
+    """
+    Probabilistic set membership filter.
+
+    `key in filter` is False only for keys that were never added, and True
+    for every added key plus a small fraction of false positives bounded by
+    the configured error rate while the filter holds at most `capacity`
+    keys.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Size the filter for `capacity` keys at the target error rate.
+
+        Args:
+            capacity (int): Expected number of keys.
+            error_rate (float): Target false-positive rate. Defaults to 0.001.
+        """
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        """Add `key` to the filter."""
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self._bits)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """Expected false-positive rate for the number of keys added so far."""
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size, load and false-positive figures of the filter."""
+        return {
+            "count": self.count,
+            "capacity": self.capacity,
+            "bits": self.size,
+            "hash_count": self.hash_count,
+            "memory_bytes": self.memory_bytes,
+            "false_positive_rate": self.false_positive_rate,
+        }
@@ -0,0 +1,203 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded in-memory LRU cache with per-entry time-to-live.
+
+    Entries are evicted when they are older than `ttl` seconds or when the
+    cache grows past `max_size` (least recently used first). Hit, miss and
+    eviction counters are kept for monitoring.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of entries. Defaults to 1024.
+            ttl (float): Entry lifetime in seconds. Defaults to 300.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return the cached value for `key` or None if missing or expired.
+
+        Args:
+            key (Hashable): Cache key.
+
+        Returns:
+            Optional[Any]: The cached value, or None.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store `value` under `key`, evicting the oldest entries when full.
+
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Value to cache.
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Remove `key` from the cache if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        # Peeks without counting a hit or miss or refreshing recency
+        with self._lock:
+            entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters of the cache."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+class ByteLRUCache:
+    """
+    Bounded in-memory LRU cache of byte strings with a total size budget.
+
+    Entries are evicted least recently used first once the summed length of
+    the cached values grows past `max_bytes`. A value larger than the whole
+    budget is not cached. Hit, miss and eviction counters are kept for
+    monitoring.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes (int): Byte budget of the cached values. Defaults to 16 MiB.
+        """
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        """
+        Return the cached value for `key` or None if missing.
+
+        Args:
+            key (Hashable): Cache key.
+
+        Returns:
+            Optional[bytes]: The cached value, or None.
+        """
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: bytes) -> None:
+        """
+        Store `value` under `key`, evicting the oldest entries over budget.
+
+        Args:
+            key (Hashable): Cache key.
+            value (bytes): Value to cache.
+        """
+        if len(value) > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(previous)
+            self._data[key] = value
+            self.bytes += len(value)
+            while self.bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters of the cache."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
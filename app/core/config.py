@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import Literal, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -31,6 +32,97 @@ class Config(BaseSettings):
         validation_alias="SITE_KEYWORDS",
         default="url shortener, qr code generator, link shortening, free url shortener, qr codes, url redirect",
     )
+    link_cache_size: int = Field(validation_alias="LINK_CACHE_SIZE", default=1024)
+    link_cache_ttl: float = Field(validation_alias="LINK_CACHE_TTL", default=300.0)
+    link_batch_max: int = Field(validation_alias="LINK_BATCH_MAX", default=5000)
+    link_expand_max: int = Field(validation_alias="LINK_EXPAND_MAX", default=5000)
+    link_dedupe_enabled: bool = Field(
+        validation_alias="LINK_DEDUPE_ENABLED", default=True
+    )
+    idempotency_cache_size: int = Field(
+        validation_alias="IDEMPOTENCY_CACHE_SIZE", default=1024
+    )
+    idempotency_ttl: float = Field(validation_alias="IDEMPOTENCY_TTL", default=3600.0)
+    url_cache_size: int = Field(validation_alias="URL_CACHE_SIZE", default=4096)
+    url_normalize_escapes: bool = Field(
+        validation_alias="URL_NORMALIZE_ESCAPES", default=True
+    )
+    url_strip_params: str = Field(validation_alias="URL_STRIP_PARAMS", default="")
+    dns_cache_size: int = Field(validation_alias="DNS_CACHE_SIZE", default=4096)
+    dns_cache_ttl: float = Field(validation_alias="DNS_CACHE_TTL", default=300.0)
+    dns_timeout: float = Field(validation_alias="DNS_TIMEOUT", default=1.0)
+    dns_max_concurrency: int = Field(
+        validation_alias="DNS_MAX_CONCURRENCY", default=8
+    )
+    link_group_commit_enabled: bool = Field(
+        validation_alias="LINK_GROUP_COMMIT_ENABLED", default=False
+    )
+    link_group_commit_window: float = Field(
+        validation_alias="LINK_GROUP_COMMIT_WINDOW", default=0.005
+    )
+    link_group_commit_max: int = Field(
+        validation_alias="LINK_GROUP_COMMIT_MAX", default=100
+    )
+    link_log_dir: Optional[str] = Field(validation_alias="LINK_LOG_DIR", default=None)
+    link_log_drain_interval: float = Field(
+        validation_alias="LINK_LOG_DRAIN_INTERVAL", default=1.0
+    )
+    link_log_drain_batch: int = Field(
+        validation_alias="LINK_LOG_DRAIN_BATCH", default=1000
+    )
+    qr_cache_bytes: int = Field(
+        validation_alias="QR_CACHE_BYTES", default=16 * 1024 * 1024
+    )
+    qr_matrix_cache_bytes: int = Field(
+        validation_alias="QR_MATRIX_CACHE_BYTES", default=4 * 1024 * 1024
+    )
+    qr_cache_dir: Optional[str] = Field(validation_alias="QR_CACHE_DIR", default=None)
+    qr_render_workers: int = Field(validation_alias="QR_RENDER_WORKERS", default=0)
+    qr_render_max_pending: int = Field(
+        validation_alias="QR_RENDER_MAX_PENDING", default=64
+    )
+    short_id_key: Optional[str] = Field(validation_alias="SHORT_ID_KEY", default=None)
+    short_id_block_size: int = Field(
+        validation_alias="SHORT_ID_BLOCK_SIZE", default=1000
+    )
+    click_write_mode: Literal["sync", "batched", "sharded"] = Field(
+        validation_alias="CLICK_WRITE_MODE", default="sync"
+    )
+    click_flush_interval: float = Field(
+        validation_alias="CLICK_FLUSH_INTERVAL", default=5.0
+    )
+    click_buffer_max: int = Field(validation_alias="CLICK_BUFFER_MAX", default=10_000)
+    click_shard_count: int = Field(validation_alias="CLICK_SHARD_COUNT", default=16)
+    click_reconcile_interval: float = Field(
+        validation_alias="CLICK_RECONCILE_INTERVAL", default=30.0
+    )
+    redirect_snapshot_path: Optional[str] = Field(
+        validation_alias="REDIRECT_SNAPSHOT_PATH", default=None
+    )
+    redirect_snapshot_reload_interval: float = Field(
+        validation_alias="REDIRECT_SNAPSHOT_RELOAD_INTERVAL", default=10.0
+    )
+    redirect_status_code: Literal["301", "302", "307"] = Field(
+        validation_alias="REDIRECT_STATUS_CODE", default="301"
+    )
+    redirect_max_age: Optional[int] = Field(
+        validation_alias="REDIRECT_MAX_AGE", default=None
+    )
+    redirect_s_maxage: Optional[int] = Field(
+        validation_alias="REDIRECT_S_MAXAGE", default=None
+    )
+    fast_redirect_enabled: bool = Field(
+        validation_alias="FAST_REDIRECT_ENABLED", default=False
+    )
+    link_filter_enabled: bool = Field(
+        validation_alias="LINK_FILTER_ENABLED", default=False
+    )
+    link_filter_error_rate: float = Field(
+        validation_alias="LINK_FILTER_ERROR_RATE", default=0.001
+    )
+    link_filter_refresh_interval: float = Field(
+        validation_alias="LINK_FILTER_REFRESH_INTERVAL", default=5.0
+    )
 
 
 config = Config()
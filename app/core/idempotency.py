@@ -0,0 +1,112 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+from fastapi import HTTPException, status
+from app.core.cache import TTLCache
+from app.core.config import config
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class IdempotencyStore:
+    """
+    Replays the result of a request for every retry with the same key.
+
+    Successful results are kept in a bounded TTL cache, together with a
+    fingerprint of the request that produced them. Requests that arrive
+    while the first one with their key is still running wait for it
+    instead of doing the work again. Failures are not stored, a retry
+    after an error runs again. The store is per process.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600.0):
+        """
+        Initialize the store.
+
+        Args:
+            max_size (int): Maximum number of stored results.
+            ttl (float): How long a result is replayed, in seconds.
+        """
+        self.results = TTLCache(max_size=max_size, ttl=ttl)
+        self._inflight: Dict[Hashable, Tuple[Hashable, asyncio.Future]] = {}
+        self.replayed = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def _check_fingerprint(stored: Hashable, fingerprint: Hashable) -> None:
+        if stored != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail="Idempotency-Key was already used with a different request",
+            )
+
+    def has(self, key: Hashable) -> bool:
+        """Whether a request with `key` would be replayed or wait for one."""
+        return key in self._inflight or key in self.results
+
+    async def run(
+        self,
+        key: Hashable,
+        fingerprint: Hashable,
+        func: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Run `func` once per key and return its result to every caller.
+
+        Args:
+            key (Hashable): Idempotency key, scoped to the client.
+            fingerprint (Hashable): Identifies the request payload, a key
+                reused with another payload is rejected.
+            func (Callable[[], Awaitable[Any]]): Does the actual work.
+
+        Returns:
+            Any: The result of the first successful call for this key.
+
+        Raises:
+            HTTPException: 422 if the key was used with another payload.
+        """
+        entry = self.results.get(key)
+        if entry is not None:
+            self._check_fingerprint(entry[0], fingerprint)
+            self.replayed += 1
+            return entry[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._check_fingerprint(inflight[0], fingerprint)
+            self.coalesced += 1
+            # Shielded, a cancelled waiter must not cancel the shared work
+            return await asyncio.shield(inflight[1])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (fingerprint, future)
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark it retrieved, there may be nobody waiting for it
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        self.results.set(key, (fingerprint, result))
+        future.set_result(result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the result cache figures and the replay counters."""
+        return {
+            "results": self.results.stats(),
+            "inflight": len(self._inflight),
+            "replayed": self.replayed,
+            "coalesced": self.coalesced,
+        }
+
+
+idempotency_store = IdempotencyStore(
+    max_size=config.idempotency_cache_size, ttl=config.idempotency_ttl
+)
@@ -0,0 +1,50 @@
+from bisect import bisect_left
+from threading import Lock
+from typing import Any, Dict, Sequence
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of observed values.
+
+    Each bucket counts the values up to and including its bound that are
+    above the previous bound. Values above the last bound land in "+Inf".
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Initialize the histogram.
+
+        Args:
+            buckets (Sequence[float]): Upper bounds of the buckets.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._lock = Lock()
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one value."""
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def reset(self) -> None:
+        """Forget every observation."""
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.sum = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the count, sum, mean and per-bucket counts."""
+        with self._lock:
+            labels = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+            return {
+                "count": self.count,
+                "sum": self.sum,
+                "mean": self.sum / self.count if self.count else 0.0,
+                "buckets": dict(zip(labels, self._counts)),
+            }
@@ -1,6 +1,7 @@
+import inspect
 import time
 from functools import wraps
-from typing import Callable, Any, Dict, List
+from typing import Callable, Any, Dict, List, Optional
 from fastapi import Request, HTTPException, status
 from app.core.logger import get_logger
 
@@ -18,13 +19,18 @@ def get_identifier(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-def rate_limit(times: int, seconds: int):
+def rate_limit(
+    times: int,
+    seconds: int,
+    exempt: Optional[Callable[[Request], bool]] = None,
+):
     """
     Decorator for rate limiting endpoints using in-memory storage.
     
     Args:
         times: Number of allowed requests
         seconds: Time window in seconds
+        exempt: Requests it returns True for are neither counted nor limited
     
     Usage:
         @app.post("/login")
@@ -33,69 +39,19 @@ def rate_limit(times: int, seconds: int):
             pass
     """
     def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                _check_rate_limit(func, args, kwargs, times, seconds, exempt)
+                return await func(*args, **kwargs)
+
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            # Find the Request object
-            request = None
-            
-            # Check in kwargs first
-            if "request" in kwargs:
-                request = kwargs["request"]
-            else:
-                # Check in positional args
-                for arg in args:
-                    if isinstance(arg, Request):
-                        request = arg
-                        break
-            
-            if not request:
-                raise ValueError(
-                    f"Request object not found in {func.__name__}. "
-                    "Make sure to include 'request: Request' parameter."
-                )
-            
-            # Get client identifier
-            identifier = get_identifier(request)
-            
-            # Create a unique key for this endpoint and client
-            key = f"{func.__name__}:{identifier}"
-            
-            # Get current timestamp
-            now = time.time()
-            
-            # Initialize storage for this key if needed
-            if key not in _rate_limit_storage:
-                _rate_limit_storage[key] = []
-            
-            # Get timestamps for this key
-            timestamps = _rate_limit_storage[key]
-            
-            # Remove timestamps older than the time window
-            timestamps[:] = [t for t in timestamps if now - t < seconds]
-            
-            # Check if limit exceeded
-            if len(timestamps) >= times:
-                # Calculate retry-after time
-                oldest_timestamp = timestamps[0]
-                retry_after = int(seconds - (now - oldest_timestamp)) + 1
-                
-                raise HTTPException(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    detail={
-                        "error": "Rate limit exceeded",
-                        "message": f"Too many requests. Try again in {retry_after} seconds.",
-                        "retry_after": retry_after
-                    },
-                    headers={"Retry-After": str(retry_after)}
-                )
-            
-            # Add current timestamp
-            timestamps.append(now)
-            
-            # Cleanup old keys periodically (every 100 requests)
-            if len(_rate_limit_storage) % 100 == 0:
-                _cleanup_old_entries(seconds)
-            
+            _check_rate_limit(func, args, kwargs, times, seconds, exempt)
+
             # Call the original function (no await)
             return func(*args, **kwargs)
         
@@ -103,6 +59,80 @@ def rate_limit(times: int, seconds: int):
     return decorator
 
 
+def _check_rate_limit(
+    func: Callable[..., Any],
+    args: tuple,
+    kwargs: Dict[str, Any],
+    times: int,
+    seconds: int,
+    exempt: Optional[Callable[[Request], bool]] = None,
+) -> None:
+    """Record a call to `func` and raise 429 if the client exceeded the limit."""
+    # Find the Request object
+    request = None
+    
+    # Check in kwargs first
+    if "request" in kwargs:
+        request = kwargs["request"]
+    else:
+        # Check in positional args
+        for arg in args:
+            if isinstance(arg, Request):
+                request = arg
+                break
+    
+    if not request:
+        raise ValueError(
+            f"Request object not found in {func.__name__}. "
+            "Make sure to include 'request: Request' parameter."
+        )
+
+    if exempt is not None and exempt(request):
+        return
+    
+    # Get client identifier
+    identifier = get_identifier(request)
+    
+    # Create a unique key for this endpoint and client
+    key = f"{func.__name__}:{identifier}"
+    
+    # Get current timestamp
+    now = time.time()
+    
+    # Initialize storage for this key if needed
+    if key not in _rate_limit_storage:
+        _rate_limit_storage[key] = []
+    
+    # Get timestamps for this key
+    timestamps = _rate_limit_storage[key]
+    
+    # Remove timestamps older than the time window
+    timestamps[:] = [t for t in timestamps if now - t < seconds]
+    
+    # Check if limit exceeded
+    if len(timestamps) >= times:
+        # Calculate retry-after time
+        oldest_timestamp = timestamps[0]
+        retry_after = int(seconds - (now - oldest_timestamp)) + 1
+        
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail={
+                "error": "Rate limit exceeded",
+                "message": f"Too many requests. Try again in {retry_after} seconds.",
+                "retry_after": retry_after
+            },
+            headers={"Retry-After": str(retry_after)}
+        )
+    
+    # Add current timestamp
+    timestamps.append(now)
+    
+    # Cleanup old keys periodically (every 100 requests)
+    if len(_rate_limit_storage) % 100 == 0:
+        _cleanup_old_entries(seconds)
+
+
 def _cleanup_old_entries(window: int):
     """Remove entries that are completely expired."""
     now = time.time()
@@ -0,0 +1,164 @@
+import asyncio
+import ipaddress
+import socket
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import RLock
+from typing import Any, Dict, Optional
+from app.core.cache import TTLCache
+from app.core.config import config
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _is_private_address(address: str) -> bool:
+    # Link-local IPv6 addresses come back with a "%interface" suffix
+    return ipaddress.ip_address(address.split("%", 1)[0]).is_private
+
+
+class HostResolver:
+    """
+    Cached, timeout-bounded check of whether a hostname resolves privately.
+
+    Verdicts are cached per hostname for `ttl` seconds. Lookups run on a
+    bounded thread pool, concurrent checks of the same hostname share one
+    lookup, and callers wait at most `timeout` seconds. A lookup that
+    finishes after its caller gave up still fills the cache.
+    """
+
+    def __init__(
+        self,
+        cache_size: int = 4096,
+        ttl: float = 300.0,
+        timeout: float = 1.0,
+        max_concurrency: int = 8,
+    ):
+        """
+        Initialize the resolver.
+
+        Args:
+            cache_size (int): Maximum number of cached verdicts.
+            ttl (float): Verdict lifetime in seconds.
+            timeout (float): Longest a caller waits for a lookup, in seconds.
+            max_concurrency (int): Lookups running at the same time.
+        """
+        self.timeout = timeout
+        self.cache = TTLCache(max_size=cache_size, ttl=ttl)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="dns"
+        )
+        self._pending: Dict[str, Future] = {}
+        # Re-entrant: a finished future runs its done callback right away
+        self._lock = RLock()
+        self.lookups = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.private = 0
+
+    def _lookup(self, host: str) -> Optional[bool]:
+        try:
+            infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+        except (OSError, UnicodeError) as e:
+            with self._lock:
+                self.errors += 1
+            logger.debug(f"DNS lookup of {host} failed: {e}")
+            return None
+
+        # Any private address is enough to reach an internal service
+        verdict = any(_is_private_address(info[4][0]) for info in infos)
+        self.cache.set(host, verdict)
+        return verdict
+
+    def _forget(self, host: str) -> None:
+        with self._lock:
+            self._pending.pop(host, None)
+
+    def is_private(self, host: str) -> Optional[bool]:
+        """
+        Check whether `host` is or resolves to a private address.
+
+        Blocks the calling thread for up to `timeout` seconds, async code
+        uses `is_private_async`.
+
+        Args:
+            host (str): Hostname or IP literal.
+
+        Returns:
+            Optional[bool]: The verdict, or None if the lookup failed or did
+                not finish within the timeout.
+        """
+        try:
+            verdict = _is_private_address(host)
+        except ValueError:
+            verdict = self.cache.get(host)
+            if verdict is None:
+                try:
+                    verdict = self._submit(host).result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    self._timed_out(host)
+
+        return self._count(verdict)
+
+    async def is_private_async(self, host: str) -> Optional[bool]:
+        """Async variant of `is_private`, waits without blocking the loop."""
+        try:
+            verdict = _is_private_address(host)
+        except ValueError:
+            verdict = self.cache.get(host)
+            if verdict is None:
+                future = asyncio.wrap_future(self._submit(host))
+                try:
+                    # Shielded, so the lookup still fills the cache
+                    verdict = await asyncio.wait_for(
+                        asyncio.shield(future), self.timeout
+                    )
+                except asyncio.TimeoutError:
+                    self._timed_out(host)
+
+        return self._count(verdict)
+
+    def _count(self, verdict: Optional[bool]) -> Optional[bool]:
+        if verdict:
+            with self._lock:
+                self.private += 1
+        return verdict
+
+    def _submit(self, host: str) -> Future:
+        with self._lock:
+            future = self._pending.get(host)
+            if future is None:
+                self.lookups += 1
+                future = self._executor.submit(self._lookup, host)
+                self._pending[host] = future
+                future.add_done_callback(lambda _: self._forget(host))
+            else:
+                self.coalesced += 1
+        return future
+
+    def _timed_out(self, host: str) -> None:
+        with self._lock:
+            self.timeouts += 1
+        logger.warning(f"DNS lookup of {host} timed out after {self.timeout}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the cache figures and the lookup counters."""
+        with self._lock:
+            return {
+                "cache": self.cache.stats(),
+                "pending": len(self._pending),
+                "lookups": self.lookups,
+                "coalesced": self.coalesced,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "private": self.private,
+            }
+
+
+host_resolver = HostResolver(
+    cache_size=config.dns_cache_size,
+    ttl=config.dns_cache_ttl,
+    timeout=config.dns_timeout,
+    max_concurrency=config.dns_max_concurrency,
+)
@@ -0,0 +1,89 @@
+from threading import Event, Thread
+from typing import Callable, Optional
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class PeriodicTask:
+    """
+    Run a function periodically on a background daemon thread.
+
+    The function runs every `interval` seconds, or earlier when `trigger()`
+    is called. `stop()` wakes the thread, waits for it and runs the function
+    one final time so pending work is not lost on shutdown.
+    """
+
+    def __init__(self, name: str, interval: float, func: Callable[[], None]):
+        """
+        Initialize the periodic task.
+
+        Args:
+            name (str): Thread name, used in logs.
+            interval (float): Seconds between two runs.
+            func (Callable[[], None]): Function to run.
+        """
+        self.name = name
+        self.interval = interval
+        self._func = func
+        self._wake = Event()
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background thread if it is not running yet."""
+        if self.running:
+            return
+
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info(f"Started periodic task {self.name} every {self.interval}s")
+
+    def trigger(self) -> None:
+        """Run the function as soon as possible instead of waiting."""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the background thread and run the function a last time.
+
+        If the thread is still busy after `timeout`, the final run is
+        skipped rather than run concurrently with the one in progress.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for the thread.
+        """
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive():
+            logger.warning(
+                f"Periodic task {self.name} still running after {timeout}s, "
+                f"skipping the final run"
+            )
+            return
+        self._thread = None
+        self._run_once()
+        logger.info(f"Stopped periodic task {self.name}")
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            self._run_once()
+
+    def _run_once(self) -> None:
+        try:
+            self._func()
+        except Exception:
+            logger.error(f"Periodic task {self.name} failed", exc_info=True)
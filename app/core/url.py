@@ -0,0 +1,144 @@
+import hashlib
+import re
+from functools import lru_cache
+from typing import FrozenSet, NamedTuple, Optional, Tuple
+from pydantic import AnyHttpUrl, TypeAdapter, ValidationError
+from app.core.config import config
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# RFC 3986 unreserved characters, percent-encoding them changes nothing
+UNRESERVED = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~"
+)
+_ESCAPE = re.compile(r"%([0-9A-Fa-f]{2})")
+
+_http_url = TypeAdapter(AnyHttpUrl)
+
+
+class CanonicalUrl(NamedTuple):
+    """Canonical form of a URL with the parts validation looks at."""
+
+    url: str
+    scheme: str
+    host: str
+    port: Optional[int]
+
+
+def _unescape(match: "re.Match[str]") -> str:
+    char = chr(int(match.group(1), 16))
+    return char if char in UNRESERVED else "%" + match.group(1).upper()
+
+
+def normalize_escapes(value: str) -> str:
+    """Decode escaped unreserved characters and uppercase the other escapes."""
+    return _ESCAPE.sub(_unescape, value) if "%" in value else value
+
+
+def parse_param_rules(value: str) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+    """
+    Split a comma separated list of query parameter names.
+
+    Args:
+        value (str): Names such as "fbclid,gclid,utm_*". A trailing `*`
+            matches every name starting with the rest.
+
+    Returns:
+        Tuple[FrozenSet[str], Tuple[str, ...]]: Exact names and prefixes.
+    """
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    exact = frozenset(name for name in names if not name.endswith("*"))
+    prefixes = tuple(name[:-1] for name in names if name.endswith("*"))
+    return exact, prefixes
+
+
+_strip_exact, _strip_prefixes = parse_param_rules(config.url_strip_params)
+
+
+def strip_params(query: str) -> str:
+    """Remove the configured tracking parameters from a query string."""
+    if not (_strip_exact or _strip_prefixes):
+        return query
+
+    kept = []
+    for part in query.split("&"):
+        name = part.split("=", 1)[0]
+        if name in _strip_exact or (_strip_prefixes and name.startswith(_strip_prefixes)):
+            continue
+        kept.append(part)
+    return "&".join(kept)
+
+
+@lru_cache(maxsize=config.url_cache_size)
+def canonicalize_url(url: str) -> CanonicalUrl:
+    """
+    Parse and canonicalize an http(s) URL in one pass.
+
+    The URL is parsed once. Scheme and host are lowercased, the host is
+    IDNA encoded, dot segments and default ports are removed, then escapes
+    are normalized and tracking parameters stripped as configured. Results
+    are memoized, repeated URLs skip all of it.
+
+    Args:
+        url (str): The submitted URL.
+
+    Returns:
+        CanonicalUrl: The canonical URL and its parts.
+
+    Raises:
+        ValueError: If the URL is not a valid http(s) URL.
+    """
+    try:
+        parsed = _http_url.validate_python(url)
+    except ValidationError as e:
+        raise ValueError(e.errors()[0]["msg"]) from None
+
+    scheme, host = parsed.scheme, parsed.host or ""
+    port = parsed.port if parsed.port != DEFAULT_PORTS.get(scheme) else None
+
+    netloc = host if port is None else f"{host}:{port}"
+    if parsed.username or parsed.password:
+        userinfo = parsed.username or ""
+        if parsed.password:
+            userinfo += ":" + parsed.password
+        netloc = f"{userinfo}@{netloc}"
+
+    path = parsed.path or "/"
+    query = parsed.query or ""
+    if config.url_normalize_escapes:
+        path = normalize_escapes(path)
+        query = normalize_escapes(query)
+    query = strip_params(query) if query else query
+
+    canonical = f"{scheme}://{netloc}{path}"
+    if query:
+        canonical += "?" + query
+    if parsed.fragment is not None:
+        canonical += "#" + parsed.fragment
+    return CanonicalUrl(url=canonical, scheme=scheme, host=host, port=port)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Return the canonical form of a URL.
+
+    Args:
+        url (str): The URL to normalize.
+
+    Returns:
+        str: The canonical URL.
+    """
+    return canonicalize_url(url).url
+
+
+def url_hash(original_url: str) -> str:
+    """
+    Return the fixed-width digest stored in `Links.url_hash`.
+
+    Args:
+        original_url (str): The normalized original URL.
+
+    Returns:
+        str: Hex encoded SHA-256 of the URL.
+    """
+    return hashlib.sha256(original_url.encode("utf-8")).hexdigest()
@@ -1,9 +1,12 @@
 from sqlmodel import create_engine,  Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
 from fastapi import Depends
 from app.core.logger import get_logger
 from app.core.config import config
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import SQLAlchemyError
-from typing import Generator, Annotated
+from typing import AsyncGenerator, Generator, Annotated
 
 logger = get_logger(__name__)
 URL = config.database_url
@@ -25,6 +28,12 @@ class Database:
         self, pool_size: int, max_overflow: int, pool_recycle: int, echo: bool
     ):
         try:
+            # Send executemany UPDATEs (batched click flushes) in pages
+            dialect_kwargs = (
+                {"executemany_mode": "values_plus_batch"}
+                if make_url(self.url).get_driver_name() == "psycopg2"
+                else {}
+            )
             engine = create_engine(
                 self.url,
                 echo=echo,
@@ -32,6 +41,7 @@ class Database:
                 pool_recycle=pool_recycle,
                 pool_size=pool_size,
                 max_overflow=max_overflow,
+                **dialect_kwargs,
             )
             return engine
         except Exception:
@@ -49,7 +59,70 @@ class Database:
             db.close()
 
 
+def to_async_url(url: str) -> str:
+    """
+    Map a sync database URL to the matching async driver.
+
+    PostgreSQL URLs use asyncpg and SQLite URLs use aiosqlite, other URLs
+    are returned unchanged.
+
+    Args:
+        url (str): The sync database URL.
+
+    Returns:
+        str: The async database URL.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+class AsyncDatabase:
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = 10,
+        max_overflow: int = 20,
+        pool_recycle: int = 1800,
+        echo: bool = False,
+    ):
+        self.url = to_async_url(url)
+        self.engine = self._create_engine(pool_size, max_overflow, pool_recycle, echo)
+
+    def _create_engine(
+        self, pool_size: int, max_overflow: int, pool_recycle: int, echo: bool
+    ):
+        try:
+            engine = create_async_engine(
+                self.url,
+                echo=echo,
+                pool_pre_ping=True,
+                pool_recycle=pool_recycle,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+            )
+            return engine
+        except Exception:
+            raise
+
+    async def session(self) -> AsyncGenerator[AsyncSession, None]:
+        db = AsyncSession(self.engine)
+        try:
+            yield db
+        except SQLAlchemyError:
+            await db.rollback()
+            raise
+
+        finally:
+            await db.close()
+
+
 db = Database(url=URL)
+async_db = AsyncDatabase(url=URL)
 
 
 def get_session() -> Generator[Session, None, None]:
@@ -57,3 +130,11 @@ def get_session() -> Generator[Session, None, None]:
 
 
 SessionDep = Annotated[Session, Depends(get_session)]
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    async for session in async_db.session():
+        yield session
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
@@ -10,6 +10,7 @@ class TimestampMixin:
         sa_type=sa.DateTime(timezone=True),
         sa_column_kwargs={"server_default": sa.func.now()},
         nullable=False,
+        index=True,
     )
 
     updated_at: datetime | None = Field(
@@ -23,7 +24,55 @@ class Links(TimestampMixin, SQLModel, table=True):
     id: UUID = Field(default_factory=uuid4, primary_key=True, nullable=False)
     original_url: str = Field(sa_type=sa.String(), nullable=False)
     sort_id: str = Field(sa_type=sa.String(), index=True, nullable=False, unique=True)
+    url_hash: str | None = Field(
+        default=None, sa_type=sa.String(64), index=True, nullable=True
+    )
     clicks: int = Field(default=0, nullable=False)
     last_accessed_at: datetime | None = Field(
         default=None, sa_type=sa.DateTime(timezone=True), nullable=True
     )
+    # Assigned by the database on insert and never written by the app,
+    # unlike created_at which imports and the link log back-date
+    inserted_at: datetime | None = Field(
+        default=None,
+        sa_type=sa.DateTime(timezone=True),
+        sa_column_kwargs={"server_default": sa.func.now()},
+        nullable=False,
+        index=True,
+    )
+
+
+class LinkClickShards(SQLModel, table=True):
+    __tablename__ = "link_click_shards"
+
+    sort_id: str = Field(
+        sa_type=sa.String(),
+        foreign_key="links.sort_id",
+        ondelete="CASCADE",
+        primary_key=True,
+    )
+    shard: int = Field(primary_key=True)
+    clicks: int = Field(default=0, nullable=False)
+    last_accessed_at: datetime | None = Field(
+        default=None, sa_type=sa.DateTime(timezone=True), nullable=True
+    )
+
+
+class IdBlocks(SQLModel, table=True):
+    __tablename__ = "id_blocks"
+
+    name: str = Field(sa_type=sa.String(), primary_key=True)
+    next_value: int = Field(sa_type=sa.BigInteger(), default=0, nullable=False)
+
+
+class ImportCheckpoints(SQLModel, table=True):
+    __tablename__ = "import_checkpoints"
+
+    name: str = Field(sa_type=sa.String(), primary_key=True)
+    position: int = Field(sa_type=sa.BigInteger(), default=0, nullable=False)
+    inserted: int = Field(sa_type=sa.BigInteger(), default=0, nullable=False)
+    updated_at: datetime | None = Field(
+        default=None,
+        sa_type=sa.DateTime(timezone=True),
+        sa_column_kwargs={"onupdate": sa.func.now(), "server_default": sa.func.now()},
+    )
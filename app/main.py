@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import FastAPI, Request, status
 from fastapi.staticfiles import StaticFiles
@@ -7,6 +8,13 @@ from app.core.config import config
 from app.core.logger import get_logger
 from app.api.router import api_router
 from app.web.router import web_router
+from app.web.fast_redirect import FastRedirectMiddleware
+from app.services.clicks import click_flusher, shard_reconciler
+from app.services.link_filter import link_filter_refresher, refresh_link_filter
+from app.services.snapshot import redirect_snapshot, snapshot_reloader
+from app.services.link_log import link_log, link_log_drainer
+from app.services.qr_pool import qr_render_pool
+from starlette.concurrency import run_in_threadpool
 
 from app.core.exception import (
     DbException,
@@ -19,6 +27,47 @@ from app.core.exception import (
 
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start background workers on startup and flush them on shutdown.
+
+    Args:
+        app (FastAPI): The application instance.
+    """
+    if config.click_write_mode == "batched":
+        click_flusher.start()
+    elif config.click_write_mode == "sharded":
+        shard_reconciler.start()
+
+    if config.link_filter_enabled:
+        await run_in_threadpool(refresh_link_filter)
+        link_filter_refresher.start()
+
+    if config.redirect_snapshot_path:
+        await run_in_threadpool(redirect_snapshot.reload)
+        snapshot_reloader.start()
+
+    if config.link_log_dir:
+        await run_in_threadpool(link_log.open)
+        link_log_drainer.start()
+
+    qr_render_pool.start()
+
+    yield
+
+    click_flusher.stop()
+    shard_reconciler.stop()
+    link_filter_refresher.stop()
+    snapshot_reloader.stop()
+    # The final drain runs in stop(), whatever it leaves stays on disk
+    link_log_drainer.stop()
+    link_log.close()
+    # Waits for running renders, keep the event loop free meanwhile
+    await run_in_threadpool(qr_render_pool.shutdown)
+
+
 app = FastAPI(
     title="Shorty",
     version="0.0.1",
@@ -26,11 +75,16 @@ app = FastAPI(
     docs_url=None if config.env == "production" else "/docs",
     redoc_url=None if config.env == "production" else "/redoc",
     openapi_url=None if config.env == "production" else "/openapi.json",
+    lifespan=lifespan,
 )
 
 
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
+# serve well-formed short IDs before routing and dependency injection
+if config.fast_redirect_enabled:
+    app.add_middleware(FastRedirectMiddleware)
+
 # register the exceptions
 app.add_exception_handler(DbException, db_exception_handler)
 app.add_exception_handler(AppException, app_exception_handler)
@@ -1,8 +1,19 @@
-from app.core.pydantic import CustomBaseModel
-from pydantic import field_validator, AnyHttpUrl
-from urllib.parse import urlparse
 import ipaddress
-import socket
+from app.core.pydantic import CustomBaseModel
+from app.core.config import config
+from app.core.url import canonicalize_url
+from pydantic import field_validator
+from typing import List
+from urllib.parse import urlsplit
+
+PRIVATE_HOST_MESSAGE = "Private IP addresses are not allowed"
+
+
+def _is_private_ip(host: str) -> bool:
+    try:
+        return ipaddress.ip_address(host).is_private
+    except ValueError:
+        return False
 
 
 class SortIDInput(CustomBaseModel):
@@ -26,33 +37,68 @@ class SortIDInput(CustomBaseModel):
 
 
 class OriginalUrlInput(CustomBaseModel):
-    link: AnyHttpUrl
+    link: str
+    qr: bool = True
 
-    @field_validator("link")
+    @field_validator("link", mode="before")
     def check_link(cls, v, info):
-        parsed = urlparse(str(v))
+        if not isinstance(v, str):
+            raise ValueError(f"{info.field_name} must be of type string")
 
-        # Scheme check
-        if parsed.scheme not in {"http", "https"}:
-            raise ValueError("Only http and https URLs are allowed")
+        # One parse gives the canonical URL and the parts checked below,
+        # only http and https URLs get through it
+        url = canonicalize_url(v)
 
         # Block localhost
-        if parsed.hostname in {"localhost"}:
+        if url.host in {"localhost"}:
             raise ValueError("Localhost URLs are not allowed")
 
-        # Block private IPs
-        try:
-            ip = socket.gethostbyname(parsed.hostname)
-            if ipaddress.ip_address(ip).is_private:
-                raise ValueError("Private IP addresses are not allowed")
-        except Exception:
-            pass  # DNS resolution may fail — don't hard block
+        # Block private IP literals. Hostnames that resolve to one are
+        # checked by the callers, a DNS lookup here would block the loop
+        if _is_private_ip(url.host.strip("[]")):
+            raise ValueError(PRIVATE_HOST_MESSAGE)
 
         # Length check
-        if len(str(v)) > 2048:
+        if len(url.url) > 2048:
             raise ValueError("URL is too long")
 
+        return url.url
+
+    @property
+    def host(self) -> str:
+        """Host of the link, IPv6 addresses without brackets."""
+        return urlsplit(self.link).hostname or ""
+
+
+class BatchLinkInput(CustomBaseModel):
+    links: List[str]
+    qr: bool = False
+
+    @field_validator("links")
+    def check_links(cls, v, info):
+        if not v:
+            raise ValueError(f"{info.field_name} can not be empty")
+
+        if len(v) > config.link_batch_max:
+            raise ValueError(
+                f"{info.field_name} can hold at most {config.link_batch_max} URLs"
+            )
+
         return v
 
 
+class ExpandLinksInput(CustomBaseModel):
+    sort_ids: List[str]
+    metadata: bool = True
 
+    @field_validator("sort_ids")
+    def check_sort_ids(cls, v, info):
+        if not v:
+            raise ValueError(f"{info.field_name} can not be empty")
+
+        if len(v) > config.link_expand_max:
+            raise ValueError(
+                f"{info.field_name} can hold at most {config.link_expand_max} IDs"
+            )
+
+        return v
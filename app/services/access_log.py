@@ -0,0 +1,151 @@
+import gzip
+import re
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from sqlmodel import Session
+from app.core.logger import get_logger
+from app.services.clicks import ClickBuffer
+
+logger = get_logger(__name__)
+
+# nginx "combined" format, which most CDNs can also emit. Extra fields after
+# the user agent (e.g. $upstream_cache_status) are allowed.
+LOG_LINE = re.compile(
+    r'\S+ \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>[^ "?]+)'
+    r'[^"]*" (?P<status>\d{3}) '
+)
+LOG_TIME_FORMAT = "%d/%b/%Y:%H:%M:%S %z"
+SHORT_ID_PATH = re.compile(r"/([A-Za-z0-9]{7})")
+REDIRECT_STATUSES = {"301", "302", "307", "308"}
+
+
+def parse_access_log_line(
+    line: str, cache_status: Optional[str] = None
+) -> Optional[Tuple[str, datetime]]:
+    """
+    Extract the click recorded by one access log line.
+
+    Only successful GET redirects of well-formed short IDs count as clicks.
+
+    Args:
+        line (str): One line in combined log format.
+        cache_status (Optional[str]): If set, only lines whose last field
+            equals this value (e.g. "HIT") are counted, so requests the
+            origin already counted are skipped.
+
+    Returns:
+        Optional[Tuple[str, datetime]]: The short ID and local access time,
+            or None if the line is not a click.
+    """
+    match = LOG_LINE.match(line)
+    if (
+        match is None
+        or match["method"] != "GET"
+        or match["status"] not in REDIRECT_STATUSES
+    ):
+        return None
+
+    short_id = SHORT_ID_PATH.fullmatch(match["path"])
+    if short_id is None:
+        return None
+
+    if cache_status is not None:
+        fields = line.split()
+        if not fields or fields[-1].strip('"').upper() != cache_status.upper():
+            return None
+
+    try:
+        at = datetime.strptime(match["time"], LOG_TIME_FORMAT)
+    except ValueError:
+        return None
+    # Click times elsewhere are naive local time, see ClickBuffer.record
+    return short_id[1], at.astimezone().replace(tzinfo=None)
+
+
+def _open_log(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def ingest_access_log_lines(
+    session: Session,
+    lines: Iterable[str],
+    batch_size: int = 10_000,
+    cache_status: Optional[str] = None,
+    buffer: Optional[ClickBuffer] = None,
+) -> Dict[str, int]:
+    """
+    Add the clicks found in access log lines to the links table.
+
+    Clicks are aggregated per short ID and written with the batched click
+    UPDATE every `batch_size` distinct short IDs. Unknown short IDs match no
+    row and are ignored by the update.
+
+    Args:
+        session (Session): Database session used for the updates.
+        lines (Iterable[str]): Access log lines in combined log format.
+        batch_size (int): Distinct short IDs aggregated per database write.
+        cache_status (Optional[str]): See `parse_access_log_line`.
+        buffer (Optional[ClickBuffer]): Buffer to aggregate into, so several
+            files can share batches. A new one is used if omitted.
+
+    Returns:
+        Dict[str, int]: Number of lines read and clicks counted.
+
+    Raises:
+        DbException: If a batch cannot be written.
+    """
+    buffer = buffer if buffer is not None else ClickBuffer(max_pending=batch_size)
+    stats = {"lines": 0, "clicks": 0}
+    for line in lines:
+        stats["lines"] += 1
+        click = parse_access_log_line(line, cache_status=cache_status)
+        if click is None:
+            continue
+
+        sort_id, at = click
+        buffer.record(sort_id, at=at)
+        stats["clicks"] += 1
+        if len(buffer) >= batch_size:
+            buffer.flush(session)
+
+    buffer.flush(session)
+    return stats
+
+
+def ingest_access_logs(
+    session: Session,
+    paths: Iterable[str],
+    batch_size: int = 10_000,
+    cache_status: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    Add the clicks found in access log files to the links table.
+
+    Files ending in `.gz` are decompressed on the fly. Ingesting the same
+    file twice counts its clicks twice.
+
+    Args:
+        session (Session): Database session used for the updates.
+        paths (Iterable[str]): Access log files to read.
+        batch_size (int): Distinct short IDs aggregated per database write.
+        cache_status (Optional[str]): See `parse_access_log_line`.
+
+    Returns:
+        Dict[str, int]: Number of files, lines read and clicks counted.
+
+    Raises:
+        DbException: If a batch cannot be written.
+    """
+    totals = {"files": 0, "lines": 0, "clicks": 0}
+    for path in paths:
+        with _open_log(path) as lines:
+            stats = ingest_access_log_lines(
+                session, lines, batch_size=batch_size, cache_status=cache_status
+            )
+        totals["files"] += 1
+        totals["lines"] += stats["lines"]
+        totals["clicks"] += stats["clicks"]
+        logger.info(f"Ingested {stats['clicks']} clicks from {path}")
+    return totals
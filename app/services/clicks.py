@@ -0,0 +1,248 @@
+from sqlmodel import Session, delete, func, or_, update
+from sqlalchemy import bindparam, case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime
+from threading import Lock
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+from app.db.schema import Links, LinkClickShards
+from app.db.init import db
+from app.core.logger import get_logger
+from app.core.config import config
+from app.core.exception import DbException
+from app.core.tasks import PeriodicTask
+
+logger = get_logger(__name__)
+
+_links = Links.__table__
+_shards = LinkClickShards.__table__
+
+# One statement executed for every pending sort_id in a single executemany.
+# updated_at is pinned to itself so click accounting does not fire its onupdate.
+# last_accessed_at only moves forward, counts from old access logs may arrive
+# after newer clicks were already applied.
+BATCH_CLICK_UPDATE = (
+    update(_links)
+    .where(_links.c.sort_id == bindparam("b_sort_id"))
+    .values(
+        clicks=_links.c.clicks + bindparam("b_clicks"),
+        last_accessed_at=case(
+            (
+                or_(
+                    _links.c.last_accessed_at.is_(None),
+                    _links.c.last_accessed_at < bindparam("b_last_accessed_at"),
+                ),
+                bindparam("b_last_accessed_at"),
+            ),
+            else_=_links.c.last_accessed_at,
+        ),
+        updated_at=_links.c.updated_at,
+    )
+)
+
+
+class ClickBuffer:
+    """
+    In-memory write-behind buffer for link click counters.
+
+    Redirects record clicks here instead of committing them one by one. The
+    buffer is periodically flushed into the links table as one batched
+    UPDATE per flush.
+    """
+
+    def __init__(
+        self, max_pending: int = 10_000, on_full: Optional[Callable[[], None]] = None
+    ):
+        """
+        Initialize the click buffer.
+
+        Args:
+            max_pending (int): Number of distinct short IDs after which
+                `on_full` is called to request an early flush.
+            on_full (Optional[Callable[[], None]]): Early flush callback.
+        """
+        self.max_pending = max_pending
+        self._on_full = on_full
+        self._pending: Dict[str, Tuple[int, datetime]] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, sort_id: str, clicks: int = 1, at: Optional[datetime] = None):
+        """
+        Record clicks for a short ID.
+
+        Args:
+            sort_id (str): The short ID that was accessed.
+            clicks (int): Number of clicks to add. Defaults to 1.
+            at (Optional[datetime]): Access time. Defaults to now.
+        """
+        at = at or datetime.now()
+        with self._lock:
+            count, last = self._pending.get(sort_id, (0, at))
+            self._pending[sort_id] = (count + clicks, max(last, at))
+            full = len(self._pending) >= self.max_pending
+
+        if full and self._on_full:
+            self._on_full()
+
+    def drain(self) -> Dict[str, Tuple[int, datetime]]:
+        """Take every pending counter out of the buffer."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def flush(self, session: Session) -> int:
+        """
+        Write every pending counter to the database in one transaction.
+
+        Counters are put back into the buffer if the write fails so that
+        they are retried on the next flush.
+
+        Args:
+            session (Session): Database session used for the update.
+
+        Returns:
+            int: Number of short IDs that were flushed.
+
+        Raises:
+            DbException: If the batched update fails.
+        """
+        pending = self.drain()
+        if not pending:
+            return 0
+
+        try:
+            apply_click_counts(session, pending)
+        except SQLAlchemyError as e:
+            for sort_id, (count, last) in pending.items():
+                self.record(sort_id, clicks=count, at=last)
+            logger.error("Failed to flush click counters", exc_info=True)
+            raise DbException(f"Failed to flush click counters {str(e)}")
+
+        logger.debug(f"Flushed click counters for {len(pending)} links")
+        return len(pending)
+
+
+def apply_click_counts(
+    session: Session, counts: Dict[str, Tuple[int, datetime]]
+) -> None:
+    """
+    Add click counts to the links table with one batched UPDATE and commit.
+
+    Args:
+        session (Session): Database session used for the update.
+        counts (Dict[str, Tuple[int, datetime]]): Clicks and last access
+            time per short ID.
+
+    Raises:
+        SQLAlchemyError: If the update fails. The session is rolled back.
+    """
+    params: List[dict] = [
+        {"b_sort_id": sort_id, "b_clicks": count, "b_last_accessed_at": last}
+        for sort_id, (count, last) in counts.items()
+    ]
+    try:
+        session.connection().execute(BATCH_CLICK_UPDATE, params)
+        session.commit()
+    except SQLAlchemyError:
+        session.rollback()
+        raise
+
+
+def shard_increment_statement(dialect_name: str, sort_id: str):
+    """
+    Build an upsert adding one click to a random shard of a link.
+
+    Spreading a hot link over several rows lets concurrent redirects update
+    different rows instead of queueing on the single links row lock.
+
+    Args:
+        dialect_name (str): Database dialect, "postgresql" or "sqlite".
+        sort_id (str): The short ID that was accessed.
+
+    Returns:
+        The INSERT ... ON CONFLICT DO UPDATE statement.
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = insert(_shards).values(
+        sort_id=sort_id,
+        shard=random.randrange(config.click_shard_count),
+        clicks=1,
+        last_accessed_at=func.now(),
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[_shards.c.sort_id, _shards.c.shard],
+        set_={
+            "clicks": _shards.c.clicks + 1,
+            "last_accessed_at": statement.excluded.last_accessed_at,
+        },
+    )
+
+
+def reconcile_click_shards(session: Session) -> int:
+    """
+    Move the clicks collected in shards into the links table.
+
+    Shard rows are deleted and their counts added to `Links.clicks` in the
+    same transaction, so a click is never counted twice or lost.
+
+    Args:
+        session (Session): Database session used for the reconciliation.
+
+    Returns:
+        int: Number of links whose counters were reconciled.
+
+    Raises:
+        DbException: If the reconciliation fails.
+    """
+    try:
+        rows = session.connection().execute(
+            delete(_shards).returning(
+                _shards.c.sort_id, _shards.c.clicks, _shards.c.last_accessed_at
+            )
+        )
+        counts: Dict[str, Tuple[int, datetime]] = {}
+        for sort_id, clicks, last in rows:
+            count, previous = counts.get(sort_id, (0, last))
+            counts[sort_id] = (count + clicks, max(previous, last))
+
+        if not counts:
+            session.commit()
+            return 0
+
+        apply_click_counts(session, counts)
+    except SQLAlchemyError as e:
+        session.rollback()
+        logger.error("Failed to reconcile click shards", exc_info=True)
+        raise DbException(f"Failed to reconcile click shards {str(e)}")
+
+    logger.debug(f"Reconciled click shards for {len(counts)} links")
+    return len(counts)
+
+
+def reconcile_clicks() -> int:
+    """Reconcile click shards using a fresh session."""
+    with Session(db.engine) as session:
+        return reconcile_click_shards(session)
+
+
+def flush_clicks() -> int:
+    """Flush the process-wide click buffer using a fresh session."""
+    with Session(db.engine) as session:
+        return click_buffer.flush(session)
+
+
+click_flusher = PeriodicTask(
+    name="click-flusher", interval=config.click_flush_interval, func=flush_clicks
+)
+click_buffer = ClickBuffer(
+    max_pending=config.click_buffer_max, on_full=click_flusher.trigger
+)
+shard_reconciler = PeriodicTask(
+    name="click-shard-reconciler",
+    interval=config.click_reconcile_interval,
+    func=reconcile_clicks,
+)
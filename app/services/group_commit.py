@@ -0,0 +1,149 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.config import config
+from app.core.exception import AppException
+from app.core.logger import get_logger
+from app.core.metrics import Histogram
+from app.services.link import AsyncLinkService
+from app.services.link_log import link_log
+
+logger = get_logger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class LinkGroupCommit:
+    """
+    Creates links from concurrent requests in shared transactions.
+
+    The first request of a group waits up to `window` seconds, or until
+    `max_batch` requests joined, then creates the links of the whole group
+    with one multi-row insert and a single commit on its own session. A
+    full group takes no more requests, the next one starts a new group. Every
+    request gets its own short link, or the error of its group. When
+    disabled, each request creates its link on its own, and the histograms
+    still record it so both modes can be compared.
+    """
+
+    def __init__(self, enabled: bool, window: float = 0.005, max_batch: int = 100):
+        """
+        Initialize the committer.
+
+        Args:
+            enabled (bool): Group concurrent creates.
+            window (float): Longest a group stays open, in seconds.
+            max_batch (int): Requests that close a group early.
+        """
+        self.enabled = enabled
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._full: Optional[asyncio.Event] = None
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+
+    async def create(self, session: AsyncSession, original_link: str) -> str:
+        """
+        Create, or reuse, the short link for a URL.
+
+        Args:
+            session (AsyncSession): Session of the calling request.
+            original_link (str): The normalized original URL.
+
+        Returns:
+            str: The short link URL.
+
+        Raises:
+            AppException: If creating the links of the group failed.
+        """
+        started = time.perf_counter()
+        try:
+            # The link log accepts links without a database commit
+            if not self.enabled or link_log.enabled:
+                self.batch_size.observe(1)
+                return await AsyncLinkService(session).generate_new_link(original_link)
+            return await self._join(session, original_link)
+        finally:
+            self.latency.observe(time.perf_counter() - started)
+
+    async def _join(self, session: AsyncSession, original_link: str) -> str:
+        future = asyncio.get_running_loop().create_future()
+        if not self._pending:
+            self._full = asyncio.Event()
+        group, full = self._pending, self._full
+        group.append((original_link, future))
+        if len(group) >= self.max_batch:
+            # Requests arriving before the leader wakes up join the next group
+            self._close()
+
+        if len(group) > 1:
+            return await future
+
+        # First request of the group, it commits for everyone
+        try:
+            await asyncio.wait_for(full.wait(), self.window)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            future.cancel()
+            if group is self._pending:
+                self._close()
+            self._fail(group)
+            raise
+
+        if group is self._pending:
+            self._close()
+        try:
+            await self._flush(session, group)
+        except asyncio.CancelledError:
+            future.cancel()
+            self._fail(group)
+            raise
+        return await future
+
+    def _close(self) -> None:
+        # The leader holds on to the group, new requests start another one
+        if self._full is not None:
+            self._full.set()
+        self._pending, self._full = [], None
+
+    @staticmethod
+    def _fail(group: List[Tuple[str, asyncio.Future]]) -> None:
+        for _, future in group:
+            if not future.done():
+                future.set_exception(AppException("Failed to generate a new link"))
+
+    async def _flush(
+        self, session: AsyncSession, group: List[Tuple[str, asyncio.Future]]
+    ) -> None:
+        self.batch_size.observe(len(group))
+        try:
+            links = await AsyncLinkService(session).generate_new_links(
+                [original_link for original_link, _ in group]
+            )
+        except Exception as e:
+            logger.error(f"Group commit of {len(group)} links failed: {e}")
+            self._fail(group)
+            return
+
+        for (_, future), link in zip(group, links):
+            if not future.done():
+                future.set_result(link)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the create latency and batch size histograms."""
+        return {
+            "enabled": self.enabled,
+            "latency_s": self.latency.snapshot(),
+            "batch_size": self.batch_size.snapshot(),
+        }
+
+
+link_group_commit = LinkGroupCommit(
+    enabled=config.link_group_commit_enabled,
+    window=config.link_group_commit_window,
+    max_batch=config.link_group_commit_max,
+)
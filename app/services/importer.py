@@ -0,0 +1,349 @@
+import csv
+import gzip
+import io
+import json
+import secrets
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO
+from uuid import uuid4
+from pydantic import ValidationError
+from sqlalchemy import Connection, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from app.db.init import Database
+from app.db.schema import ImportCheckpoints, Links
+from app.models.input import PRIVATE_HOST_MESSAGE, OriginalUrlInput, SortIDInput
+from app.core.logger import get_logger
+from app.core.resolver import host_resolver
+from app.services import short_id
+from app.services.link import CREATE_ATTEMPTS, url_hash
+from app.services.short_id import ALPHABET
+
+logger = get_logger(__name__)
+
+_links = Links.__table__
+_checkpoints = ImportCheckpoints.__table__
+
+# Allocator IDs kept in reserve for generated IDs that hit a taken sort_id
+SPARE_SORT_IDS = 100
+
+IMPORT_COLUMNS = ("id", "original_url", "sort_id", "url_hash", "clicks", "created_at")
+
+# Postgres path: COPY into a session-local staging table, then move the rows
+# with one INSERT ... SELECT that skips sort_ids which already exist
+STAGING_TABLE = "links_import"
+_columns = ", ".join(IMPORT_COLUMNS)
+CREATE_STAGING = text(
+    f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+    f"(LIKE links INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+)
+COPY_STAGING = f"COPY {STAGING_TABLE} ({_columns}) FROM STDIN WITH (FORMAT csv)"
+MOVE_STAGING = text(
+    f"INSERT INTO links ({_columns}) SELECT {_columns} FROM {STAGING_TABLE} "
+    f"ON CONFLICT DO NOTHING RETURNING sort_id"
+)
+
+
+def _open_input(path: str) -> TextIO:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def read_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream link records from a CSV (with header) or NDJSON file.
+
+    Records need an `original_url` (or `url`) and may carry `sort_id`,
+    `clicks` and an ISO 8601 `created_at`. Files ending in `.gz` are
+    decompressed on the fly.
+
+    Args:
+        path (str): The input file.
+        fmt (Optional[str]): "csv" or "ndjson", guessed from the name if None.
+
+    Yields:
+        Dict[str, Any]: One record per input row.
+    """
+    if fmt is None:
+        name = path[:-3] if path.endswith(".gz") else path
+        fmt = "ndjson" if name.endswith((".ndjson", ".jsonl")) else "csv"
+
+    with _open_input(path) as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _unclaimed(rows: List[dict], inserted: Set[str]) -> List[dict]:
+    """Return the rows whose sort_id was not inserted, the first row wins."""
+    missing = []
+    for row in rows:
+        if row["sort_id"] in inserted:
+            inserted.discard(row["sort_id"])
+        else:
+            missing.append(row)
+    return missing
+
+
+class LinkImporter:
+    """
+    Chunked, resumable bulk loader for the links table.
+
+    Every chunk is loaded and its checkpoint advanced in one transaction, so
+    a resumed run continues after the last committed chunk without loading
+    any row twice.
+    """
+
+    def __init__(
+        self,
+        database: Database,
+        job: str,
+        chunk_size: int = 10_000,
+        resolve_hosts: bool = False,
+        rejects: Optional[TextIO] = None,
+    ):
+        """
+        Initialize the importer.
+
+        Args:
+            database (Database): Database to load into.
+            job (str): Checkpoint name, reuse it to resume an import.
+            chunk_size (int): Input records per transaction.
+            resolve_hosts (bool): Reject URLs whose host resolves to a
+                private address, like the API does. Off by default, the DNS
+                lookups dominate import time.
+            rejects (Optional[TextIO]): Receives one NDJSON line per invalid
+                record.
+        """
+        self.database = database
+        self.job = job
+        self.chunk_size = chunk_size
+        self.resolve_hosts = resolve_hosts
+        self.rejects = rejects
+        self.use_copy = database.engine.dialect.driver == "psycopg2"
+        self.stats = {"records": 0, "inserted": 0, "skipped": 0, "invalid": 0}
+        self._sort_ids: deque = deque()
+
+    def _reject(self, position: int, record: Dict[str, Any], error: str) -> None:
+        self.stats["invalid"] += 1
+        if self.rejects is not None:
+            self.rejects.write(
+                json.dumps({"position": position, "record": record, "error": error})
+                + "\n"
+            )
+
+    def _reserve_sort_ids(self, count: int) -> None:
+        """
+        Take allocator IDs for a chunk before its transaction opens.
+
+        Blocks are reserved in a transaction of their own, which can't wait
+        on the chunk's: the CLI pool has a single connection and SQLite a
+        single writer. Spare IDs cover generated IDs that hit a taken one.
+        """
+        allocator = short_id.short_id_allocator
+        if allocator is None:
+            return
+        while len(self._sort_ids) < count + SPARE_SORT_IDS:
+            self._sort_ids.append(allocator.next_id(self.database.engine))
+
+    def _new_sort_id(self) -> Optional[str]:
+        """Return a generated ID, or None once the reserved ones ran out."""
+        if short_id.short_id_allocator is None:
+            return "".join(secrets.choice(ALPHABET) for _ in range(7))
+        return self._sort_ids.popleft() if self._sort_ids else None
+
+    def prepare_row(self, position: int, record: Dict[str, Any]) -> Optional[dict]:
+        """
+        Validate and normalize one record into a links row.
+
+        Args:
+            position (int): Index of the record in the input.
+            record (Dict[str, Any]): The raw record.
+
+        Returns:
+            Optional[dict]: Column values, or None if the record is invalid.
+        """
+        try:
+            url = OriginalUrlInput(link=record.get("original_url") or record.get("url"))
+            sort_id = record.get("sort_id") or None
+            if sort_id is not None:
+                sort_id = SortIDInput(sort_id=sort_id).sort_id
+            clicks = int(record.get("clicks") or 0)
+            created_at = (
+                datetime.fromisoformat(record["created_at"])
+                if record.get("created_at")
+                else datetime.now(timezone.utc)
+            )
+        except ValidationError as e:
+            self._reject(position, record, e.errors()[0]["msg"])
+            return None
+        except (ValueError, TypeError) as e:
+            self._reject(position, record, str(e))
+            return None
+
+        if self.resolve_hosts and host_resolver.is_private(url.host):
+            self._reject(position, record, PRIVATE_HOST_MESSAGE)
+            return None
+
+        original_url = url.link
+        return {
+            "id": uuid4(),
+            "original_url": original_url,
+            "sort_id": sort_id,
+            "url_hash": url_hash(original_url),
+            "clicks": clicks,
+            "created_at": created_at,
+        }
+
+    def _insert(self, connection: Connection, rows: List[dict]) -> Set[str]:
+        """Insert rows, skipping taken sort_ids, and return the inserted ones."""
+        if self.use_copy:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in rows:
+                writer.writerow([row[column] for column in IMPORT_COLUMNS])
+            buffer.seek(0)
+
+            connection.execute(CREATE_STAGING)
+            cursor = connection.connection.dbapi_connection.cursor()
+            try:
+                cursor.copy_expert(COPY_STAGING, buffer)
+            finally:
+                cursor.close()
+            inserted = set(connection.execute(MOVE_STAGING).scalars())
+            # The staging table would only be emptied at commit
+            connection.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+            return inserted
+
+        insert = (
+            postgresql.insert
+            if connection.dialect.name == "postgresql"
+            else sqlite.insert
+        )
+        statement = (
+            insert(_links).on_conflict_do_nothing().returning(_links.c.sort_id)
+        )
+        return set(connection.execute(statement, rows).scalars())
+
+    def _load_chunk(self, connection: Connection, rows: List[dict]) -> int:
+        """Load prepared rows and return how many of them were inserted."""
+        generated = {id(row) for row in rows if row["sort_id"] is None}
+        for row in rows:
+            if id(row) in generated:
+                row["sort_id"] = self._new_sort_id()
+
+        missing = _unclaimed(rows, self._insert(connection, rows)) if rows else []
+        # Rows that brought their own sort_id are duplicates if not inserted,
+        # generated IDs that hit a taken sort_id get another one
+        retry = [row for row in missing if id(row) in generated]
+        skipped = len(missing) - len(retry)
+        for _ in range(CREATE_ATTEMPTS):
+            if not retry:
+                break
+            for row in retry:
+                row["sort_id"] = self._new_sort_id()
+            # Out of reserved IDs, the rest count as skipped
+            assigned = [row for row in retry if row["sort_id"] is not None]
+            skipped += len(retry) - len(assigned)
+            retry = (
+                _unclaimed(assigned, self._insert(connection, assigned))
+                if assigned
+                else []
+            )
+        skipped += len(retry)
+
+        self.stats["skipped"] += skipped
+        self.stats["inserted"] += len(rows) - skipped
+        return len(rows) - skipped
+
+    def _save_checkpoint(
+        self, connection: Connection, position: int, inserted: int
+    ) -> None:
+        insert = (
+            postgresql.insert
+            if connection.dialect.name == "postgresql"
+            else sqlite.insert
+        )
+        statement = insert(_checkpoints).values(
+            name=self.job, position=position, inserted=inserted
+        )
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=[_checkpoints.c.name],
+                set_={
+                    "position": statement.excluded.position,
+                    "inserted": _checkpoints.c.inserted + statement.excluded.inserted,
+                },
+            )
+        )
+
+    def load_checkpoint(self) -> int:
+        """Return the number of input records already imported by this job."""
+        with self.database.engine.connect() as connection:
+            position = connection.execute(
+                select(_checkpoints.c.position).where(_checkpoints.c.name == self.job)
+            ).scalar_one_or_none()
+        return position or 0
+
+    def run(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Import records, resuming after the job's last checkpoint.
+
+        Args:
+            records (Iterable[Dict[str, Any]]): The input, from the start.
+
+        Returns:
+            Dict[str, Any]: Counts of records, inserted, skipped (sort_id
+                already taken) and invalid rows, plus elapsed time and rate.
+        """
+        start_position = position = self.load_checkpoint()
+        if start_position:
+            logger.info(f"Resuming import {self.job} at record {start_position}")
+
+        started = time.perf_counter()
+        iterator = iter(records)
+        for _ in range(start_position):
+            if next(iterator, None) is None:
+                break
+
+        while True:
+            rows = []
+            consumed = 0
+            for record in iterator:
+                row = self.prepare_row(position + consumed, record)
+                consumed += 1
+                if row is not None:
+                    rows.append(row)
+                if consumed == self.chunk_size:
+                    break
+            if not consumed:
+                break
+
+            self._reserve_sort_ids(sum(row["sort_id"] is None for row in rows))
+            with self.database.engine.begin() as connection:
+                inserted = self._load_chunk(connection, rows)
+                position += consumed
+                self._save_checkpoint(connection, position, inserted)
+
+            self.stats["records"] += consumed
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Imported {position} records of {self.job}, "
+                f"{self.stats['records'] / elapsed:,.0f} records/s"
+            )
+
+        elapsed = time.perf_counter() - started
+        return {
+            **self.stats,
+            "job": self.job,
+            "resumed_at": start_position,
+            "elapsed_s": round(elapsed, 3),
+            "records_per_s": round(self.stats["records"] / elapsed, 1)
+            if elapsed
+            else 0.0,
+        }
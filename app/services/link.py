@@ -1,16 +1,237 @@
-from sqlmodel import select, Session
+from sqlmodel import select, update, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event, func, inspect
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from datetime import datetime
-from app.db.schema import Links
+from app.db.schema import Links, LinkClickShards
 from app.core.logger import get_logger
 from app.core.exception import DbException, AppException
 from app.core.config import config
-import string
+from app.core.cache import TTLCache
+from app.core.url import url_hash
+from app.services.clicks import click_buffer, shard_increment_statement
+from app.services.link_filter import link_filter
+from app.services.link_log import link_log
+from app.services.snapshot import redirect_snapshot
+from app.services.short_id import ALPHABET
+from app.services import short_id
+from typing import Dict, List, Optional, Tuple
+import asyncio
+from uuid import uuid4
 import secrets
 
 logger = get_logger(__name__)
-ALPHABET = string.ascii_letters + string.digits
 
+# Attempts at inserting a new link before giving up. Only IDs that collide
+# with an existing link (random IDs, or allocated IDs meeting links created
+# before SHORT_ID_KEY was set) need another attempt.
+CREATE_ATTEMPTS = 3
+
+# Rows per multi-row INSERT. Four bound parameters per row stays well below
+# the statement parameter limits of SQLite and asyncpg.
+BATCH_INSERT_ROWS = 1000
+
+# Read-through cache of sort_id -> original_url for the redirect path
+link_cache = TTLCache(max_size=config.link_cache_size, ttl=config.link_cache_ttl)
+
+
+def invalidate_cached_link(sort_id: str) -> None:
+    """
+    Drop a short ID from the redirect cache.
+
+    Call this after changing or deleting a link with a bulk statement,
+    which bypasses the ORM event hooks below.
+
+    Args:
+        sort_id (str): The short ID whose mapping changed.
+    """
+    link_cache.invalidate(sort_id)
+
+
+@event.listens_for(Links, "after_update")
+def _invalidate_on_update(mapper, connection, target: Links) -> None:
+    """Invalidate the cached mapping when a link's original URL changes."""
+    if inspect(target).attrs.original_url.history.has_changes():
+        invalidate_cached_link(target.sort_id)
+
+
+@event.listens_for(Links, "after_delete")
+def _invalidate_on_delete(mapper, connection, target: Links) -> None:
+    """Invalidate the cached mapping when a link is deleted."""
+    invalidate_cached_link(target.sort_id)
+
+
+def _existing_link_statement(original_url: str):
+    """Select the short ID of a link for the same URL, via the url_hash index."""
+    # Comparing the URL too rules out hash collisions at no extra cost
+    return (
+        select(Links.sort_id)
+        .where(
+            Links.url_hash == url_hash(original_url),
+            Links.original_url == original_url,
+        )
+        .limit(1)
+    )
+
+
+def _existing_links_statement(original_urls: List[str]):
+    """Select (original_url, sort_id) of links whose url_hash matches any URL."""
+    hashes = {url_hash(original_url) for original_url in original_urls}
+    return select(Links.original_url, Links.sort_id).where(Links.url_hash.in_(hashes))
+
+
+def _batch_insert_statement(dialect_name: str, rows: List[dict]):
+    """
+    Build one multi-row INSERT for new links.
+
+    Rows whose sort_id is already taken are skipped instead of failing the
+    whole statement; only the inserted sort_ids are returned.
+
+    Args:
+        dialect_name (str): Database dialect, "postgresql" or "sqlite".
+        rows (List[dict]): Column values of the new links.
+
+    Returns:
+        The INSERT ... ON CONFLICT DO NOTHING RETURNING sort_id statement.
+    """
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    table = Links.__table__
+    return (
+        insert(table)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[table.c.sort_id])
+        .returning(table.c.sort_id)
+    )
+
+
+def _new_link_row(original_url: str, sort_id: str) -> dict:
+    return {
+        "id": uuid4(),
+        "original_url": original_url,
+        "sort_id": sort_id,
+        "url_hash": url_hash(original_url),
+    }
+
+
+def _batch_keys(original_links: List[str]) -> List[str]:
+    """URLs that need a short ID: each distinct URL, or every URL without dedupe."""
+    if config.link_dedupe_enabled:
+        return list(dict.fromkeys(original_links))
+    return list(original_links)
+
+
+def _batch_results(
+    original_links: List[str], keys: List[str], sort_ids: List[str]
+) -> List[str]:
+    """Spread the short IDs of `keys` back over the requested URLs."""
+    if config.link_dedupe_enabled:
+        by_url = dict(zip(keys, sort_ids))
+        sort_ids = [by_url[original_url] for original_url in original_links]
+    return [f"{config.frontend_url}/{sort_id}" for sort_id in sort_ids]
+
+
+def _click_statement(sort_id: str):
+    """
+    Build the atomic lookup-and-increment statement for a redirect.
+
+    Concurrent redirects never lose clicks because the increment happens
+    inside the UPDATE itself.
+
+    Args:
+        sort_id (str): The short ID being redirected.
+
+    Returns:
+        The UPDATE ... RETURNING original_url statement.
+    """
+    return (
+        update(Links)
+        .where(Links.sort_id == sort_id)
+        .values(
+            clicks=Links.clicks + 1,
+            last_accessed_at=func.now(),
+            updated_at=Links.updated_at,
+        )
+        .returning(Links.original_url)
+    )
+
+
+def _click_count_statement(sort_id: str):
+    """Select `Links.clicks` plus the clicks still held in click shards."""
+    shard_clicks = (
+        select(func.coalesce(func.sum(LinkClickShards.clicks), 0))
+        .where(LinkClickShards.sort_id == sort_id)
+        .scalar_subquery()
+    )
+    return select(Links.clicks + shard_clicks).where(Links.sort_id == sort_id)
+
+
+def _expand_statement(sort_ids: List[str], metadata: bool):
+    """
+    Select the links of many short IDs with one IN query.
+
+    Args:
+        sort_ids (List[str]): The short IDs to resolve.
+        metadata (bool): Also select clicks, including those still held in
+            click shards, and the timestamps.
+
+    Returns:
+        The SELECT statement, one row per known short ID.
+    """
+    if not metadata:
+        return select(Links.sort_id, Links.original_url).where(
+            Links.sort_id.in_(sort_ids)
+        )
+
+    shard_clicks = (
+        select(
+            LinkClickShards.sort_id,
+            func.sum(LinkClickShards.clicks).label("clicks"),
+        )
+        .where(LinkClickShards.sort_id.in_(sort_ids))
+        .group_by(LinkClickShards.sort_id)
+        .subquery()
+    )
+    return (
+        select(
+            Links.sort_id,
+            Links.original_url,
+            (Links.clicks + func.coalesce(shard_clicks.c.clicks, 0)).label("clicks"),
+            Links.created_at,
+            Links.last_accessed_at,
+        )
+        .outerjoin(shard_clicks, shard_clicks.c.sort_id == Links.sort_id)
+        .where(Links.sort_id.in_(sort_ids))
+    )
+
+
+def _not_found(sort_id: str) -> str:
+    """Return a link another worker logged and has not drained, or the 404 page."""
+    original_url = link_log.lookup_peers([sort_id]).get(sort_id)
+    return original_url or f"{config.frontend_url}/404"
+
+
+def _add_peer_links(results: Dict[str, dict], sort_ids: List[str]) -> Dict[str, dict]:
+    """Resolve the short IDs still missing from other workers' link logs."""
+    missing = [sort_id for sort_id in dict.fromkeys(sort_ids) if sort_id not in results]
+    for sort_id, original_url in link_log.lookup_peers(missing).items():
+        results[sort_id] = {"original_url": original_url}
+    return results
+
+
+async def _not_found_async(sort_id: str) -> str:
+    """Async variant of `_not_found`, peer segments are read in a thread."""
+    if not link_log.enabled:
+        return _not_found(sort_id)
+    return await asyncio.to_thread(_not_found, sort_id)
+
+
+async def _add_peer_links_async(
+    results: Dict[str, dict], sort_ids: List[str]
+) -> Dict[str, dict]:
+    """Async variant of `_add_peer_links`, peer segments are read in a thread."""
+    if not link_log.enabled or all(sort_id in results for sort_id in sort_ids):
+        return results
+    return await asyncio.to_thread(_add_peer_links, results, sort_ids)
 
 
 class LinkService:
@@ -59,12 +280,136 @@ class LinkService:
         """
         return "".join(secrets.choice(ALPHABET) for _ in range(length))
 
+    def _next_sort_id(self) -> str:
+        """
+        Return the short ID for a new link.
+
+        Uses the block allocator when SHORT_ID_KEY is set and random IDs
+        otherwise.
+
+        Returns:
+            str: The short ID.
+        """
+        allocator = short_id.short_id_allocator
+        if allocator is None:
+            return self._create_unique_id()
+        return allocator.next_id(self._db.get_bind())
+
+    def _lookup_original_url(self, sort_id: str) -> Optional[str]:
+        """
+        Resolve a short ID without touching its click counters.
+
+        Checks the in-process cache and the shared redirect snapshot first
+        and only queries the original URL column on a miss.
+
+        Args:
+            sort_id (str): The short ID to look up.
+
+        Returns:
+            Optional[str]: The original URL, or None if the ID is unknown.
+        """
+        original_url = link_cache.get(sort_id) or redirect_snapshot.get(sort_id)
+        if original_url is not None:
+            return original_url
+
+        statement = select(Links.original_url).where(Links.sort_id == sort_id)
+        original_url = self._db.exec(statement=statement).one_or_none()
+        if original_url is not None:
+            link_cache.set(sort_id, original_url)
+        return original_url
+
+    def _record_click(self, sort_id: str) -> None:
+        """
+        Record a click according to `CLICK_WRITE_MODE`.
+
+        Batched mode buffers the click in memory, sharded mode increments a
+        random click shard of the link.
+
+        Args:
+            sort_id (str): The short ID that was accessed.
+        """
+        if config.click_write_mode == "batched":
+            click_buffer.record(sort_id)
+            return
+
+        dialect_name = self._db.get_bind().dialect.name
+        self._db.exec(statement=shard_increment_statement(dialect_name, sort_id))
+        self._commit()
+
+    def get_click_count(self, sort_id: str) -> int:
+        """
+        Return the click count of a link including unreconciled shards.
+
+        Args:
+            sort_id (str): The short ID to count clicks for.
+
+        Returns:
+            int: Total number of clicks, 0 if the short ID is unknown.
+        """
+        statement = _click_count_statement(sort_id)
+        return self._db.exec(statement=statement).one_or_none() or 0
+
+    def _accept_into_log(self, original_link: str) -> str:
+        """
+        Accept a new link into the link log instead of the database.
+
+        Dedupe only sees links that are still in the log.
+
+        Args:
+            original_link (str): The original URL to shorten.
+
+        Returns:
+            str: The short link URL.
+        """
+        if config.link_dedupe_enabled:
+            existing = link_log.find(original_link)
+            if existing is not None:
+                return f"{config.frontend_url}/{existing}"
+
+        sort_id = self._next_sort_id()
+        link_log.append(sort_id, original_link)
+        link_filter.add(sort_id)
+        logger.debug(f"Accepted link {sort_id} into the link log")
+        return f"{config.frontend_url}/{sort_id}"
+
+    def _accept_batch_into_log(
+        self, original_links: List[str], keys: List[str]
+    ) -> List[str]:
+        """
+        Accept a batch of new links into the link log with one fsync.
+
+        Args:
+            original_links (List[str]): The requested URLs.
+            keys (List[str]): The URLs to create links for.
+
+        Returns:
+            List[str]: Short link URLs in the order of `original_links`.
+        """
+        sort_ids = [
+            link_log.find(original_url) if config.link_dedupe_enabled else None
+            for original_url in keys
+        ]
+        new_links = []
+        for i, sort_id in enumerate(sort_ids):
+            if sort_id is None:
+                sort_ids[i] = self._next_sort_id()
+                new_links.append((sort_ids[i], keys[i]))
+
+        link_log.append_many(new_links)
+        for sort_id, _ in new_links:
+            link_filter.add(sort_id)
+        logger.debug(f"Accepted {len(new_links)} links into the link log")
+        return _batch_results(original_links, keys, sort_ids)
+
     def generate_new_link(self, original_link: str) -> str:
         """
         Create a new short link for the given original URL.
 
         Generates a unique short ID, stores the link in the database,
-        and returns the short link URL.
+        and returns the short link URL. If a link for the same URL exists
+        and `LINK_DEDUPE_ENABLED` is set, its short link is returned instead.
+        With `LINK_LOG_DIR` set the link is accepted into the local link log
+        and inserted by its drainer later.
 
         Args:
             original_link (str): The original URL to shorten.
@@ -77,25 +422,198 @@ class LinkService:
             AppException: If link generation fails.
         """
         try:
-            sort_id = self._create_unique_id()
-            new_link = Links(original_url=original_link, sort_id=sort_id)
-            self._db.add(new_link)
-            self._commit()
-            self._db.refresh(new_link)
+            if link_log.enabled:
+                return self._accept_into_log(original_link)
 
-            logger.debug(f"New link created successfully with id {new_link.id}")
+            if config.link_dedupe_enabled:
+                statement = _existing_link_statement(original_link)
+                existing = self._db.exec(statement=statement).first()
+                if existing is not None:
+                    logger.debug(f"Reusing short link {existing} for duplicate URL")
+                    return f"{config.frontend_url}/{existing}"
+
+            for attempt in range(1, CREATE_ATTEMPTS + 1):
+                sort_id = self._next_sort_id()
+                new_link = Links(
+                    original_url=original_link,
+                    sort_id=sort_id,
+                    url_hash=url_hash(original_link),
+                )
+                self._db.add(new_link)
+                try:
+                    self._commit()
+                    break
+                except DbException:
+                    if attempt == CREATE_ATTEMPTS:
+                        raise
+                    logger.warning(f"Short ID {sort_id} is taken, retrying")
+            # No refresh round trip, the short ID is all the caller needs
+            link_filter.add(sort_id)
+
+            logger.debug(f"New link created successfully with short ID {sort_id}")
             return f"{config.frontend_url}/{sort_id}"
 
         except Exception as e:
             logger.error(f"Failed to generate new link {str(e)}")
             raise AppException("Failed to generate a new link")
 
+    def generate_new_links(self, original_links: List[str]) -> List[str]:
+        """
+        Create short links for many URLs in one transaction.
+
+        Existing links are found with one url_hash lookup, new ones are
+        written with multi-row INSERTs. Rows that lose a sort_id collision
+        are retried with new IDs. With `LINK_LOG_DIR` set the links are
+        accepted into the local link log like single ones.
+
+        Args:
+            original_links (List[str]): Normalized original URLs.
+
+        Returns:
+            List[str]: Short link URLs in the order of `original_links`.
+
+        Raises:
+            DbException: If database operations fail.
+            AppException: If link generation fails.
+        """
+        try:
+            keys = _batch_keys(original_links)
+            if link_log.enabled:
+                return self._accept_batch_into_log(original_links, keys)
+
+            sort_ids: List[Optional[str]] = [None] * len(keys)
+            if config.link_dedupe_enabled and keys:
+                existing = dict(
+                    self._db.exec(statement=_existing_links_statement(keys)).all()
+                )
+                sort_ids = [existing.get(original_url) for original_url in keys]
+
+            dialect_name = self._db.get_bind().dialect.name
+            pending = [i for i, sort_id in enumerate(sort_ids) if sort_id is None]
+            for _ in range(CREATE_ATTEMPTS):
+                if not pending:
+                    break
+                candidates: Dict[int, str] = {i: self._next_sort_id() for i in pending}
+                rows = [_new_link_row(keys[i], candidates[i]) for i in pending]
+                inserted = set()
+                for start in range(0, len(rows), BATCH_INSERT_ROWS):
+                    statement = _batch_insert_statement(
+                        dialect_name, rows[start : start + BATCH_INSERT_ROWS]
+                    )
+                    inserted.update(self._db.exec(statement=statement).scalars())
+
+                for i in pending:
+                    if candidates[i] in inserted:
+                        sort_ids[i] = candidates[i]
+                        inserted.discard(candidates[i])
+                pending = [i for i in pending if sort_ids[i] is None]
+
+            if pending:
+                raise AppException(f"No free short ID for {len(pending)} links")
+            self._commit()
+        except Exception as e:
+            self._db.rollback()
+            logger.error(f"Failed to generate new links {str(e)}")
+            raise AppException("Failed to generate new links")
+
+        for sort_id in sort_ids:
+            link_filter.add(sort_id)
+        logger.debug(f"Created or reused {len(keys)} links in one batch")
+        return _batch_results(original_links, keys, sort_ids)
+
+    def _expand_from_memory(
+        self, sort_ids: List[str], metadata: bool
+    ) -> Tuple[Dict[str, dict], List[str], List[str]]:
+        """
+        Resolve what the in-process caches can answer without the database.
+
+        Args:
+            sort_ids (List[str]): The short IDs to resolve.
+            metadata (bool): Whether the caller needs clicks and timestamps,
+                which only the database has.
+
+        Returns:
+            Tuple[Dict[str, dict], List[str], List[str]]: Links resolved from
+                memory, the short IDs left for the database and those the
+                short ID filter rejected, to `recheck`.
+        """
+        results: Dict[str, dict] = {}
+        remaining: List[str] = []
+        rejected: List[str] = []
+        for sort_id in dict.fromkeys(sort_ids):
+            # Not drained yet, there is no row or metadata to read
+            logged = link_log.get(sort_id)
+            if logged is not None:
+                results[sort_id] = {"original_url": logged}
+                continue
+
+            if not link_filter.might_contain(sort_id):
+                rejected.append(sort_id)
+                continue
+
+            if not metadata:
+                cached = link_cache.get(sort_id) or redirect_snapshot.get(sort_id)
+                if cached is not None:
+                    results[sort_id] = {"original_url": cached}
+                    continue
+            remaining.append(sort_id)
+        return results, remaining, rejected
+
+    @staticmethod
+    def _collect_expanded(results: Dict[str, dict], rows) -> Dict[str, dict]:
+        for row in rows:
+            fields = dict(row._mapping)
+            sort_id = fields.pop("sort_id")
+            link_cache.set(sort_id, fields["original_url"])
+            results[sort_id] = fields
+        return results
+
+    def expand_links(
+        self, sort_ids: List[str], metadata: bool = True
+    ) -> Dict[str, dict]:
+        """
+        Resolve many short IDs at once without counting clicks.
+
+        IDs are answered from the link log, the redirect cache and the
+        redirect snapshot where possible, the rest with one IN query.
+
+        Args:
+            sort_ids (List[str]): The short IDs to resolve.
+            metadata (bool): Include clicks, created_at and last_accessed_at.
+
+        Returns:
+            Dict[str, dict]: Fields per known short ID, unknown IDs are
+                left out.
+
+        Raises:
+            AppException: If the lookup fails.
+        """
+        try:
+            results, remaining, rejected = self._expand_from_memory(
+                sort_ids, metadata
+            )
+            if rejected:
+                remaining += link_filter.recheck(rejected)
+            if not remaining:
+                return _add_peer_links(results, sort_ids)
+
+            statement = _expand_statement(remaining, metadata)
+            rows = self._db.exec(statement=statement)
+            return _add_peer_links(self._collect_expanded(results, rows), sort_ids)
+        except Exception as e:
+            logger.error(f"Failed to expand links {str(e)}")
+            raise AppException("Failed to expand links")
+
     def get_original_link(self, sort_id: str) -> str:
         """
         Retrieve the original URL for a given short ID.
 
-        Increments the click count and updates the last accessed timestamp.
-        Returns the 404 page URL if the short ID is not found.
+        Increments the click count and updates the last accessed timestamp
+        with a single UPDATE ... RETURNING round trip. In the batched and
+        sharded `CLICK_WRITE_MODE`s the URL is served from the in-process
+        cache and the click is recorded by `_record_click` instead.
+        Returns the 404 page URL if the short ID is not found, without a
+        lookup when the short ID filter rules it out even after a refresh.
 
         Args:
             sort_id (str): The short ID to look up.
@@ -108,19 +626,337 @@ class LinkService:
             AppException: If retrieval fails.
         """
         try:
-            statement = select(Links).where(Links.sort_id == sort_id)
-            old_link = self._db.exec(statement=statement).one_or_none()
-            if not old_link:
-                return f"{config.frontend_url}/404"
+            # Accepted into the link log and not drained yet, such links
+            # have no row to count clicks on
+            original_url = link_log.get(sort_id)
+            if original_url is not None:
+                return original_url
+
+            if not link_filter.might_contain(sort_id):
+                # The negative may predate a link created on another worker
+                if not link_filter.recheck([sort_id]):
+                    return _not_found(sort_id)
 
-            old_link.clicks = old_link.clicks + 1
-            old_link.last_accessed_at = datetime.now()
+            if config.click_write_mode != "sync":
+                original_url = self._lookup_original_url(sort_id)
+                if original_url is None:
+                    return _not_found(sort_id)
 
-            self._db.add(old_link)
+                self._record_click(sort_id)
+                return original_url
+
+            statement = _click_statement(sort_id)
+            original_url = self._db.exec(statement=statement).scalar_one_or_none()
             self._commit()
+            if original_url is None:
+                return _not_found(sort_id)
+
+            logger.debug("Updated and fetched the old link")
+            return original_url
+        except Exception:
+            logger.error("Failed to find the original link")
+            raise AppException("Failed to find the original link")
+
+
+class AsyncLinkService(LinkService):
+    """
+    Async variant of LinkService for handlers running on the event loop.
+
+    Mirrors LinkService but awaits every database round trip, so redirects
+    and link creation do not occupy a threadpool worker while waiting on
+    the database.
+    """
+
+    def __init__(self, session: AsyncSession):
+        """
+        Initialize the AsyncLinkService with an async database session.
+
+        Args:
+            session (AsyncSession): SQLAlchemy async database session.
+        """
+        self._db = session
+
+    async def _commit(self) -> None:
+        """
+        Commit database changes with error handling.
+
+        Raises:
+            DbException: If the commit operation fails.
+        """
+        try:
+            await self._db.commit()
+        except (IntegrityError, SQLAlchemyError) as e:
+            await self._db.rollback()
+            logger.error("Database operation failed", exc_info=True)
+            raise DbException(f"Database operation failed {str(e)}")
+
+    async def _next_sort_id(self) -> str:
+        """
+        Return the short ID for a new link.
+
+        Returns:
+            str: The short ID.
+        """
+        allocator = short_id.short_id_allocator
+        if allocator is None:
+            return self._create_unique_id()
+        return await allocator.next_id_async(self._db.bind)
+
+    async def _lookup_original_url(self, sort_id: str) -> Optional[str]:
+        """
+        Resolve a short ID without touching its click counters.
+
+        Args:
+            sort_id (str): The short ID to look up.
+
+        Returns:
+            Optional[str]: The original URL, or None if the ID is unknown.
+        """
+        original_url = link_cache.get(sort_id) or redirect_snapshot.get(sort_id)
+        if original_url is not None:
+            return original_url
+
+        statement = select(Links.original_url).where(Links.sort_id == sort_id)
+        original_url = (await self._db.exec(statement=statement)).one_or_none()
+        if original_url is not None:
+            link_cache.set(sort_id, original_url)
+        return original_url
+
+    async def _record_click(self, sort_id: str) -> None:
+        """
+        Record a click according to `CLICK_WRITE_MODE`.
+
+        Args:
+            sort_id (str): The short ID that was accessed.
+        """
+        if config.click_write_mode == "batched":
+            click_buffer.record(sort_id)
+            return
+
+        dialect_name = self._db.bind.dialect.name
+        await self._db.exec(statement=shard_increment_statement(dialect_name, sort_id))
+        await self._commit()
+
+    async def get_click_count(self, sort_id: str) -> int:
+        """
+        Return the click count of a link including unreconciled shards.
+
+        Args:
+            sort_id (str): The short ID to count clicks for.
+
+        Returns:
+            int: Total number of clicks, 0 if the short ID is unknown.
+        """
+        statement = _click_count_statement(sort_id)
+        return (await self._db.exec(statement=statement)).one_or_none() or 0
+
+    async def _accept_into_log(self, original_link: str) -> str:
+        """Async variant of `_accept_into_log`, the fsync runs off the loop."""
+        if config.link_dedupe_enabled:
+            existing = link_log.find(original_link)
+            if existing is not None:
+                return f"{config.frontend_url}/{existing}"
+
+        sort_id = await self._next_sort_id()
+        await asyncio.to_thread(link_log.append, sort_id, original_link)
+        link_filter.add(sort_id)
+        logger.debug(f"Accepted link {sort_id} into the link log")
+        return f"{config.frontend_url}/{sort_id}"
+
+    async def _accept_batch_into_log(
+        self, original_links: List[str], keys: List[str]
+    ) -> List[str]:
+        """Async variant of `_accept_batch_into_log`, the fsync runs off the loop."""
+        sort_ids = [
+            link_log.find(original_url) if config.link_dedupe_enabled else None
+            for original_url in keys
+        ]
+        new_links = []
+        for i, sort_id in enumerate(sort_ids):
+            if sort_id is None:
+                sort_ids[i] = await self._next_sort_id()
+                new_links.append((sort_ids[i], keys[i]))
+
+        await asyncio.to_thread(link_log.append_many, new_links)
+        for sort_id, _ in new_links:
+            link_filter.add(sort_id)
+        logger.debug(f"Accepted {len(new_links)} links into the link log")
+        return _batch_results(original_links, keys, sort_ids)
+
+    async def generate_new_link(self, original_link: str) -> str:
+        """
+        Create a new short link for the given original URL.
+
+        Args:
+            original_link (str): The original URL to shorten.
+
+        Returns:
+            Short link URL as str.
+
+        Raises:
+            DbException: If database operations fail.
+            AppException: If link generation fails.
+        """
+        try:
+            if link_log.enabled:
+                return await self._accept_into_log(original_link)
+
+            if config.link_dedupe_enabled:
+                statement = _existing_link_statement(original_link)
+                existing = (await self._db.exec(statement=statement)).first()
+                if existing is not None:
+                    logger.debug(f"Reusing short link {existing} for duplicate URL")
+                    return f"{config.frontend_url}/{existing}"
+
+            for attempt in range(1, CREATE_ATTEMPTS + 1):
+                sort_id = await self._next_sort_id()
+                new_link = Links(
+                    original_url=original_link,
+                    sort_id=sort_id,
+                    url_hash=url_hash(original_link),
+                )
+                self._db.add(new_link)
+                try:
+                    await self._commit()
+                    break
+                except DbException:
+                    if attempt == CREATE_ATTEMPTS:
+                        raise
+                    logger.warning(f"Short ID {sort_id} is taken, retrying")
+            # No refresh round trip, the short ID is all the caller needs
+            link_filter.add(sort_id)
+
+            logger.debug(f"New link created successfully with short ID {sort_id}")
+            return f"{config.frontend_url}/{sort_id}"
+
+        except Exception as e:
+            logger.error(f"Failed to generate new link {str(e)}")
+            raise AppException("Failed to generate a new link")
+
+    async def generate_new_links(self, original_links: List[str]) -> List[str]:
+        """
+        Create short links for many URLs in one transaction.
+
+        Args:
+            original_links (List[str]): Normalized original URLs.
+
+        Returns:
+            List[str]: Short link URLs in the order of `original_links`.
+
+        Raises:
+            DbException: If database operations fail.
+            AppException: If link generation fails.
+        """
+        try:
+            keys = _batch_keys(original_links)
+            if link_log.enabled:
+                return await self._accept_batch_into_log(original_links, keys)
+
+            sort_ids: List[Optional[str]] = [None] * len(keys)
+            if config.link_dedupe_enabled and keys:
+                result = await self._db.exec(statement=_existing_links_statement(keys))
+                existing = dict(result.all())
+                sort_ids = [existing.get(original_url) for original_url in keys]
+
+            dialect_name = self._db.bind.dialect.name
+            pending = [i for i, sort_id in enumerate(sort_ids) if sort_id is None]
+            for _ in range(CREATE_ATTEMPTS):
+                if not pending:
+                    break
+                candidates: Dict[int, str] = {
+                    i: await self._next_sort_id() for i in pending
+                }
+                rows = [_new_link_row(keys[i], candidates[i]) for i in pending]
+                inserted = set()
+                for start in range(0, len(rows), BATCH_INSERT_ROWS):
+                    statement = _batch_insert_statement(
+                        dialect_name, rows[start : start + BATCH_INSERT_ROWS]
+                    )
+                    result = await self._db.exec(statement=statement)
+                    inserted.update(result.scalars())
+
+                for i in pending:
+                    if candidates[i] in inserted:
+                        sort_ids[i] = candidates[i]
+                        inserted.discard(candidates[i])
+                pending = [i for i in pending if sort_ids[i] is None]
+
+            if pending:
+                raise AppException(f"No free short ID for {len(pending)} links")
+            await self._commit()
+        except Exception as e:
+            await self._db.rollback()
+            logger.error(f"Failed to generate new links {str(e)}")
+            raise AppException("Failed to generate new links")
+
+        for sort_id in sort_ids:
+            link_filter.add(sort_id)
+        logger.debug(f"Created or reused {len(keys)} links in one batch")
+        return _batch_results(original_links, keys, sort_ids)
+
+    async def expand_links(
+        self, sort_ids: List[str], metadata: bool = True
+    ) -> Dict[str, dict]:
+        """Async variant of `LinkService.expand_links`."""
+        try:
+            results, remaining, rejected = self._expand_from_memory(
+                sort_ids, metadata
+            )
+            if rejected:
+                remaining += await asyncio.to_thread(link_filter.recheck, rejected)
+            if not remaining:
+                return await _add_peer_links_async(results, sort_ids)
+
+            statement = _expand_statement(remaining, metadata)
+            rows = await self._db.exec(statement=statement)
+            results = self._collect_expanded(results, rows)
+            return await _add_peer_links_async(results, sort_ids)
+        except Exception as e:
+            logger.error(f"Failed to expand links {str(e)}")
+            raise AppException("Failed to expand links")
+
+    async def get_original_link(self, sort_id: str) -> str:
+        """
+        Retrieve the original URL for a given short ID.
+
+        Args:
+            sort_id (str): The short ID to look up.
+
+        Returns:
+            str: The original URL or 404 page URL if not found.
+
+        Raises:
+            DbException: If database operations fail.
+            AppException: If retrieval fails.
+        """
+        try:
+            # Accepted into the link log and not drained yet, such links
+            # have no row to count clicks on
+            original_url = link_log.get(sort_id)
+            if original_url is not None:
+                return original_url
+
+            if not link_filter.might_contain(sort_id):
+                # The negative may predate a link created on another worker
+                if not await asyncio.to_thread(link_filter.recheck, [sort_id]):
+                    return await _not_found_async(sort_id)
+
+            if config.click_write_mode != "sync":
+                original_url = await self._lookup_original_url(sort_id)
+                if original_url is None:
+                    return await _not_found_async(sort_id)
+
+                await self._record_click(sort_id)
+                return original_url
+
+            statement = _click_statement(sort_id)
+            original_url = (await self._db.exec(statement=statement)).scalar_one_or_none()
+            await self._commit()
+            if original_url is None:
+                return await _not_found_async(sort_id)
 
             logger.debug("Updated and fetched the old link")
-            return old_link.original_url
+            return original_url
         except Exception:
             logger.error("Failed to find the original link")
             raise AppException("Failed to find the original link")
@@ -0,0 +1,195 @@
+from sqlmodel import Session, func, select
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Dict, List, Optional
+from app.db.schema import Links
+from app.db.init import db
+from app.core.bloom import BloomFilter
+from app.core.config import config
+from app.core.logger import get_logger
+from app.core.tasks import PeriodicTask
+
+logger = get_logger(__name__)
+
+# Refreshes follow Links.inserted_at, which the database assigns, since
+# imports and link log drains insert rows with an old created_at. Re-read
+# this much before the watermark on every refresh to catch rows from
+# transactions that committed after a newer row was already seen
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+class LinkFilter:
+    """
+    Bloom filter of every known short ID, used to reject unknown IDs early.
+
+    Until the first build the filter is not ready and lets every lookup
+    through. Links created in this process are added immediately; links
+    created by other workers are picked up by the periodic refresh, so a
+    negative is only final after `recheck`.
+    """
+
+    def __init__(self, error_rate: float = 0.001, min_capacity: int = 10_000):
+        """
+        Initialize an empty, not yet ready filter.
+
+        Args:
+            error_rate (float): Target false-positive rate.
+            min_capacity (int): Smallest capacity a filter is built with.
+        """
+        self.error_rate = error_rate
+        self.min_capacity = min_capacity
+        self.rejected = 0
+        self.stale = 0
+        self._filter: Optional[BloomFilter] = None
+        self._watermark: Optional[datetime] = None
+        self._lock = Lock()
+        # Serializes builds and refreshes, counted when one starts
+        self._refresh_lock = Lock()
+        self._refreshes = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    def might_contain(self, sort_id: str) -> bool:
+        """
+        Check whether a short ID may exist.
+
+        Args:
+            sort_id (str): The short ID to check.
+
+        Returns:
+            bool: False if the short ID was unknown at the last refresh.
+        """
+        bloom = self._filter
+        if bloom is None or sort_id in bloom:
+            return True
+
+        self.rejected += 1
+        return False
+
+    def add(self, sort_id: str) -> None:
+        """Add a newly created short ID to the filter."""
+        bloom = self._filter
+        if bloom is not None and sort_id not in bloom:
+            bloom.add(sort_id)
+
+    def recheck(self, sort_ids: List[str]) -> List[str]:
+        """
+        Settle negatives of `might_contain` with a refresh.
+
+        A link another worker just created is only missing until this
+        worker refreshes. Waits for a refresh that started after the call,
+        running one unless a concurrent caller already did, so a flood of
+        unknown short IDs costs one refresh query at a time.
+
+        Args:
+            sort_ids (List[str]): Short IDs the filter rejected.
+
+        Returns:
+            List[str]: The short IDs that exist after all.
+        """
+        started = self._refreshes
+        with self._refresh_lock:
+            if self._refreshes == started:
+                with Session(db.engine) as session:
+                    self._refresh(session)
+
+        bloom = self._filter
+        if bloom is None:
+            return list(sort_ids)
+        found = [sort_id for sort_id in sort_ids if sort_id in bloom]
+        self.stale += len(found)
+        return found
+
+    def build(self, session: Session) -> None:
+        """
+        Build a fresh filter from every short ID in the links table.
+
+        Args:
+            session (Session): Database session used to read the links.
+        """
+        with self._refresh_lock:
+            self._build(session)
+
+    def _build(self, session: Session) -> None:
+        self._refreshes += 1
+        total = session.exec(select(func.count()).select_from(Links)).one()
+        bloom = BloomFilter(
+            capacity=max(total * 2, self.min_capacity), error_rate=self.error_rate
+        )
+        watermark = self._add_rows(session, bloom, since=None)
+        with self._lock:
+            self._filter = bloom
+            self._watermark = watermark
+        logger.info(f"Built short ID filter {self.stats()}")
+
+    def refresh(self, session: Session) -> None:
+        """
+        Add short IDs created since the last build or refresh.
+
+        The filter is rebuilt from scratch once it holds more keys than it
+        was sized for, which keeps the false-positive rate bounded.
+
+        Args:
+            session (Session): Database session used to read the links.
+        """
+        with self._refresh_lock:
+            self._refresh(session)
+
+    def _refresh(self, session: Session) -> None:
+        bloom = self._filter
+        if bloom is None or bloom.count > bloom.capacity:
+            self._build(session)
+            return
+
+        self._refreshes += 1
+        watermark = self._add_rows(session, bloom, since=self._watermark)
+        with self._lock:
+            if watermark is not None:
+                self._watermark = watermark
+
+    def _add_rows(
+        self, session: Session, bloom: BloomFilter, since: Optional[datetime]
+    ) -> Optional[datetime]:
+        statement = select(Links.sort_id, Links.inserted_at)
+        if since is not None:
+            statement = statement.where(Links.inserted_at >= since - REFRESH_OVERLAP)
+
+        watermark = since
+        for sort_id, inserted_at in session.exec(
+            statement.execution_options(yield_per=10_000)
+        ):
+            # Refreshes overlap at the watermark, keep the count accurate
+            if sort_id not in bloom:
+                bloom.add(sort_id)
+            if inserted_at is not None and (
+                watermark is None or inserted_at > watermark
+            ):
+                watermark = inserted_at
+        return watermark
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the filter figures and the number of rejected lookups."""
+        bloom = self._filter
+        stats = bloom.stats() if bloom is not None else {}
+        return {
+            "ready": bloom is not None,
+            "rejected": self.rejected,
+            "stale": self.stale,
+            **stats,
+        }
+
+
+def refresh_link_filter() -> None:
+    """Build or refresh the process-wide short ID filter."""
+    with Session(db.engine) as session:
+        link_filter.refresh(session)
+
+
+link_filter = LinkFilter(error_rate=config.link_filter_error_rate)
+link_filter_refresher = PeriodicTask(
+    name="link-filter-refresh",
+    interval=config.link_filter_refresh_interval,
+    func=refresh_link_filter,
+)
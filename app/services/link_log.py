@@ -0,0 +1,552 @@
+import fcntl
+import json
+import os
+import struct
+import zlib
+from datetime import datetime, timezone
+from threading import Lock
+from itertools import count
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from uuid import uuid4
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session
+from app.db.init import db
+from app.db.schema import Links
+from app.core.config import config
+from app.core.exception import AppException, DbException
+from app.core.logger import get_logger
+from app.core.tasks import PeriodicTask
+from app.core.url import url_hash
+from app.services import short_id
+from app.services.link_filter import link_filter
+
+logger = get_logger(__name__)
+
+# Every record is framed as u32 payload length, u32 CRC32 of the payload
+# (little endian), then the payload: one JSON object per accepted link.
+# A frame cut short by a crash fails the length or CRC check on recovery.
+FRAME = struct.Struct("<II")
+SEGMENT_PREFIX = "links-"
+SEGMENT_SUFFIX = ".log"
+LOCK_FILE = "link-log.lock"
+# Every worker appends to a slot subdirectory of its own
+SLOT_PREFIX = "slot-"
+
+_links = Links.__table__
+
+
+class LinkRecord(NamedTuple):
+    """A link accepted into the log."""
+
+    sort_id: str
+    original_url: str
+    created_at: datetime
+
+
+def encode_record(record: LinkRecord) -> bytes:
+    """Frame a record for appending to a segment."""
+    payload = json.dumps(
+        {
+            "sort_id": record.sort_id,
+            "original_url": record.original_url,
+            "created_at": record.created_at.isoformat(),
+        },
+        separators=(",", ":"),
+    ).encode("utf-8")
+    return FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_segment(path: str, offset: int = 0) -> Tuple[List[LinkRecord], int]:
+    """
+    Read the records of a segment up to the first torn or corrupt frame.
+
+    Args:
+        path (str): The segment file.
+        offset (int): Where to start reading, at a frame boundary.
+
+    Returns:
+        Tuple[List[LinkRecord], int]: The records and the length of the
+            valid prefix of the file.
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+
+    records: List[LinkRecord] = []
+    offset = 0
+    while offset + FRAME.size <= len(data):
+        length, checksum = FRAME.unpack_from(data, offset)
+        payload = data[offset + FRAME.size : offset + FRAME.size + length]
+        if len(payload) != length or zlib.crc32(payload) != checksum:
+            break
+        fields = json.loads(payload)
+        records.append(
+            LinkRecord(
+                fields["sort_id"],
+                fields["original_url"],
+                datetime.fromisoformat(fields["created_at"]),
+            )
+        )
+        offset += FRAME.size + length
+    return records, offset
+
+
+def _segment_name(sequence: int) -> str:
+    return f"{SEGMENT_PREFIX}{sequence:012d}{SEGMENT_SUFFIX}"
+
+
+def _segment_names(directory: str) -> List[str]:
+    """Return the segment files of a directory, oldest first."""
+    return sorted(
+        name
+        for name in os.listdir(directory)
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+    )
+
+
+def _sequence(name: str) -> int:
+    return int(name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)])
+
+
+def _try_lock(directory: str) -> Optional[int]:
+    """Lock a slot directory, return the lock fd or None if it is held."""
+    os.makedirs(directory, exist_ok=True)
+    lock_fd = os.open(os.path.join(directory, LOCK_FILE), os.O_CREAT | os.O_RDWR)
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(lock_fd)
+        return None
+    return lock_fd
+
+
+def _fsync_directory(directory: str) -> None:
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _insert_statement(dialect_name: str, rows: List[dict]):
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    return (
+        insert(_links)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=[_links.c.sort_id])
+        .returning(_links.c.sort_id)
+    )
+
+
+class LinkLog:
+    """
+    Local write-ahead log for accepting new links without the database.
+
+    `append` writes a record to the active segment and returns once it is
+    fsynced; concurrent appends share one fsync, `append_many` writes a
+    whole batch with one. Accepted links are served
+    from an in-memory index until `drain` rotates the segment, inserts its
+    records into the links table and deletes it. Segments left by a crash
+    are recovered on `open` and drained like any other. Draining inserts
+    with ON CONFLICT DO NOTHING, so replaying a segment twice is harmless.
+
+    Workers share the directory, each locks a `slot-N` subdirectory of its
+    own on `open` and adopts the segments of slots no running worker holds.
+    Links other workers accepted and not yet drained are found with
+    `lookup_peers`, which follows their segments.
+    """
+
+    def __init__(self, directory: Optional[str], batch_size: int = 1000):
+        """
+        Initialize the log without opening it yet.
+
+        Args:
+            directory (Optional[str]): Segment directory, None disables the log.
+            batch_size (int): Rows per INSERT when draining.
+        """
+        self.directory = directory
+        self.slot_directory: Optional[str] = None
+        self.batch_size = batch_size
+        self._index: Dict[str, str] = {}
+        # URL to short ID and the append ticket that has to be synced first
+        self._by_url: Dict[str, Tuple[str, int]] = {}
+        self._active: List[LinkRecord] = []
+        self._sealed: List[Tuple[str, List[LinkRecord]]] = []
+        self._fd: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+        self._sequence = 0
+        self._appended = 0
+        self._synced = 0
+        # Other slots' segments: read offset and short IDs, and their links
+        self._peer_segments: Dict[str, Tuple[int, List[str]]] = {}
+        self._peer_index: Dict[str, str] = {}
+        # Order: _sync_lock before _lock
+        self._lock = Lock()
+        self._sync_lock = Lock()
+        self._peer_lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the log is open and new links should be accepted into it."""
+        return self._fd is not None
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def open(self) -> None:
+        """
+        Lock a free slot, recover leftover segments and start a new one.
+
+        Raises:
+            AppException: If SHORT_ID_KEY is not set. A random short ID
+                taken by another link would only be noticed, and the link
+                dropped, when draining.
+        """
+        if not self.directory or self.enabled:
+            return
+        if short_id.short_id_allocator is None:
+            raise AppException("LINK_LOG_DIR requires SHORT_ID_KEY to be set")
+
+        os.makedirs(self.directory, exist_ok=True)
+        # Every held slot belongs to a running worker, a free one turns up
+        for number in count():
+            slot_directory = os.path.join(self.directory, f"{SLOT_PREFIX}{number}")
+            self._lock_fd = _try_lock(slot_directory)
+            if self._lock_fd is not None:
+                break
+        self.slot_directory = slot_directory
+
+        names = _segment_names(slot_directory)
+        self._sequence = _sequence(names[-1]) if names else 0
+        self._adopt_orphans()
+
+        for name in _segment_names(slot_directory):
+            path = os.path.join(slot_directory, name)
+            records, valid = read_segment(path)
+            if valid < os.path.getsize(path):
+                logger.warning(f"Truncating torn tail of link log segment {path}")
+                os.truncate(path, valid)
+            self._sealed.append((path, records))
+            self._remember(records)
+
+        self._fd = self._open_segment()
+        if self._index:
+            logger.info(f"Recovered {len(self._index)} undrained links from the log")
+
+    def _slot_directories(self) -> List[str]:
+        return [
+            os.path.join(self.directory, name)
+            for name in sorted(os.listdir(self.directory))
+            if name.startswith(SLOT_PREFIX)
+            and os.path.join(self.directory, name) != self.slot_directory
+        ]
+
+    def _adopt_orphans(self) -> None:
+        # Move the segments of slots no worker holds, e.g. after scaling
+        # down, into this slot to be recovered and drained with its own
+        for slot_directory in self._slot_directories():
+            lock_fd = _try_lock(slot_directory)
+            if lock_fd is None:
+                continue
+            try:
+                names = _segment_names(slot_directory)
+                for name in names:
+                    self._sequence += 1
+                    os.rename(
+                        os.path.join(slot_directory, name),
+                        os.path.join(
+                            self.slot_directory, _segment_name(self._sequence)
+                        ),
+                    )
+                if names:
+                    _fsync_directory(slot_directory)
+                    _fsync_directory(self.slot_directory)
+                    logger.info(
+                        f"Adopted {len(names)} link log segments of {slot_directory}"
+                    )
+            finally:
+                os.close(lock_fd)
+
+    def close(self) -> None:
+        """
+        Close the active segment and release the directory.
+
+        Undrained records stay on disk and are recovered by the next `open`.
+        """
+        with self._sync_lock, self._lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+                self._synced = self._appended
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+            self._index.clear()
+            self._by_url.clear()
+            self._active = []
+            self._sealed = []
+        with self._peer_lock:
+            self._peer_segments.clear()
+            self._peer_index.clear()
+
+    def _open_segment(self) -> int:
+        self._sequence += 1
+        path = os.path.join(self.slot_directory, _segment_name(self._sequence))
+        fd = os.open(path, os.O_CREAT | os.O_WRONLY | os.O_APPEND, 0o644)
+        # Make the new file itself durable
+        _fsync_directory(self.slot_directory)
+        return fd
+
+    def _remember(self, records: List[LinkRecord], ticket: int = 0) -> None:
+        for record in records:
+            self._index[record.sort_id] = record.original_url
+            self._by_url[record.original_url] = (record.sort_id, ticket)
+
+    def get(self, sort_id: str) -> Optional[str]:
+        """Return the original URL of an accepted, not yet drained link."""
+        return self._index.get(sort_id)
+
+    def find(self, original_url: str) -> Optional[str]:
+        """Return the short ID of an accepted, not yet drained link for a URL."""
+        entry = self._by_url.get(original_url)
+        # Not fsynced yet, handing it out would promise a link a crash loses
+        if entry is None or entry[1] > self._synced:
+            return None
+        return entry[0]
+
+    def lookup_peers(self, sort_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Find links other workers accepted and have not drained yet.
+
+        Reads what the other slots appended since the last call, so use it
+        only for short IDs this process and the database don't know.
+
+        Args:
+            sort_ids (Iterable[str]): The short IDs to look up.
+
+        Returns:
+            Dict[str, str]: The original URL per short ID found.
+        """
+        if not self.enabled:
+            return {}
+        with self._peer_lock:
+            drained = self._follow_peers()
+            found = {}
+            for sort_id in sort_ids:
+                original_url = self._peer_index.get(sort_id) or drained.get(sort_id)
+                if original_url is not None:
+                    found[sort_id] = original_url
+            return found
+
+    def _follow_peers(self) -> Dict[str, str]:
+        """Index new records of other slots, return those of drained segments."""
+        current = set()
+        for slot_directory in self._slot_directories():
+            try:
+                names = _segment_names(slot_directory)
+            except FileNotFoundError:
+                continue
+            for name in names:
+                path = os.path.join(slot_directory, name)
+                offset, sort_ids = self._peer_segments.get(path, (0, []))
+                try:
+                    # A frame still being written is read again next time
+                    records, valid = read_segment(path, offset)
+                except FileNotFoundError:
+                    continue
+                current.add(path)
+                for record in records:
+                    self._peer_index[record.sort_id] = record.original_url
+                    sort_ids.append(record.sort_id)
+                self._peer_segments[path] = (offset + valid, sort_ids)
+
+        drained = {}
+        for path in set(self._peer_segments) - current:
+            _, sort_ids = self._peer_segments.pop(path)
+            for sort_id in sort_ids:
+                original_url = self._peer_index.pop(sort_id, None)
+                if original_url is not None:
+                    drained[sort_id] = original_url
+                # Inserted by now, the short ID filter may not have them yet
+                link_filter.add(sort_id)
+        return drained
+
+    def append(self, sort_id: str, original_url: str) -> None:
+        """
+        Durably accept a new link.
+
+        Args:
+            sort_id (str): Its reserved short ID.
+            original_url (str): The normalized original URL.
+
+        Raises:
+            AppException: If the log is not open.
+        """
+        self.append_many([(sort_id, original_url)])
+
+    def append_many(self, links: List[Tuple[str, str]]) -> None:
+        """
+        Durably accept several new links with one write and one fsync.
+
+        Args:
+            links (List[Tuple[str, str]]): (sort_id, original_url) pairs.
+
+        Raises:
+            AppException: If the log is not open.
+        """
+        if not links:
+            return
+        accepted_at = datetime.now(timezone.utc)
+        records = [
+            LinkRecord(sort_id, original_url, accepted_at)
+            for sort_id, original_url in links
+        ]
+        frames = b"".join(encode_record(record) for record in records)
+        with self._lock:
+            if self._fd is None:
+                raise AppException("Link log is not open")
+            os.write(self._fd, frames)
+            self._active.extend(records)
+            self._appended += 1
+            ticket = self._appended
+            # Together with _active, a drain can't run in between and leave
+            # the records indexed after their rows were inserted
+            self._remember(records, ticket)
+
+        self._sync(ticket)
+
+    def _sync(self, ticket: int) -> None:
+        # Whoever fsyncs covers every append written before it
+        with self._sync_lock:
+            if self._synced >= ticket:
+                return
+            with self._lock:
+                fd, target = self._fd, self._appended
+            os.fsync(fd)
+            self._synced = target
+
+    def _rotate(self) -> None:
+        with self._sync_lock, self._lock:
+            if self._fd is None or not self._active:
+                return
+            os.fsync(self._fd)
+            os.close(self._fd)
+            path = os.path.join(self.slot_directory, _segment_name(self._sequence))
+            self._sealed.append((path, self._active))
+            self._active = []
+            self._fd = self._open_segment()
+            self._synced = self._appended
+
+    def drain(self, session: Session) -> int:
+        """
+        Insert the records of every sealed segment and delete the segments.
+
+        The active segment is sealed first. If the insert fails, the
+        segments are kept and retried by the next drain.
+
+        Args:
+            session (Session): Database session used for the insert.
+
+        Returns:
+            int: Number of records drained.
+
+        Raises:
+            DbException: If the insert fails.
+        """
+        self._rotate()
+        with self._lock:
+            sealed = list(self._sealed)
+        if not sealed:
+            return 0
+
+        records = [record for _, segment in sealed for record in segment]
+
+        try:
+            if records:
+                inserted = self._insert(session, records)
+                self._report_conflicts(session, records, inserted)
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error("Failed to drain the link log", exc_info=True)
+            raise DbException(f"Failed to drain the link log {str(e)}")
+
+        for path, _ in sealed:
+            os.unlink(path)
+        with self._lock:
+            self._sealed = self._sealed[len(sealed) :]
+            for record in records:
+                if self._index.get(record.sort_id) == record.original_url:
+                    del self._index[record.sort_id]
+                entry = self._by_url.get(record.original_url)
+                if entry is not None and entry[0] == record.sort_id:
+                    del self._by_url[record.original_url]
+
+        logger.debug(f"Drained {len(records)} links from {len(sealed)} log segments")
+        return len(records)
+
+    def _insert(self, session: Session, records: List[LinkRecord]) -> set:
+        dialect_name = session.get_bind().dialect.name
+        inserted = set()
+        for start in range(0, len(records), self.batch_size):
+            rows = [
+                {
+                    "id": uuid4(),
+                    "original_url": record.original_url,
+                    "sort_id": record.sort_id,
+                    "url_hash": url_hash(record.original_url),
+                    "created_at": record.created_at,
+                }
+                for record in records[start : start + self.batch_size]
+            ]
+            statement = _insert_statement(dialect_name, rows)
+            inserted.update(session.connection().execute(statement).scalars())
+        return inserted
+
+    def _report_conflicts(
+        self, session: Session, records: List[LinkRecord], inserted: set
+    ) -> None:
+        # Not inserted: replayed after a crash (same URL) or a taken short ID
+        skipped = {
+            record.sort_id: record.original_url
+            for record in records
+            if record.sort_id not in inserted
+        }
+        if not skipped:
+            return
+        statement = select(_links.c.sort_id, _links.c.original_url).where(
+            _links.c.sort_id.in_(list(skipped))
+        )
+        for sort_id, original_url in session.connection().execute(statement):
+            if skipped[sort_id] != original_url:
+                logger.error(
+                    f"Dropped logged link {sort_id}, the short ID belongs to "
+                    f"another link"
+                )
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of undrained links and segments."""
+        with self._lock:
+            return {
+                "undrained": len(self._index),
+                "active": len(self._active),
+                "sealed_segments": len(self._sealed),
+                "peer_undrained": len(self._peer_index),
+            }
+
+
+def drain_link_log() -> int:
+    """Drain the process-wide link log using a fresh session."""
+    with Session(db.engine) as session:
+        return link_log.drain(session)
+
+
+link_log = LinkLog(config.link_log_dir, batch_size=config.link_log_drain_batch)
+link_log_drainer = PeriodicTask(
+    name="link-log-drain",
+    interval=config.link_log_drain_interval,
+    func=drain_link_log,
+)
@@ -1,10 +1,65 @@
+import hashlib
+import json
+import os
+import tempfile
 import qrcode
-from typing import Optional, Any
+from io import BytesIO
+from threading import Lock
+from typing import Any, Dict, List, Literal, NamedTuple, Optional
+from xml.sax.saxutils import quoteattr
+from app.core.cache import ByteLRUCache
+from app.core.config import config
 from app.core.logger import get_logger
 from app.core.exception import AppException
 
 logger = get_logger(__name__)
 
+QrFormat = Literal["png", "svg"]
+
+MEDIA_TYPES: Dict[str, str] = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def pack_modules(modules: List[List[bool]]) -> bytes:
+    """
+    Pack a square module matrix into bytes.
+
+    The first byte is the side length, followed by the rows with 8 modules
+    per byte, most significant bit first and every row padded to a whole
+    byte. Dark modules are set bits.
+
+    Args:
+        modules (List[List[bool]]): Rows of modules, True for dark modules.
+
+    Returns:
+        bytes: The packed matrix.
+    """
+    size = len(modules)
+    packed = bytearray([size])
+    row_bytes = (size + 7) // 8
+    for row in modules:
+        bits = 0
+        for module in row:
+            bits = (bits << 1) | bool(module)
+        bits <<= row_bytes * 8 - size
+        packed += bits.to_bytes(row_bytes, "big")
+    return bytes(packed)
+
+
+def unpack_modules(packed: bytes) -> List[List[bool]]:
+    """Return the rows of a module matrix packed by `pack_modules`."""
+    size = packed[0]
+    row_bytes = (size + 7) // 8
+    rows = []
+    for offset in range(1, len(packed), row_bytes):
+        bits = int.from_bytes(packed[offset : offset + row_bytes], "big")
+        shift = row_bytes * 8 - 1
+        rows.append([bool(bits >> (shift - x) & 1) for x in range(size)])
+    return rows
+
+
+# Matrices of recent data, shared by every style and format of their images
+qr_matrix_cache = ByteLRUCache(config.qr_matrix_cache_bytes)
+
 
 class QrGeneratorService:
     """
@@ -32,6 +87,7 @@ class QrGeneratorService:
         Raises:
             AppException: If QR code initialization fails.
         """
+        self._version = version
         try:
             self._qr = qrcode.QRCode(
                 version=version,
@@ -67,3 +123,354 @@ class QrGeneratorService:
         except Exception as e:
             logger.error(f"Failed to generate QR code: {e}")
             raise AppException("Failed to generate QR code")
+
+    def generate_modules(self, data: Any) -> bytes:
+        """
+        Encode data into its packed module matrix, without border.
+
+        The matrix only depends on the data, error correction and version,
+        so matrices of string data are cached and shared by every size and
+        color of their images.
+
+        Args:
+            data (Any): The data to encode in the QR code.
+
+        Returns:
+            bytes: The matrix packed by `pack_modules`.
+
+        Raises:
+            AppException: If QR code generation fails.
+        """
+        key = None
+        if isinstance(data, str):
+            key = (data, self._qr.error_correction, self._version)
+            packed = qr_matrix_cache.get(key)
+            if packed is not None:
+                return packed
+
+        try:
+            self._qr.add_data(data=data)
+            self._qr.make(fit=True)
+            packed = pack_modules(self._qr.modules)
+        except Exception as e:
+            logger.error(f"Failed to generate QR code: {e}")
+            raise AppException("Failed to generate QR code")
+        if key is not None:
+            qr_matrix_cache.set(key, packed)
+        return packed
+
+    def generate_matrix(self, data: Any) -> List[List[bool]]:
+        """
+        Encode data into its module matrix, border included.
+
+        Args:
+            data (Any): The data to encode in the QR code.
+
+        Returns:
+            List[List[bool]]: Rows of modules, True for dark modules.
+
+        Raises:
+            AppException: If QR code generation fails.
+        """
+        modules = unpack_modules(self.generate_modules(data))
+        border = self._qr.border
+        width = len(modules) + 2 * border
+        blank = [[False] * width for _ in range(border)]
+        rows = [[False] * border + row + [False] * border for row in modules]
+        return blank + rows + [list(row) for row in blank]
+
+    def generate_png(
+        self, data: Any, back_color: str = "white", fill_color: str = "black"
+    ) -> bytes:
+        """
+        Generate a QR code as a 1-bit palette PNG.
+
+        The packed module matrix is unpacked into an 8-bit palette image,
+        framed by the border and scaled up by `box_size`, all inside PIL
+        instead of drawing every module, then encoded as a 1-bit PNG.
+
+        Args:
+            data (Any): The data to encode in the QR code.
+            back_color (str): Background color, or "transparent". Defaults to "white".
+            fill_color (str): Foreground color of the QR code. Defaults to "black".
+
+        Returns:
+            bytes: The PNG image.
+
+        Raises:
+            AppException: If QR code generation fails.
+        """
+        # Only PNG output needs PIL
+        from PIL import Image, ImageColor, ImageOps
+
+        packed = self.generate_modules(data)
+        try:
+            size = packed[0]
+            # The rows are packed the way PIL's raw 1-bit palette mode reads them
+            image = Image.frombytes("P", (size, size), packed[1:], "raw", "P;1")
+            transparent = back_color == "transparent"
+            back_rgb = (255, 255, 255) if transparent else ImageColor.getrgb(back_color)
+            fill_rgb = ImageColor.getrgb(fill_color)
+            image.putpalette([*back_rgb[:3], *fill_rgb[:3]])
+
+            border = self._qr.border
+            if border:
+                image = ImageOps.expand(image, border=border, fill=0)
+            pixels = (size + 2 * border) * self._qr.box_size
+            image = image.resize((pixels, pixels), Image.Resampling.NEAREST)
+            buffer = BytesIO()
+            if transparent:
+                image.save(buffer, "PNG", optimize=True, transparency=0)
+            else:
+                image.save(buffer, "PNG", optimize=True)
+            return buffer.getvalue()
+        except Exception as e:
+            logger.error(f"Failed to generate QR code: {e}")
+            raise AppException("Failed to generate QR code")
+
+    def generate_svg(
+        self, data: Any, back_color: str = "white", fill_color: str = "black"
+    ) -> bytes:
+        """
+        Generate a QR code as an SVG path, without PIL.
+
+        Each run of dark modules in a row becomes one rectangle of a single
+        path, in module units scaled by the viewBox.
+
+        Args:
+            data (Any): The data to encode in the QR code.
+            back_color (str): Background color, or "transparent". Defaults to "white".
+            fill_color (str): Foreground color of the QR code. Defaults to "black".
+
+        Returns:
+            bytes: The SVG document.
+
+        Raises:
+            AppException: If QR code generation fails.
+        """
+        modules = unpack_modules(self.generate_modules(data))
+        border = self._qr.border
+        size = len(modules) + 2 * border
+        pixels = size * self._qr.box_size
+
+        commands = []
+        for y, row in enumerate(modules, start=border):
+            x = 0
+            while x < len(row):
+                if not row[x]:
+                    x += 1
+                    continue
+                start = x
+                while x < len(row) and row[x]:
+                    x += 1
+                commands.append(f"M{start + border} {y}h{x - start}v1h{start - x}z")
+
+        background = (
+            ""
+            if back_color == "transparent"
+            else f'<rect width="100%" height="100%" fill={quoteattr(back_color)}/>'
+        )
+        svg = (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" '
+            f'height="{pixels}" viewBox="0 0 {size} {size}" '
+            f'shape-rendering="crispEdges">{background}'
+            f'<path fill={quoteattr(fill_color)} d="{"".join(commands)}"/></svg>'
+        )
+        return svg.encode("utf-8")
+
+
+class QrStyle(NamedTuple):
+    """Everything besides the data that changes the rendered image."""
+
+    back_color: str = "white"
+    fill_color: str = "black"
+    box_size: int = 10
+    border: int = 4
+    error_correction: int = qrcode.ERROR_CORRECT_H
+    version: Optional[int] = None
+
+
+def render_qr(data: str, style: QrStyle = QrStyle(), fmt: QrFormat = "png") -> bytes:
+    """
+    Render and encode a QR code.
+
+    Args:
+        data (str): The data to encode in the QR code.
+        style (QrStyle): Colors, sizes and error correction of the image.
+        fmt (QrFormat): "png" for a 1-bit palette PNG or "svg".
+
+    Returns:
+        bytes: The encoded image.
+
+    Raises:
+        AppException: If QR code generation fails.
+    """
+    service = QrGeneratorService(
+        version=style.version,
+        border=style.border,
+        box_size=style.box_size,
+        error_correction=style.error_correction,
+    )
+    generate = service.generate_svg if fmt == "svg" else service.generate_png
+    return generate(data=data, back_color=style.back_color, fill_color=style.fill_color)
+
+
+def render_qr_many(
+    data: List[str], style: QrStyle = QrStyle(), fmt: QrFormat = "png"
+) -> List[bytes]:
+    """Render and encode the QR codes of many values in one call."""
+    return [render_qr(value, style, fmt) for value in data]
+
+
+class QrImageCache:
+    """
+    Two-tier cache of rendered QR code images keyed by data, style and format.
+
+    The first tier is an in-memory LRU bounded by the total size of the
+    cached images. The optional second tier keeps every rendered image as
+    a file named after the digest of its key, so images survive restarts
+    and are shared by the workers of one host. A disk hit is promoted to
+    memory; a disk tier that can't be read or written only costs a render.
+    """
+
+    def __init__(self, max_bytes: int, directory: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes (int): Byte budget of the in-memory tier.
+            directory (Optional[str]): Directory of the disk tier, None
+                keeps images in memory only.
+        """
+        self.memory = ByteLRUCache(max_bytes)
+        self.directory = directory
+        self._lock = Lock()
+        self.disk_hits = 0
+        self.renders = 0
+
+    @staticmethod
+    def key_digest(data: str, style: QrStyle, fmt: QrFormat = "png") -> str:
+        """Return the hex digest naming the image of `data` in `style` and `fmt`."""
+        key = json.dumps([data, *style, fmt], separators=(",", ":"))
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def lookup(
+        self, data: str, style: QrStyle = QrStyle(), fmt: QrFormat = "png"
+    ) -> Optional[bytes]:
+        """
+        Return a cached image from memory or disk without rendering.
+
+        Args:
+            data (str): The data encoded in the QR code.
+            style (QrStyle): Colors, sizes and error correction of the image.
+            fmt (QrFormat): Image format, "png" or "svg".
+
+        Returns:
+            Optional[bytes]: The encoded image, or None on a miss.
+        """
+        key = (data, style, fmt)
+        image = self.memory.get(key)
+        if image is not None or not self.directory:
+            return image
+
+        image = self._read(self._path(self.key_digest(data, style, fmt), fmt))
+        if image is not None:
+            with self._lock:
+                self.disk_hits += 1
+            self.memory.set(key, image)
+        return image
+
+    def store(
+        self, data: str, style: QrStyle, fmt: QrFormat, image: bytes
+    ) -> None:
+        """
+        Cache a freshly rendered image in memory and on disk.
+
+        Args:
+            data (str): The data encoded in the QR code.
+            style (QrStyle): Colors, sizes and error correction of the image.
+            fmt (QrFormat): Image format, "png" or "svg".
+            image (bytes): The encoded image.
+        """
+        with self._lock:
+            self.renders += 1
+        self.memory.set((data, style, fmt), image)
+        if self.directory:
+            self._write(self._path(self.key_digest(data, style, fmt), fmt), image)
+
+    def get(
+        self, data: str, style: QrStyle = QrStyle(), fmt: QrFormat = "png"
+    ) -> bytes:
+        """
+        Return the encoded image of a QR code, rendering it on a miss.
+
+        Args:
+            data (str): The data to encode in the QR code.
+            style (QrStyle): Colors, sizes and error correction of the image.
+            fmt (QrFormat): Image format, "png" or "svg".
+
+        Returns:
+            bytes: The encoded image.
+
+        Raises:
+            AppException: If QR code generation fails.
+        """
+        image = self.lookup(data, style, fmt)
+        if image is None:
+            image = render_qr(data, style, fmt)
+            self.store(data, style, fmt, image)
+        return image
+
+    def _path(self, digest: str, fmt: QrFormat) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}.{fmt}")
+
+    def _read(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to read cached QR code {path}: {e}")
+            return None
+
+    def _write(self, path: str, image: bytes) -> None:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(image)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Failed to cache QR code {path} on disk: {e}")
+
+    def clear(self) -> None:
+        """Empty the in-memory tier and reset the counters."""
+        self.memory.clear()
+        with self._lock:
+            self.disk_hits = 0
+            self.renders = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the hit counters of both tiers and the overall hit ratio."""
+        memory = self.memory.stats()
+        with self._lock:
+            disk_hits, renders = self.disk_hits, self.renders
+        total = memory["hits"] + disk_hits + renders
+        return {
+            "memory": memory,
+            "disk_enabled": self.directory is not None,
+            "disk_hits": disk_hits,
+            "renders": renders,
+            "hit_ratio": (total - renders) / total if total else 0.0,
+        }
+
+
+qr_image_cache = QrImageCache(
+    max_bytes=config.qr_cache_bytes, directory=config.qr_cache_dir or None
+)
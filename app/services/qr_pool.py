@@ -0,0 +1,173 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from app.core.config import config
+from app.core.logger import get_logger
+from app.services.qr import (
+    QrFormat,
+    QrStyle,
+    qr_image_cache,
+    render_qr,
+    render_qr_many,
+)
+
+logger = get_logger(__name__)
+
+
+class QrRenderPool:
+    """
+    Bounded offload of CPU-bound QR code rendering.
+
+    With `workers` set, renders run in a pool of worker processes, so they
+    don't hold the GIL of the worker serving redirects. Without it they
+    run in the threadpool as before. Either way at most `max_pending`
+    render jobs are queued or running; further jobs are rejected right
+    away with a 503 instead of queueing up behind them.
+
+    Admission is counted on the event loop, `run` must be awaited from it.
+    """
+
+    def __init__(self, workers: int = 0, max_pending: int = 64):
+        """
+        Initialize the pool without starting worker processes yet.
+
+        Args:
+            workers (int): Worker processes, 0 renders in the threadpool.
+            max_pending (int): Render jobs queued or running at most.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def saturated(self) -> bool:
+        """Whether a new render job would be rejected."""
+        return self.pending >= self.max_pending
+
+    def start(self) -> None:
+        """Start the worker processes."""
+        if self.workers <= 0 or self._executor is not None:
+            return
+        # Forking a process that runs an event loop and threads is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"Started {self.workers} QR render processes")
+
+    def shutdown(self) -> None:
+        """Cancel queued render jobs and stop the worker processes."""
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+
+    def reject(self) -> HTTPException:
+        """Count a rejected job and return the 503 to raise for it."""
+        self.rejected += 1
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="QR code rendering is overloaded, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a render function in the pool.
+
+        Args:
+            func (Callable[..., Any]): A picklable module level function.
+            *args (Any): Its picklable arguments.
+
+        Returns:
+            Any: The result of the function.
+
+        Raises:
+            HTTPException: 503 if `max_pending` jobs are already pending.
+        """
+        if self.saturated:
+            raise self.reject()
+
+        self.pending += 1
+        try:
+            if self._executor is None:
+                return await run_in_threadpool(func, *args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the pool size, queue depth and rejected jobs."""
+        return {
+            "workers": self.workers if self._executor is not None else 0,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+async def get_qr(
+    data: str, style: QrStyle = QrStyle(), fmt: QrFormat = "png"
+) -> bytes:
+    """
+    Return a QR code image from the cache, rendering it in the pool on a miss.
+
+    Args:
+        data (str): The data to encode in the QR code.
+        style (QrStyle): Colors, sizes and error correction of the image.
+        fmt (QrFormat): Image format, "png" or "svg".
+
+    Returns:
+        bytes: The encoded image.
+
+    Raises:
+        HTTPException: 503 if the render pool is saturated.
+        AppException: If QR code generation fails.
+    """
+    image = qr_image_cache.lookup(data, style, fmt)
+    if image is None:
+        image = await qr_render_pool.run(render_qr, data, style, fmt)
+        qr_image_cache.store(data, style, fmt, image)
+    return image
+
+
+async def get_qr_many(
+    data: List[str], style: QrStyle = QrStyle(), fmt: QrFormat = "png"
+) -> List[bytes]:
+    """
+    Return many QR code images, rendering the misses as one pool job.
+
+    Args:
+        data (List[str]): The values to encode.
+        style (QrStyle): Colors, sizes and error correction of the images.
+        fmt (QrFormat): Image format, "png" or "svg".
+
+    Returns:
+        List[bytes]: The encoded images in the order of `data`.
+
+    Raises:
+        HTTPException: 503 if the render pool is saturated.
+        AppException: If QR code generation fails.
+    """
+    images = [qr_image_cache.lookup(value, style, fmt) for value in data]
+    missing = [value for value, image in zip(data, images) if image is None]
+    if missing:
+        rendered = iter(await qr_render_pool.run(render_qr_many, missing, style, fmt))
+        for index, image in enumerate(images):
+            if image is None:
+                images[index] = next(rendered)
+                qr_image_cache.store(data[index], style, fmt, images[index])
+    return images
+
+
+qr_render_pool = QrRenderPool(
+    workers=config.qr_render_workers, max_pending=config.qr_render_max_pending
+)
@@ -0,0 +1,229 @@
+import hashlib
+import string
+from itertools import chain
+from threading import Lock
+from typing import Iterator, Optional
+from sqlalchemy import Engine, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.db.schema import IdBlocks
+from app.core.config import config
+from app.core.exception import AppException
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+ALPHABET = string.ascii_letters + string.digits
+
+_blocks = IdBlocks.__table__
+
+
+class FeistelPermutation:
+    """
+    Keyed bijection of the integers in `[0, domain)`.
+
+    A balanced Feistel network over the smallest even bit width covering
+    the domain, with cycle walking to stay inside it. Distinct inputs
+    always give distinct outputs, and without the key consecutive inputs
+    give unrelated looking outputs.
+    """
+
+    def __init__(self, key: bytes, domain: int, rounds: int = 4):
+        """
+        Initialize the permutation.
+
+        Args:
+            key (bytes): Secret key, at most 64 bytes are used.
+            domain (int): Size of the permuted range.
+            rounds (int): Number of Feistel rounds. Defaults to 4.
+        """
+        self.key = key[:64]
+        self.domain = domain
+        self.rounds = rounds
+        self.half_bits = max(1, ((domain - 1).bit_length() + 1) // 2)
+        self._mask = (1 << self.half_bits) - 1
+
+    def _round(self, value: int, round_index: int) -> int:
+        digest = hashlib.blake2b(
+            value.to_bytes(8, "little") + bytes([round_index]),
+            key=self.key,
+            digest_size=8,
+        ).digest()
+        return int.from_bytes(digest, "little") & self._mask
+
+    def _encrypt(self, value: int) -> int:
+        left, right = value >> self.half_bits, value & self._mask
+        for i in range(self.rounds):
+            left, right = right, left ^ self._round(right, i)
+        return (left << self.half_bits) | right
+
+    def permute(self, value: int) -> int:
+        """
+        Map `value` to its position in the permutation.
+
+        Args:
+            value (int): Integer in `[0, domain)`.
+
+        Returns:
+            int: The permuted integer, also in `[0, domain)`.
+        """
+        value = self._encrypt(value)
+        # Cycle walking: the network covers a power of two >= domain
+        while value >= self.domain:
+            value = self._encrypt(value)
+        return value
+
+
+def encode_base62(value: int, length: int) -> str:
+    """Encode `value` as exactly `length` ALPHABET characters."""
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, len(ALPHABET))
+        chars.append(ALPHABET[digit])
+    return "".join(reversed(chars))
+
+
+def _reserve_statement(name: str, size: int):
+    return (
+        update(_blocks)
+        .where(_blocks.c.name == name)
+        .values(next_value=_blocks.c.next_value + size)
+        .returning(_blocks.c.next_value)
+    )
+
+
+def _create_counter_statement(dialect_name: str, name: str):
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    return insert(_blocks).values(name=name, next_value=0).on_conflict_do_nothing()
+
+
+class ShortIdAllocator:
+    """
+    Allocates unique short IDs from blocks of a database counter.
+
+    Each process reserves `block_size` counter values at a time with one
+    atomic UPDATE ... RETURNING in its own transaction, then hands them out
+    from memory. Counter values are unique across processes and the keyed
+    permutation maps them one-to-one onto base62 strings, so IDs never
+    collide with each other. The key must never change once IDs were
+    allocated with it.
+    """
+
+    def __init__(
+        self, key: str, block_size: int = 1000, length: int = 7, name: str = "links"
+    ):
+        """
+        Initialize the allocator without reserving a block yet.
+
+        Args:
+            key (str): Secret permutation key shared by every worker.
+            block_size (int): Counter values reserved per database round trip.
+            length (int): Length of the generated IDs. Defaults to 7.
+            name (str): Counter row in the id_blocks table.
+        """
+        self.block_size = block_size
+        self.length = length
+        self.name = name
+        self.permutation = FeistelPermutation(
+            key.encode("utf-8"), domain=len(ALPHABET) ** length
+        )
+        self._values: Iterator[int] = iter(())
+        self._lock = Lock()
+
+    def _take(self) -> Optional[int]:
+        with self._lock:
+            return next(self._values, None)
+
+    def _add_block(self, end: int) -> None:
+        logger.debug(f"Reserved short ID block ending at {end}")
+        with self._lock:
+            self._values = chain(self._values, range(end - self.block_size, end))
+
+    def encode(self, value: int) -> str:
+        """
+        Map a counter value to its short ID.
+
+        Args:
+            value (int): Reserved counter value.
+
+        Returns:
+            str: The short ID.
+
+        Raises:
+            AppException: If the counter ran past the ID space.
+        """
+        if value >= self.permutation.domain:
+            raise AppException("Short ID space exhausted")
+        return encode_base62(self.permutation.permute(value), self.length)
+
+    def reserve_block(self, engine: Engine) -> None:
+        """
+        Reserve the next block of counter values.
+
+        Args:
+            engine (Engine): Engine of the database holding the counter.
+        """
+        with engine.begin() as connection:
+            end = connection.execute(
+                _reserve_statement(self.name, self.block_size)
+            ).scalar_one_or_none()
+            if end is None:
+                connection.execute(
+                    _create_counter_statement(engine.dialect.name, self.name)
+                )
+                end = connection.execute(
+                    _reserve_statement(self.name, self.block_size)
+                ).scalar_one()
+        self._add_block(end)
+
+    async def reserve_block_async(self, engine: AsyncEngine) -> None:
+        """
+        Reserve the next block of counter values without blocking the loop.
+
+        Args:
+            engine (AsyncEngine): Engine of the database holding the counter.
+        """
+        async with engine.begin() as connection:
+            end = (
+                await connection.execute(_reserve_statement(self.name, self.block_size))
+            ).scalar_one_or_none()
+            if end is None:
+                await connection.execute(
+                    _create_counter_statement(engine.dialect.name, self.name)
+                )
+                end = (
+                    await connection.execute(
+                        _reserve_statement(self.name, self.block_size)
+                    )
+                ).scalar_one()
+        self._add_block(end)
+
+    def next_id(self, engine: Engine) -> str:
+        """
+        Return a new short ID, reserving a block first if needed.
+
+        Args:
+            engine (Engine): Engine of the database holding the counter.
+
+        Returns:
+            str: A short ID no other allocator call returns.
+        """
+        value = self._take()
+        while value is None:
+            self.reserve_block(engine)
+            value = self._take()
+        return self.encode(value)
+
+    async def next_id_async(self, engine: AsyncEngine) -> str:
+        """Async variant of `next_id`."""
+        value = self._take()
+        while value is None:
+            await self.reserve_block_async(engine)
+            value = self._take()
+        return self.encode(value)
+
+
+short_id_allocator: Optional[ShortIdAllocator] = (
+    ShortIdAllocator(config.short_id_key, block_size=config.short_id_block_size)
+    if config.short_id_key
+    else None
+)
@@ -0,0 +1,280 @@
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Dict, Iterator, Optional, Tuple
+from sqlmodel import Session, func, select
+from app.db.schema import Links
+from app.core.logger import get_logger
+from app.core.exception import AppException
+from app.core.config import config
+from app.core.tasks import PeriodicTask
+
+logger = get_logger(__name__)
+
+# Layout (little endian):
+#   header   magic, entry count, bucket count, watermark (epoch microseconds)
+#   buckets  one u64 entry offset per bucket, 0 marks an empty bucket
+#   entries  u8 key length, key, u32 url length, url
+MAGIC = b"SHRTSNP1"
+HEADER = struct.Struct("<8sQQq")
+BUCKET = struct.Struct("<Q")
+KEY_LENGTH = struct.Struct("<B")
+URL_LENGTH = struct.Struct("<I")
+
+# Rows inserted this long before the previous watermark are re-read by a
+# delta build, to catch transactions that committed late. Deltas follow
+# Links.inserted_at, which the database assigns, since imports and the link
+# log back-date created_at
+DELTA_OVERLAP = timedelta(seconds=30)
+
+
+def _bucket_of(key: bytes, bucket_count: int) -> int:
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "little") % bucket_count
+
+
+def _to_micros(value: Optional[datetime]) -> int:
+    if value is None:
+        return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1_000_000)
+
+
+def _from_micros(value: int) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromtimestamp(value / 1_000_000, tz=timezone.utc)
+
+
+class SnapshotReader:
+    """
+    Read-only view of a published redirect snapshot.
+
+    The file is memory mapped, so every worker process that opens the same
+    snapshot shares one copy of it in the OS page cache.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open and validate a snapshot file.
+
+        Args:
+            path (str): Path of the snapshot file.
+
+        Raises:
+            AppException: If the file is not a valid snapshot.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map.size() < HEADER.size:
+            raise AppException(f"Invalid redirect snapshot {path}")
+
+        magic, self.entry_count, self.bucket_count, watermark = HEADER.unpack_from(
+            self._map, 0
+        )
+        if magic != MAGIC or not self.bucket_count:
+            raise AppException(f"Invalid redirect snapshot {path}")
+        self.watermark = _from_micros(watermark)
+
+    def get(self, sort_id: str) -> Optional[str]:
+        """
+        Look up the original URL of a short ID.
+
+        Args:
+            sort_id (str): The short ID to look up.
+
+        Returns:
+            Optional[str]: The original URL, or None if not in the snapshot.
+        """
+        key = sort_id.encode("utf-8")
+        data = self._map
+        bucket = _bucket_of(key, self.bucket_count)
+        for _ in range(self.bucket_count):
+            (offset,) = BUCKET.unpack_from(data, HEADER.size + bucket * BUCKET.size)
+            if not offset:
+                return None
+
+            (key_length,) = KEY_LENGTH.unpack_from(data, offset)
+            key_start = offset + KEY_LENGTH.size
+            if data[key_start : key_start + key_length] == key:
+                url_start = key_start + key_length
+                (url_length,) = URL_LENGTH.unpack_from(data, url_start)
+                url_start += URL_LENGTH.size
+                return data[url_start : url_start + url_length].decode("utf-8")
+
+            bucket = (bucket + 1) % self.bucket_count
+        return None
+
+    def items(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over every (sort_id, original_url) pair in the snapshot."""
+        data = self._map
+        for bucket in range(self.bucket_count):
+            (offset,) = BUCKET.unpack_from(data, HEADER.size + bucket * BUCKET.size)
+            if not offset:
+                continue
+
+            (key_length,) = KEY_LENGTH.unpack_from(data, offset)
+            key_start = offset + KEY_LENGTH.size
+            url_start = key_start + key_length
+            (url_length,) = URL_LENGTH.unpack_from(data, url_start)
+            url_start += URL_LENGTH.size
+            yield (
+                data[key_start : key_start + key_length].decode("utf-8"),
+                data[url_start : url_start + url_length].decode("utf-8"),
+            )
+
+
+def write_snapshot(
+    path: str, links: Dict[str, str], watermark: Optional[datetime]
+) -> None:
+    """
+    Write a snapshot file and atomically publish it at `path`.
+
+    The file is written next to `path`, fsynced and renamed over it, so
+    readers see either the old or the new snapshot, never a partial one.
+
+    Args:
+        path (str): Where to publish the snapshot.
+        links (Dict[str, str]): Mapping of sort_id to original URL.
+        watermark (Optional[datetime]): Newest inserted_at included.
+    """
+    # Keep the table at most half full so probe sequences stay short
+    bucket_count = max(16, len(links) * 2)
+    buckets = [0] * bucket_count
+    entries = bytearray()
+    entries_start = HEADER.size + bucket_count * BUCKET.size
+
+    for sort_id, original_url in links.items():
+        key = sort_id.encode("utf-8")
+        url = original_url.encode("utf-8")
+        bucket = _bucket_of(key, bucket_count)
+        while buckets[bucket]:
+            bucket = (bucket + 1) % bucket_count
+        buckets[bucket] = entries_start + len(entries)
+        entries += KEY_LENGTH.pack(len(key)) + key + URL_LENGTH.pack(len(url)) + url
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(links), bucket_count, _to_micros(watermark)))
+            f.write(struct.pack(f"<{bucket_count}Q", *buckets))
+            f.write(entries)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def build_snapshot(session: Session, path: str, full: bool = False) -> int:
+    """
+    Build the redirect snapshot from the links table and publish it.
+
+    Unless `full` is set, an existing snapshot at `path` is reused and only
+    links inserted since its watermark are read from the database. A delta
+    that ends up with more links than the table holds falls back to a full
+    build, which drops deleted links. Links whose original URL changed are
+    only picked up by a full build.
+
+    Args:
+        session (Session): Database session used to read the links.
+        path (str): Where to publish the snapshot.
+        full (bool): Rebuild from every row instead of a delta.
+
+    Returns:
+        int: Number of links in the published snapshot.
+    """
+    links: Dict[str, str] = {}
+    since: Optional[datetime] = None
+    if not full and os.path.exists(path):
+        previous = SnapshotReader(path)
+        links.update(previous.items())
+        since = previous.watermark
+
+    statement = select(Links.sort_id, Links.original_url, Links.inserted_at)
+    if since is not None:
+        statement = statement.where(Links.inserted_at >= since - DELTA_OVERLAP)
+
+    watermark = since
+    for sort_id, original_url, inserted_at in session.exec(
+        statement.execution_options(yield_per=10_000)
+    ):
+        links[sort_id] = original_url
+        if inserted_at is not None:
+            inserted_at = _from_micros(_to_micros(inserted_at))
+            if watermark is None or inserted_at > watermark:
+                watermark = inserted_at
+
+    # Counted after the delta, so links inserted meanwhile can't pass for
+    # deletions, at worst they hide one until the next build
+    if since is not None:
+        stored = session.exec(select(func.count(Links.id))).one()
+        if stored < len(links):
+            logger.info("Links were deleted since the last snapshot, rebuilding it")
+            return build_snapshot(session, path, full=True)
+
+    write_snapshot(path, links, watermark)
+    logger.info(f"Published redirect snapshot with {len(links)} links at {path}")
+    return len(links)
+
+
+class RedirectSnapshot:
+    """
+    Process-wide handle on the published redirect snapshot.
+
+    `reload()` swaps in a newly published file; lookups that are already
+    running keep using the previous mapping until they finish.
+    """
+
+    def __init__(self, path: Optional[str]):
+        """
+        Initialize the handle without opening the file yet.
+
+        Args:
+            path (Optional[str]): Snapshot path, None disables the snapshot.
+        """
+        self.path = path
+        self._reader: Optional[SnapshotReader] = None
+        self._lock = Lock()
+
+    def get(self, sort_id: str) -> Optional[str]:
+        """Look up a short ID, None if it is unknown or no snapshot is open."""
+        reader = self._reader
+        if reader is None:
+            return None
+        return reader.get(sort_id)
+
+    def reload(self) -> None:
+        """Open the snapshot again if a new file was published."""
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        stat = os.stat(self.path)
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if self._reader is not None and self._reader.identity == identity:
+                return
+            self._reader = SnapshotReader(self.path)
+            logger.info(
+                f"Loaded redirect snapshot with {self._reader.entry_count} links"
+            )
+
+
+redirect_snapshot = RedirectSnapshot(config.redirect_snapshot_path)
+snapshot_reloader = PeriodicTask(
+    name="redirect-snapshot-reload",
+    interval=config.redirect_snapshot_reload_interval,
+    func=redirect_snapshot.reload,
+)
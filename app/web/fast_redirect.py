@@ -0,0 +1,110 @@
+import re
+from functools import lru_cache
+from typing import Callable, List, Optional, Set, Tuple
+from urllib.parse import quote
+from fastapi import Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.core.exception import AppException, app_exception_handler
+from app.db.init import async_db
+from app.services.link import AsyncLinkService
+from app.web.redirect import redirect_headers, redirect_status_code
+
+# Only well-formed IDs take the fast path, anything else (wrong length,
+# other characters) falls through to the regular route and its validation
+SHORT_ID_PATH = re.compile(r"/[A-Za-z0-9]{7}")
+
+# Same characters RedirectResponse leaves unquoted in the Location header
+LOCATION_SAFE = ":/%#?=@[]!$&'()*+,;"
+
+
+@lru_cache(maxsize=4096)
+def location_headers(url: str) -> List[Tuple[bytes, bytes]]:
+    """
+    Build the raw redirect headers for a URL, cached per URL.
+
+    Args:
+        url (str): The redirect target.
+
+    Returns:
+        List[Tuple[bytes, bytes]]: Raw headers identical to RedirectResponse.
+    """
+    location = quote(url, safe=LOCATION_SAFE).encode("latin-1")
+    return [(b"content-length", b"0"), (b"location", location)]
+
+
+def _default_session_factory() -> AsyncSession:
+    return AsyncSession(async_db.engine)
+
+
+class FastRedirectMiddleware:
+    """
+    Pure ASGI handler for `GET /{short_id}` in front of the FastAPI app.
+
+    Skips routing, dependency injection, pydantic validation and response
+    objects for well-formed short IDs while producing the same status and
+    headers as `redirect_short_id`. Every other request is passed through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        session_factory: Callable[[], AsyncSession] = _default_session_factory,
+    ):
+        """
+        Wrap an ASGI application.
+
+        Args:
+            app (ASGIApp): The application to pass other requests to.
+            session_factory (Callable[[], AsyncSession]): Creates the
+                database session used for a redirect.
+        """
+        self.app = app
+        self.session_factory = session_factory
+        self._reserved: Optional[Set[str]] = None
+
+    def _reserved_paths(self, scope: Scope) -> Set[str]:
+        # Static routes that happen to look like a short ID keep priority
+        if self._reserved is None:
+            routes = getattr(scope.get("app"), "routes", None) or getattr(
+                self.app, "routes", []
+            )
+            self._reserved = {
+                route.path for route in routes if "{" not in getattr(route, "path", "{")
+            }
+        return self._reserved
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            # HEAD goes to the app like any other method, the route answers
+            # it with 405 and a preview bot's HEAD must not count a click
+            or scope["method"] != "GET"
+            or not SHORT_ID_PATH.fullmatch(scope["path"])
+            or scope["path"] in self._reserved_paths(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            async with self.session_factory() as session:
+                original_url = await AsyncLinkService(session=session).get_original_link(
+                    sort_id=scope["path"][1:]
+                )
+        except AppException as exc:
+            response = app_exception_handler(Request(scope), exc)
+            await response(scope, receive, send)
+            return
+
+        headers = location_headers(original_url) + [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in redirect_headers(original_url).items()
+        ]
+        await send(
+            {
+                "type": "http.response.start",
+                "status": redirect_status_code(),
+                "headers": headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": b""})
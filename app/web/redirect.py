@@ -0,0 +1,35 @@
+from typing import Dict
+from app.core.config import config
+
+
+def redirect_status_code() -> int:
+    """Return the configured redirect status, 301, 302 or 307."""
+    return int(config.redirect_status_code)
+
+
+def redirect_headers(original_url: str) -> Dict[str, str]:
+    """
+    Build the cache headers sent with a short ID redirect.
+
+    Without REDIRECT_MAX_AGE or REDIRECT_S_MAXAGE no Cache-Control header is
+    sent. Otherwise hits are marked public for the configured lifetimes so
+    an edge cache can answer them, and redirects to the 404 page are marked
+    `no-store` because the short ID may be created later.
+
+    Args:
+        original_url (str): The redirect target returned by the link service.
+
+    Returns:
+        Dict[str, str]: Headers to add to the redirect response.
+    """
+    if config.redirect_max_age is None and config.redirect_s_maxage is None:
+        return {}
+    if original_url == f"{config.frontend_url}/404":
+        return {"cache-control": "no-store"}
+
+    directives = ["public"]
+    if config.redirect_max_age is not None:
+        directives.append(f"max-age={config.redirect_max_age}")
+    if config.redirect_s_maxage is not None:
+        directives.append(f"s-maxage={config.redirect_s_maxage}")
+    return {"cache-control": ", ".join(directives)}
@@ -1,33 +1,37 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter
 from fastapi.responses import RedirectResponse
-from app.db.init import SessionDep
+from app.db.init import AsyncSessionDep
 from app.models.input import SortIDInput
-from app.services.link import LinkService
+from app.services.link import AsyncLinkService
+from app.web.redirect import redirect_headers, redirect_status_code
 
 id_route = APIRouter()
 
 
 @id_route.get("/{short_id}")
-def redirect_short_id(short_id: str, session: SessionDep):
+async def redirect_short_id(short_id: str, session: AsyncSessionDep):
     """
     Redirect to the original URL for a given short ID.
 
     Validates the short ID, retrieves the original URL from the database,
-    and performs a permanent redirect.
+    and redirects with the configured status and cache headers.
 
     Args:
         short_id (str): The short ID to redirect from.
-        session: Database session provided by the dependency.
+        session: Async database session provided by the dependency.
 
     Returns:
-        RedirectResponse: HTTP 301 redirect to the original URL or 404 page.
+        RedirectResponse: HTTP 301/302/307 redirect to the original URL or
+            404 page.
 
     Raises:
         ValidationError: If the short ID format is invalid.
     """
     id_input = SortIDInput(sort_id=short_id)
-    link_service = LinkService(session=session)
-    original_url = link_service.get_original_link(sort_id=id_input.sort_id)
+    link_service = AsyncLinkService(session=session)
+    original_url = await link_service.get_original_link(sort_id=id_input.sort_id)
     return RedirectResponse(
-        url=original_url, status_code=status.HTTP_301_MOVED_PERMANENTLY
+        url=original_url,
+        status_code=redirect_status_code(),
+        headers=redirect_headers(original_url),
     )
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch
 from app.db.schema import Links
 from sqlmodel import select
 
@@ -31,3 +32,96 @@ def test_create_short_link_localhost(client):
     """Test creating short link with localhost URL."""
     response = client.post("/api/link", json={"link": "http://localhost"})
     assert response.status_code == 422
+
+
+def test_create_short_link_private_host(client):
+    """Test a hostname resolving to a private address is rejected."""
+    addresses = [(2, 1, 6, "", ("10.0.0.5", 0))]
+    with patch("socket.getaddrinfo", return_value=addresses):
+        response = client.post(
+            "/api/link",
+            json={"link": "http://internal.example.com"},
+            headers={"X-Forwarded-For": "198.51.100.22"},
+        )
+    assert response.status_code == 422
+    assert "private" in response.json()["detail"].lower()
+
+
+def test_create_short_link_idempotency_key_replays(client, session):
+    """Test a retried request with the same Idempotency-Key creates nothing new."""
+    headers = {"Idempotency-Key": "retry-1", "X-Forwarded-For": "198.51.100.20"}
+    payload = {"link": "https://idempotent.com/a"}
+    first = client.post("/api/link", json=payload, headers=headers)
+
+    with patch("app.api.routes.link.link_group_commit") as service, patch(
+        "app.api.routes.link.render_qr_base64"
+    ) as render:
+        second = client.post("/api/link", json=payload, headers=headers)
+        service.create.assert_not_called()
+        render.assert_not_called()
+
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    statement = select(Links).where(Links.original_url == "https://idempotent.com/a")
+    assert len(session.exec(statement).all()) == 1
+
+
+def test_create_short_link_idempotency_key_reused_for_other_url(client):
+    """Test an Idempotency-Key can't be reused for a different URL."""
+    headers = {"Idempotency-Key": "retry-2", "X-Forwarded-For": "198.51.100.21"}
+    client.post("/api/link", json={"link": "https://idempotent.com/b"}, headers=headers)
+    response = client.post(
+        "/api/link", json={"link": "https://idempotent.com/c"}, headers=headers
+    )
+    assert response.status_code == 422
+
+
+def test_create_short_link_replays_skip_rate_limit(client):
+    """Test retries with a stored Idempotency-Key don't use up the rate limit."""
+    address = {"X-Forwarded-For": "198.51.100.24"}
+    headers = {**address, "Idempotency-Key": "retry-3"}
+    payload = {"link": "https://idempotent.com/d", "qr": False}
+    for _ in range(8):
+        assert client.post("/api/link", json=payload, headers=headers).status_code == 200
+
+    # Only the first request counted
+    other = {"link": "https://idempotent.com/e", "qr": False}
+    for _ in range(4):
+        assert client.post("/api/link", json=other, headers=address).status_code == 200
+    assert client.post("/api/link", json=other, headers=address).status_code == 429
+
+
+def test_create_short_link_without_inline_qr(client):
+    """Test the QR code is not rendered when the client fetches it by URL."""
+    with patch("app.api.routes.link.render_qr_base64") as render:
+        response = client.post(
+            "/api/link",
+            json={"link": "https://noqr.com/", "qr": False},
+            headers={"X-Forwarded-For": "198.51.100.22"},
+        )
+        render.assert_not_called()
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert "qr" not in data
+    sort_id = data["link"].split("/")[-1]
+    assert data["qr_url"].endswith(f"/api/qr/{sort_id}")
+
+
+def test_create_short_link_qr_saturated(client, session):
+    """Test nothing is created when the inline QR code can't be rendered."""
+    headers = {"X-Forwarded-For": "198.51.100.23"}
+    with patch("app.services.qr_pool.qr_render_pool.pending", 10**6):
+        response = client.post(
+            "/api/link", json={"link": "https://busyqr.com/"}, headers=headers
+        )
+        skipped = client.post(
+            "/api/link",
+            json={"link": "https://busyqr.com/noqr", "qr": False},
+            headers=headers,
+        )
+
+    assert response.status_code == 503
+    statement = select(Links).where(Links.original_url == "https://busyqr.com/")
+    assert session.exec(statement).first() is None
+    assert skipped.status_code == 200
@@ -0,0 +1,78 @@
+import json
+import pytest
+from app.db.schema import Links
+from sqlmodel import select
+
+
+def _post_batch(client, payload, address):
+    """Post a batch from its own client address to stay under the rate limit."""
+    return client.post(
+        "/api/links/batch", json=payload, headers={"X-Forwarded-For": address}
+    )
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_create_batch_links(client, session):
+    """Test a batch returns one NDJSON line per URL, in request order."""
+    urls = [
+        "https://batch.com/a",
+        "invalid-url",
+        "https://BATCH.com/b",
+        "https://batch.com/a",
+    ]
+    response = _post_batch(client, {"links": urls}, "198.51.100.1")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = _lines(response)
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert [line["status"] for line in lines] == [
+        "success",
+        "failed",
+        "success",
+        "success",
+    ]
+    assert lines[0]["link"] == lines[3]["link"]
+    assert "qr" not in lines[0]
+    assert lines[1]["message"]
+
+    sort_id = lines[2]["link"].split("/")[-1]
+    link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+    assert link.original_url == "https://batch.com/b"
+
+
+def test_create_batch_links_with_qr(client):
+    """Test QR codes are only rendered when requested."""
+    response = _post_batch(
+        client, {"links": ["https://batch-qr.com"], "qr": True}, "198.51.100.2"
+    )
+
+    (line,) = _lines(response)
+    assert line["status"] == "success"
+    assert line["qr"]
+
+
+def test_create_batch_links_in_chunks(client, monkeypatch):
+    """Test large batches are processed and streamed chunk by chunk."""
+    import app.api.routes.link as link_routes
+
+    monkeypatch.setattr(link_routes, "BATCH_CHUNK_SIZE", 2)
+    urls = [f"https://batch-chunk.com/{i}" for i in range(5)]
+    response = _post_batch(client, {"links": urls}, "198.51.100.3")
+
+    lines = _lines(response)
+    assert [line["index"] for line in lines] == list(range(5))
+    assert len({line["link"] for line in lines}) == 5
+
+
+@pytest.mark.parametrize("links", [[], ["https://a.com"] * 3])
+def test_create_batch_links_size_limits(client, monkeypatch, links):
+    """Test empty and oversized batches are rejected before any work."""
+    from app.core.config import config
+
+    monkeypatch.setattr(config, "link_batch_max", 2)
+    response = _post_batch(client, {"links": links}, "198.51.100.4")
+    assert response.status_code == 422
@@ -0,0 +1,78 @@
+from sqlmodel import select
+from app.db.schema import Links
+from app.services.link import link_cache
+
+
+def _expand(client, payload, address):
+    """Post from its own client address to stay under the rate limit."""
+    return client.post(
+        "/api/links/expand", json=payload, headers={"X-Forwarded-For": address}
+    )
+
+
+def _add_link(session, sort_id, url, clicks=0):
+    session.add(Links(original_url=url, sort_id=sort_id, clicks=clicks))
+    session.commit()
+
+
+def test_expand_links(client, session):
+    """Test each requested ID gets an entry, in request order."""
+    _add_link(session, "expand1", "https://expand.com/1", clicks=4)
+    _add_link(session, "expand2", "https://expand.com/2")
+
+    response = _expand(
+        client,
+        {"sort_ids": ["expand2", "short", "expand1", "nope999", "expand2"]},
+        "198.51.100.30",
+    )
+
+    assert response.status_code == 200
+    links = response.json()["data"]["links"]
+    assert [link["status"] for link in links] == [
+        "found",
+        "invalid",
+        "found",
+        "not_found",
+        "found",
+    ]
+    assert links[0]["original_url"] == "https://expand.com/2"
+    assert links[0]["link"].endswith("/expand2")
+    assert links[2]["clicks"] == 4
+    assert links[2]["created_at"] is not None
+    assert links[1]["message"]
+
+
+def test_expand_links_does_not_count_clicks(client, session):
+    """Test expanding a link leaves its click counter alone."""
+    _add_link(session, "expand3", "https://expand.com/3")
+
+    _expand(client, {"sort_ids": ["expand3"]}, "198.51.100.31")
+
+    link = session.exec(select(Links).where(Links.sort_id == "expand3")).one()
+    session.refresh(link)
+    assert link.clicks == 0
+    assert link.last_accessed_at is None
+
+
+def test_expand_links_without_metadata_uses_cache(client, session):
+    """Test URL-only lookups are answered from the redirect cache."""
+    link_cache.set("expand4", "https://expand.com/cached")
+
+    response = _expand(
+        client, {"sort_ids": ["expand4"], "metadata": False}, "198.51.100.32"
+    )
+
+    (link,) = response.json()["data"]["links"]
+    assert link["status"] == "found"
+    assert link["original_url"] == "https://expand.com/cached"
+    assert "clicks" not in link
+    link_cache.invalidate("expand4")
+
+
+def test_expand_links_limit(client, monkeypatch):
+    """Test requests above LINK_EXPAND_MAX IDs are rejected."""
+    from app.core.config import config
+
+    monkeypatch.setattr(config, "link_expand_max", 2)
+    response = _expand(client, {"sort_ids": ["a"] * 3}, "198.51.100.33")
+    assert response.status_code == 422
@@ -0,0 +1,95 @@
+from unittest.mock import patch
+from sqlmodel import select
+from app.db.schema import Links
+from app.services.qr import render_qr
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _add_link(session, sort_id, url):
+    session.add(Links(original_url=url, sort_id=sort_id))
+    session.commit()
+
+
+def test_get_qr_code(client, session):
+    """Test the QR code of a link is served as a cacheable PNG."""
+    _add_link(session, "qrcode1", "https://qr.com/1")
+
+    response = client.get("/api/qr/qrcode1")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content.startswith(PNG_SIGNATURE)
+    assert response.content == render_qr("http://testserver/qrcode1")
+    assert "immutable" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_get_qr_code_does_not_count_clicks(client, session):
+    """Test fetching the QR code is not a visit of the link."""
+    _add_link(session, "qrcode2", "https://qr.com/2")
+
+    client.get("/api/qr/qrcode2")
+
+    session.expire_all()
+    link = session.exec(select(Links).where(Links.sort_id == "qrcode2")).one()
+    assert link.clicks == 0
+
+
+def test_get_qr_code_not_modified(client, session):
+    """Test a matching If-None-Match is answered without rendering."""
+    _add_link(session, "qrcode3", "https://qr.com/3")
+    etag = client.get("/api/qr/qrcode3").headers["etag"]
+
+    with patch("app.api.routes.qr.get_qr") as get_qr:
+        response = client.get(
+            "/api/qr/qrcode3", headers={"If-None-Match": f'"other", W/{etag}'}
+        )
+        get_qr.assert_not_called()
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
+def test_get_qr_code_unknown_link(client):
+    """Test unknown and invalid short IDs get a 404."""
+    assert client.get("/api/qr/nolink1").status_code == 404
+    assert client.get("/api/qr/short").status_code == 404
+
+
+def test_get_qr_code_svg(client, session):
+    """Test the SVG format is selected by query parameter or Accept header."""
+    _add_link(session, "qrcode4", "https://qr.com/4")
+
+    by_query = client.get("/api/qr/qrcode4?format=svg")
+    by_accept = client.get(
+        "/api/qr/qrcode4", headers={"Accept": "image/svg+xml, image/png;q=0.8"}
+    )
+    png = client.get("/api/qr/qrcode4", headers={"Accept": "image/*"})
+
+    assert by_query.headers["content-type"] == "image/svg+xml"
+    assert by_query.content.startswith(b"<svg")
+    assert by_accept.content == by_query.content
+    assert by_accept.headers["vary"] == "Accept"
+    assert by_accept.headers["etag"] == by_query.headers["etag"]
+    assert png.headers["content-type"] == "image/png"
+    assert png.headers["etag"] != by_query.headers["etag"]
+
+
+def test_get_qr_code_unknown_format(client, session):
+    """Test unsupported formats are rejected."""
+    _add_link(session, "qrcode5", "https://qr.com/5")
+    assert client.get("/api/qr/qrcode5?format=gif").status_code == 422
+
+
+def test_get_qr_code_saturated(client, session):
+    """Test an uncached QR code is refused with a 503 while rendering is saturated."""
+    _add_link(session, "qrcode6", "https://qr.com/6")
+
+    with patch("app.services.qr_pool.qr_render_pool.pending", 10**6):
+        response = client.get("/api/qr/qrcode6")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,100 @@
+"""
+Compare size and render time of the QR code output formats.
+
+Renders the same short links as the drawn RGB PNG that QR codes used to be
+served as, the 1-bit palette PNG and the SVG path, in black on white and
+in color, and prints a JSON report with bytes and milliseconds per image.
+Every format starts with an empty module matrix cache; "png-restyled"
+renders another size of links whose matrix is already cached.
+
+Not collected by pytest. Run with:
+
+    python -m tests.benchmarks.bench_qr --links 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from io import BytesIO
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("ENV", "test")
+os.environ.setdefault("FRONTEND_URL", "http://testserver")
+os.environ.setdefault("DEBUG", "false")
+
+from app.services.qr import (  # noqa: E402
+    QrGeneratorService,
+    QrStyle,
+    qr_matrix_cache,
+    render_qr,
+)
+
+STYLES = {
+    "black": QrStyle(),
+    "color": QrStyle(fill_color="#1e40af"),
+}
+
+
+def render_drawn_png(data: str, style: QrStyle) -> bytes:
+    """Render through qrcode's per-module PIL drawing and save as PNG."""
+    image = QrGeneratorService(
+        border=style.border,
+        box_size=style.box_size,
+        error_correction=style.error_correction,
+    ).generate_qr_image(data, back_color=style.back_color, fill_color=style.fill_color)
+    buffer = BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+RENDERERS = {
+    "png-drawn": render_drawn_png,
+    "png": lambda data, style: render_qr(data, style, "png"),
+    "svg": lambda data, style: render_qr(data, style, "svg"),
+}
+
+
+def render_restyled(data: str, style: QrStyle) -> bytes:
+    """Render a PNG at another box size, reusing the cached matrix."""
+    return render_qr(data, style._replace(box_size=style.box_size // 2), "png")
+
+
+def measure(render, links: list, style: QrStyle) -> dict:
+    """Render every link once and summarize sizes and timings."""
+    sizes, timings = [], []
+    for data in links:
+        start = time.perf_counter()
+        image = render(data, style)
+        timings.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(image))
+    return {
+        "mean_bytes": round(statistics.fmean(sizes)),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "p50_ms": round(statistics.median(timings), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--links", type=int, default=200)
+    args = parser.parse_args()
+
+    links = [f"http://testserver/bq{i:05d}" for i in range(args.links)]
+    # Warm up imports and encoders
+    for render in RENDERERS.values():
+        render(links[0], QrStyle())
+
+    report = {}
+    for style_name, style in STYLES.items():
+        report[style_name] = {}
+        for name, render in RENDERERS.items():
+            qr_matrix_cache.clear()
+            report[style_name][name] = measure(render, links, style)
+        report[style_name]["png-restyled"] = measure(render_restyled, links, style)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compare redirect throughput of the FastAPI route and the raw ASGI fast path.
+
+Not collected by pytest. Run with:
+
+    python -m tests.benchmarks.bench_redirect --requests 5000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+_db_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+_db_file.close()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_file.name}")
+os.environ.setdefault("ENV", "test")
+os.environ.setdefault("FRONTEND_URL", "http://testserver")
+os.environ.setdefault("DEBUG", "false")
+
+import httpx  # noqa: E402
+from sqlmodel import Session, SQLModel  # noqa: E402
+from app.db.init import async_db, db  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.link import LinkService  # noqa: E402
+from app.web.fast_redirect import FastRedirectMiddleware  # noqa: E402
+
+
+def seed(count: int) -> list:
+    """Create `count` links and return their short IDs."""
+    SQLModel.metadata.create_all(db.engine)
+    with Session(db.engine) as session:
+        service = LinkService(session=session)
+        return [
+            service.generate_new_link(f"https://example.com/{i}").split("/")[-1]
+            for i in range(count)
+        ]
+
+
+async def run(asgi_app, sort_ids: list, total: int, concurrency: int) -> float:
+    """Issue `total` redirects and return the achieved requests per second."""
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        queue = iter(range(total))
+
+        async def worker():
+            for i in queue:
+                response = await client.get(f"/{sort_ids[i % len(sort_ids)]}")
+                assert response.status_code == 301
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - start)
+
+
+async def compare(sort_ids: list, total: int, concurrency: int) -> None:
+    """Benchmark the route and the fast path on the same event loop."""
+    try:
+        for name, asgi_app in (
+            ("route", app),
+            ("fast path", FastRedirectMiddleware(app)),
+        ):
+            rate = await run(asgi_app, sort_ids, total, concurrency)
+            print(f"{name:>10}: {rate:,.0f} req/s")
+    finally:
+        await async_db.engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--links", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    sort_ids = seed(args.links)
+    try:
+        asyncio.run(compare(sort_ids, args.requests, args.concurrency))
+    finally:
+        os.unlink(_db_file.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Tests for the load test helpers."""
+
+import pytest
+from tests.benchmarks.load import parse_mix, summarize
+
+
+def test_parse_mix():
+    """Test operations left out of the mix get no weight."""
+    assert parse_mix("hit=90, miss=10") == {"hit": 90.0, "miss": 10.0, "create": 0.0}
+
+
+@pytest.mark.parametrize("value", ["hit=0", "read=5", ""])
+def test_parse_mix_rejects_invalid(value):
+    """Test unknown operations and empty mixes are rejected."""
+    with pytest.raises(ValueError):
+        parse_mix(value)
+
+
+def test_summarize_percentiles():
+    """Test throughput and percentiles are reported in milliseconds."""
+    latencies = [i / 1000 for i in range(1, 101)]
+    summary = summarize(latencies, errors=2, duration=2.0)
+
+    assert summary["requests"] == 100
+    assert summary["errors"] == 2
+    assert summary["throughput_rps"] == 50.0
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+
+
+def test_summarize_without_requests():
+    """Test an operation without requests has no percentiles."""
+    summary = summarize([], errors=0, duration=1.0)
+    assert summary["requests"] == 0
+    assert summary["p95_ms"] is None
@@ -2,9 +2,12 @@ import pytest
 import tempfile
 import os
 from sqlmodel import create_engine, Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from fastapi.testclient import TestClient
 from app.main import app
-from app.db.init import get_session
+from app.db.init import get_session, get_async_session
 from app.db.schema import Links  # Import to register models
 import app.core.config as config_module
 
@@ -20,6 +23,17 @@ def engine():
     os.unlink(db_file.name)
 
 
+@pytest.fixture(scope="session")
+def async_engine(engine):
+    """Create an async engine on the same temporary SQLite database."""
+    # NullPool: TestClient runs each test on its own event loop
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{engine.url.database}", poolclass=NullPool
+    )
+    yield async_engine
+    async_engine.sync_engine.dispose()
+
+
 @pytest.fixture(scope="function")
 def session(engine):
     """Provide a test database session."""
@@ -28,7 +42,7 @@ def session(engine):
 
 
 @pytest.fixture(scope="function")
-def client(session):
+def client(session, async_engine):
     """Provide FastAPI TestClient with overridden session dependency."""
     # Override config attributes for tests
     original_frontend_url = config_module.config.frontend_url
@@ -37,7 +51,12 @@ def client(session):
     config_module.config.frontend_url = "http://testserver"
     config_module.config.site_url = "http://testserver"
 
+    async def get_test_async_session():
+        async with AsyncSession(async_engine) as async_session:
+            yield async_session
+
     app.dependency_overrides[get_session] = lambda: session
+    app.dependency_overrides[get_async_session] = get_test_async_session
     with TestClient(app) as client:
         yield client
 
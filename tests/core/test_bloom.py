@@ -0,0 +1,35 @@
+"""Tests for the Bloom filter."""
+
+from app.core.bloom import BloomFilter
+
+
+def test_bloom_filter_contains_added_keys():
+    """Test every added key is reported as present."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"key{i:04d}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    assert bloom.count == 1000
+
+
+def test_bloom_filter_false_positive_rate_is_bounded():
+    """Test unknown keys are rejected at about the target error rate."""
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    for i in range(2000):
+        bloom.add(f"present{i}")
+
+    false_positives = sum(f"absent{i}" in bloom for i in range(10_000))
+    assert false_positives / 10_000 < 0.03
+    assert bloom.false_positive_rate < 0.02
+
+
+def test_bloom_filter_stats():
+    """Test stats report the memory footprint and sizing."""
+    bloom = BloomFilter(capacity=100, error_rate=0.001)
+    stats = bloom.stats()
+
+    assert stats["memory_bytes"] == (bloom.size + 7) // 8
+    assert stats["hash_count"] >= 1
+    assert stats["false_positive_rate"] == 0.0
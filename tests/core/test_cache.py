@@ -0,0 +1,97 @@
+"""Tests for the in-memory TTL cache."""
+
+import time
+from app.core.cache import ByteLRUCache, TTLCache
+
+
+def test_cache_get_and_set():
+    """Test values can be stored and read back."""
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """Test the oldest entry is evicted once the cache is full."""
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_cache_expires_entries():
+    """Test entries older than the TTL are not returned."""
+    cache = TTLCache(max_size=10, ttl=0.05)
+    cache.set("a", 1)
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_invalidate_and_clear():
+    """Test invalidate removes one key and clear resets everything."""
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 0
+
+
+def test_cache_disabled_with_zero_size():
+    """Test a zero-sized cache never stores values."""
+    cache = TTLCache(max_size=0, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
+
+
+def test_cache_stats_hit_ratio():
+    """Test stats reports the hit ratio."""
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+
+    stats = cache.stats()
+    assert stats["size"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_byte_cache_evicts_over_budget():
+    """Test least recently used values are evicted once over the byte budget."""
+    cache = ByteLRUCache(max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.get("a")
+    cache.set("c", b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+    assert cache.bytes == 8
+    assert cache.evictions == 1
+
+
+def test_byte_cache_skips_values_over_budget():
+    """Test a value larger than the whole budget is not cached."""
+    cache = ByteLRUCache(max_bytes=4)
+    cache.set("a", b"12345")
+
+    assert cache.get("a") is None
+    assert cache.bytes == 0
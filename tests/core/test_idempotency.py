@@ -0,0 +1,76 @@
+"""Tests for the idempotency store."""
+
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.core.idempotency import IdempotencyStore
+
+
+@pytest.mark.asyncio
+async def test_store_replays_result():
+    """Test a stored result is returned without running the work again."""
+    store = IdempotencyStore()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        return {"link": "abc"}
+
+    assert await store.run("key", "a", work) == {"link": "abc"}
+    assert await store.run("key", "a", work) == {"link": "abc"}
+    assert len(calls) == 1
+    assert store.replayed == 1
+
+
+@pytest.mark.asyncio
+async def test_store_coalesces_concurrent_requests():
+    """Test concurrent requests with one key share a single run."""
+    store = IdempotencyStore()
+    release = asyncio.Event()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await release.wait()
+        return "done"
+
+    tasks = [asyncio.create_task(store.run("key", "a", work)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["done"] * 3
+    assert len(calls) == 1
+    assert store.coalesced == 2
+    assert store.stats()["inflight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_store_rejects_key_reuse_with_other_payload():
+    """Test a key used with another fingerprint raises 422."""
+    store = IdempotencyStore()
+
+    async def work():
+        return "done"
+
+    await store.run("key", "a", work)
+    with pytest.raises(HTTPException) as exc_info:
+        await store.run("key", "b", work)
+    assert exc_info.value.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_store_does_not_keep_failures():
+    """Test a failed run is retried by the next request."""
+    store = IdempotencyStore()
+    attempts = []
+
+    async def work():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return "done"
+
+    with pytest.raises(RuntimeError):
+        await store.run("key", "a", work)
+    assert await store.run("key", "a", work) == "done"
+    assert len(attempts) == 2
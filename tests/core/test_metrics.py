@@ -0,0 +1,30 @@
+"""Tests for the histogram metric."""
+
+from app.core.metrics import Histogram
+
+
+def test_histogram_buckets():
+    """Test values land in the first bucket whose bound they do not exceed."""
+    histogram = Histogram([1, 5, 10])
+    for value in (0.5, 1, 3, 10, 11):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"1": 2, "5": 1, "10": 1, "+Inf": 1}
+    assert snapshot["count"] == 5
+    assert snapshot["sum"] == 25.5
+    assert snapshot["mean"] == 5.1
+
+
+def test_histogram_reset():
+    """Test reset forgets every observation."""
+    histogram = Histogram([1])
+    histogram.observe(2)
+    histogram.reset()
+
+    assert histogram.snapshot() == {
+        "count": 0,
+        "sum": 0.0,
+        "mean": 0.0,
+        "buckets": {"1": 0, "+Inf": 0},
+    }
@@ -0,0 +1,139 @@
+"""Tests for the cached host resolver."""
+
+import asyncio
+import pytest
+import socket
+import threading
+import time
+from unittest.mock import patch
+from app.core.resolver import HostResolver
+
+
+def _addrinfo(*addresses):
+    return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (a, 0)) for a in addresses]
+
+
+def test_resolver_checks_ip_literals_without_lookup():
+    """Test IP literals are judged directly."""
+    resolver = HostResolver()
+    with patch("socket.getaddrinfo") as lookup:
+        assert resolver.is_private("10.0.0.1") is True
+        assert resolver.is_private("fd00::1") is True
+        assert resolver.is_private("93.184.215.14") is False
+        lookup.assert_not_called()
+    assert resolver.stats()["private"] == 2
+
+
+def test_resolver_caches_verdicts():
+    """Test a hostname is resolved once and then served from the cache."""
+    resolver = HostResolver()
+    with patch("socket.getaddrinfo", return_value=_addrinfo("93.184.215.14")) as lookup:
+        assert resolver.is_private("example.com") is False
+        assert resolver.is_private("example.com") is False
+        assert lookup.call_count == 1
+
+    stats = resolver.stats()
+    assert stats["lookups"] == 1
+    assert stats["cache"]["hits"] == 1
+
+
+def test_resolver_blocks_any_private_address():
+    """Test one private address among public ones is enough."""
+    resolver = HostResolver()
+    addresses = _addrinfo("93.184.215.14", "192.168.1.1")
+    with patch("socket.getaddrinfo", return_value=addresses):
+        assert resolver.is_private("mixed.example.com") is True
+
+
+def test_resolver_failed_lookup_has_no_verdict():
+    """Test a failed lookup gives None and is not cached."""
+    resolver = HostResolver()
+    with patch("socket.getaddrinfo", side_effect=socket.gaierror("no such host")):
+        assert resolver.is_private("missing.example.com") is None
+
+    assert resolver.stats()["errors"] == 1
+    assert len(resolver.cache) == 0
+
+
+def test_resolver_times_out_and_caches_late_result():
+    """Test callers give up after the timeout while the lookup still fills the cache."""
+    resolver = HostResolver(timeout=0.05)
+    release = threading.Event()
+
+    def slow_lookup(*args, **kwargs):
+        release.wait(5)
+        return _addrinfo("10.1.2.3")
+
+    with patch("socket.getaddrinfo", side_effect=slow_lookup):
+        started = time.perf_counter()
+        assert resolver.is_private("slow.example.com") is None
+        assert time.perf_counter() - started < 1
+        release.set()
+        deadline = time.monotonic() + 5
+        while resolver.stats()["pending"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert resolver.stats()["timeouts"] == 1
+    assert resolver.is_private("slow.example.com") is True
+
+
+@pytest.mark.asyncio
+async def test_resolver_async_check_keeps_loop_running():
+    """Test the async check times out without blocking the event loop."""
+    resolver = HostResolver(timeout=0.05)
+    release = threading.Event()
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0.01)
+
+    def slow_lookup(*args, **kwargs):
+        release.wait(5)
+        return _addrinfo("10.1.2.3")
+
+    with patch("socket.getaddrinfo", side_effect=slow_lookup):
+        ticker = asyncio.create_task(tick())
+        assert await resolver.is_private_async("async.example.com") is None
+        ticker.cancel()
+        release.set()
+        deadline = time.monotonic() + 5
+        while resolver.stats()["pending"] and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+
+    assert len(ticks) > 1
+    assert resolver.stats()["timeouts"] == 1
+    assert await resolver.is_private_async("async.example.com") is True
+
+
+def test_resolver_coalesces_concurrent_lookups():
+    """Test concurrent checks of one hostname share a single lookup."""
+    resolver = HostResolver(timeout=5)
+    release = threading.Event()
+    calls = []
+
+    def slow_lookup(*args, **kwargs):
+        calls.append(args[0])
+        release.wait(5)
+        return _addrinfo("93.184.215.14")
+
+    results = []
+    with patch("socket.getaddrinfo", side_effect=slow_lookup):
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(resolver.is_private("busy.example.com"))
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        while resolver.stats()["lookups"] + resolver.stats()["coalesced"] < 4:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    assert results == [False] * 4
+    assert calls == ["busy.example.com"]
+    assert resolver.stats()["coalesced"] == 3
@@ -0,0 +1,78 @@
+"""Tests for the periodic background task helper."""
+
+import time
+from threading import Event
+from app.core.tasks import PeriodicTask
+
+
+def test_periodic_task_runs_on_trigger_and_stop():
+    """Test the function runs when triggered and once more on stop."""
+    calls = []
+    task = PeriodicTask(name="test-task", interval=60, func=lambda: calls.append(1))
+    task.start()
+    assert task.running
+
+    task.trigger()
+    for _ in range(50):
+        if calls:
+            break
+        time.sleep(0.01)
+    assert len(calls) == 1
+
+    task.stop(timeout=1)
+    assert not task.running
+    assert len(calls) == 2
+
+
+def test_periodic_task_survives_errors():
+    """Test a failing run does not kill the background thread."""
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    task = PeriodicTask(name="failing-task", interval=0.01, func=failing)
+    task.start()
+    time.sleep(0.1)
+    assert task.running
+    task.stop(timeout=1)
+    assert len(calls) >= 2
+
+
+def test_periodic_task_stop_without_start():
+    """Test stopping a task that never started is a no-op."""
+    calls = []
+    task = PeriodicTask(name="idle-task", interval=1, func=lambda: calls.append(1))
+    task.stop()
+    assert calls == []
+
+
+def test_periodic_task_stop_timeout_skips_final_run():
+    """Test the final run is skipped while a run is still in progress."""
+    release = Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+
+    task = PeriodicTask(name="slow-task", interval=60, func=slow)
+    task.start()
+    task.trigger()
+    for _ in range(50):
+        if calls:
+            break
+        time.sleep(0.01)
+
+    task.stop(timeout=0.05)
+    assert len(calls) == 1
+    assert task.running
+
+    release.set()
+    for _ in range(50):
+        if not task.running:
+            break
+        time.sleep(0.01)
+    assert not task.running
+    assert len(calls) == 1
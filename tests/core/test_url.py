@@ -0,0 +1,68 @@
+"""Tests for URL canonicalization."""
+
+import pytest
+from unittest.mock import patch
+from app.core import url as url_module
+from app.core.url import canonicalize_url, normalize_escapes, parse_param_rules
+
+
+def test_canonicalize_lowercases_and_drops_default_port():
+    """Test scheme and host are lowercased and default ports removed."""
+    url = canonicalize_url("HTTPS://Example.COM:443/Path")
+    assert url.url == "https://example.com/Path"
+    assert (url.scheme, url.host, url.port) == ("https", "example.com", None)
+
+
+def test_canonicalize_keeps_other_ports_and_userinfo():
+    """Test non-default ports and credentials are preserved."""
+    url = canonicalize_url("http://user:pw@Example.com:8080/x")
+    assert url.url == "http://user:pw@example.com:8080/x"
+    assert url.port == 8080
+
+
+def test_canonicalize_encodes_idna_hosts():
+    """Test internationalized host names are punycode encoded."""
+    assert canonicalize_url("https://Bücher.example/").host == "xn--bcher-kva.example"
+
+
+def test_canonicalize_normalizes_escapes():
+    """Test escaped unreserved characters are decoded, other escapes uppercased."""
+    url = canonicalize_url("https://example.com/%7euser/%2f?q=%41%e2%82%ac")
+    assert url.url == "https://example.com/~user/%2F?q=A%E2%82%AC"
+    assert normalize_escapes("a%2fb%7E") == "a%2Fb~"
+
+
+def test_canonicalize_removes_dot_segments_and_empty_query():
+    """Test dot segments and a bare `?` do not create distinct URLs."""
+    assert canonicalize_url("https://example.com/a/../b?").url == "https://example.com/b"
+    assert canonicalize_url("https://example.com").url == "https://example.com/"
+
+
+def test_canonicalize_rejects_invalid_urls():
+    """Test non http(s) and malformed URLs raise ValueError."""
+    for value in ("ftp://example.com", "example.com", ""):
+        with pytest.raises(ValueError):
+            canonicalize_url(value)
+
+
+def test_parse_param_rules():
+    """Test exact names and prefix patterns are told apart."""
+    exact, prefixes = parse_param_rules(" fbclid, utm_* ,,gclid")
+    assert exact == {"fbclid", "gclid"}
+    assert prefixes == ("utm_",)
+
+
+def test_strip_params():
+    """Test configured tracking parameters are removed from the query."""
+    rules = parse_param_rules("utm_*,fbclid")
+    with patch.multiple(url_module, _strip_exact=rules[0], _strip_prefixes=rules[1]):
+        assert url_module.strip_params("a=1&utm_source=x&fbclid=y&b") == "a=1&b"
+        assert url_module.strip_params("utm_medium=z") == ""
+
+
+def test_canonicalize_is_memoized():
+    """Test repeated URLs are served from the memo."""
+    canonicalize_url("https://memo.example.com/x")
+    hits = canonicalize_url.cache_info().hits
+    canonicalize_url("https://memo.example.com/x")
+    assert canonicalize_url.cache_info().hits == hits + 1
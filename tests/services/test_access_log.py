@@ -0,0 +1,98 @@
+"""Tests for click ingestion from access logs."""
+
+import gzip
+from datetime import datetime, timezone
+from sqlmodel import select
+from app.db.schema import Links
+from app.services.access_log import (
+    ingest_access_log_lines,
+    ingest_access_logs,
+    parse_access_log_line,
+)
+from app.services.link import LinkService
+
+
+def _line(path, status=301, method="GET", extra=""):
+    return (
+        f'203.0.113.7 - - [17/Oct/2026:10:00:00 +0000] "{method} {path} HTTP/1.1" '
+        f'{status} 0 "-" "curl/8.0"{extra}\n'
+    )
+
+
+def _create_link(session, url):
+    return LinkService(session=session).generate_new_link(url).split("/")[-1]
+
+
+def test_parse_access_log_line():
+    """Test only GET redirects of well-formed short IDs count as clicks."""
+    sort_id, at = parse_access_log_line(_line("/abc1234?utm=x"))
+    assert sort_id == "abc1234"
+    expected = datetime(2026, 10, 17, 10, tzinfo=timezone.utc)
+    assert at == expected.astimezone().replace(tzinfo=None)
+
+    assert parse_access_log_line(_line("/abc1234", status=404)) is None
+    assert parse_access_log_line(_line("/abc1234", method="HEAD")) is None
+    assert parse_access_log_line(_line("/static/app.css")) is None
+    assert parse_access_log_line("not a log line") is None
+
+
+def test_parse_access_log_line_cache_status():
+    """Test the cache status filter uses the last field of the line."""
+    hit = _line("/abc1234", extra=" HIT")
+    miss = _line("/abc1234", extra=' "MISS"')
+    assert parse_access_log_line(hit, cache_status="hit") is not None
+    assert parse_access_log_line(miss, cache_status="HIT") is None
+
+
+def test_ingest_access_log_lines_batches(session):
+    """Test clicks are aggregated and applied across several batches."""
+    first = _create_link(session, "https://ingest-a.com")
+    second = _create_link(session, "https://ingest-b.com")
+    lines = [_line(f"/{first}")] * 3 + [_line(f"/{second}"), _line("/zz99zz9")]
+
+    stats = ingest_access_log_lines(session, lines, batch_size=1)
+
+    assert stats == {"lines": 5, "clicks": 5}
+    session.expire_all()
+    links = {
+        link.sort_id: link
+        for link in session.exec(
+            select(Links).where(Links.sort_id.in_([first, second]))
+        )
+    }
+    assert links[first].clicks == 3
+    assert links[second].clicks == 1
+    assert links[first].last_accessed_at is not None
+
+
+def test_ingest_keeps_newest_last_accessed_at(session):
+    """Test old log lines do not move last_accessed_at backwards."""
+    sort_id = _create_link(session, "https://ingest-old.com")
+    link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+    link.last_accessed_at = datetime(2030, 1, 1)
+    session.add(link)
+    session.commit()
+
+    ingest_access_log_lines(session, [_line(f"/{sort_id}")])
+
+    session.expire_all()
+    link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+    assert link.clicks == 1
+    assert link.last_accessed_at == datetime(2030, 1, 1)
+
+
+def test_ingest_access_logs_reads_gzip(session, tmp_path):
+    """Test plain and gzipped files are both ingested."""
+    sort_id = _create_link(session, "https://ingest-gz.com")
+    plain = tmp_path / "access.log"
+    plain.write_text(_line(f"/{sort_id}"))
+    packed = tmp_path / "access.log.1.gz"
+    with gzip.open(packed, "wt") as f:
+        f.write(_line(f"/{sort_id}") * 2)
+
+    totals = ingest_access_logs(session, [str(plain), str(packed)])
+
+    assert totals == {"files": 2, "lines": 3, "clicks": 3}
+    session.expire_all()
+    link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+    assert link.clicks == 3
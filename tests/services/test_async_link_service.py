@@ -0,0 +1,164 @@
+"""Tests for the async LinkService variant."""
+
+import pytest
+from unittest.mock import patch
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.db.schema import Links
+from app.services.link import AsyncLinkService
+
+
+@pytest.mark.asyncio
+async def test_async_generate_and_get_original_link(async_engine, session):
+    """Test creating and resolving a link through the async service."""
+    async with AsyncSession(async_engine) as async_session:
+        service = AsyncLinkService(session=async_session)
+        short_link = await service.generate_new_link("https://async.com")
+        sort_id = short_link.split("/")[-1]
+
+        assert await service.get_original_link(sort_id) == "https://async.com"
+        assert await service.get_original_link(sort_id) == "https://async.com"
+
+    link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+    assert link.clicks == 2
+    assert link.last_accessed_at is not None
+
+
+@pytest.mark.asyncio
+async def test_async_get_original_link_not_found(async_engine):
+    """Test an unknown short ID resolves to the 404 page."""
+    async with AsyncSession(async_engine) as async_session:
+        service = AsyncLinkService(session=async_session)
+        assert (await service.get_original_link("zzzzzzz")).endswith("/404")
+
+
+@pytest.mark.asyncio
+async def test_async_lookup_original_url(async_engine):
+    """Test the click-free lookup used by batched mode."""
+    async with AsyncSession(async_engine) as async_session:
+        service = AsyncLinkService(session=async_session)
+        short_link = await service.generate_new_link("https://lookup.com")
+        sort_id = short_link.split("/")[-1]
+
+        assert await service._lookup_original_url(sort_id) == "https://lookup.com"
+        assert await service._lookup_original_url("zzzzzzz") is None
+
+
+@pytest.mark.asyncio
+async def test_async_sharded_mode_counts_clicks(async_engine, monkeypatch):
+    """Test the async service records clicks in shards."""
+    from app.core.config import config
+
+    monkeypatch.setattr(config, "click_write_mode", "sharded")
+    async with AsyncSession(async_engine) as async_session:
+        service = AsyncLinkService(session=async_session)
+        short_link = await service.generate_new_link("https://async-sharded.com")
+        sort_id = short_link.split("/")[-1]
+
+        for _ in range(3):
+            assert await service.get_original_link(sort_id) == "https://async-sharded.com"
+        assert await service.get_click_count(sort_id) == 3
+
+
+@pytest.mark.asyncio
+async def test_async_generate_new_link_reuses_existing_url(async_engine):
+    """Test the async service returns the existing short link for a URL."""
+    async with AsyncSession(async_engine) as async_session:
+        service = AsyncLinkService(session=async_session)
+        first = await service.generate_new_link("https://async-duplicate.com")
+        second = await service.generate_new_link("https://async-duplicate.com")
+
+    assert first == second
+
+
+@pytest.mark.asyncio
+async def test_async_generate_new_link_into_link_log(
+    async_engine, tmp_path, monkeypatch
+):
+    """Test the async service accepts links into the link log when it is open."""
+    from app.services import short_id
+    from app.services.link_log import LinkLog
+    from app.services.short_id import ShortIdAllocator
+
+    allocator = ShortIdAllocator("test-async-log", name="test-async-log")
+    monkeypatch.setattr(short_id, "short_id_allocator", allocator)
+    link_log = LinkLog(str(tmp_path / "link-log"))
+    link_log.open()
+    try:
+        with patch("app.services.link.link_log", link_log):
+            async with AsyncSession(async_engine) as async_session:
+                service = AsyncLinkService(session=async_session)
+                short_link = await service.generate_new_link("https://async-log.com")
+                sort_id = short_link.split("/")[-1]
+
+                assert link_log.get(sort_id) == "https://async-log.com"
+                assert await service.get_original_link(sort_id) == "https://async-log.com"
+    finally:
+        link_log.close()
+
+
+@pytest.mark.asyncio
+async def test_async_get_original_link_rechecks_filter(
+    engine, async_engine, session, monkeypatch
+):
+    """Test a stale filter negative is settled off the event loop."""
+    from app.db.init import db
+    from app.services.link_filter import LinkFilter
+
+    monkeypatch.setattr(db, "engine", engine)
+    link_filter = LinkFilter(min_capacity=100)
+    link_filter.build(session)
+    session.add(Links(original_url="https://async-stale.com/", sort_id="asyncst"))
+    session.commit()
+
+    with patch("app.services.link.link_filter", link_filter):
+        async with AsyncSession(async_engine) as async_session:
+            service = AsyncLinkService(session=async_session)
+            assert await service.get_original_link("asyncst") == (
+                "https://async-stale.com/"
+            )
+            assert (await service.get_original_link("!!!!!!!")).endswith("/404")
+
+
+@pytest.mark.asyncio
+async def test_async_peer_lookup_runs_off_the_event_loop(
+    async_engine, tmp_path, monkeypatch
+):
+    """Test links logged by another worker are read from a worker thread."""
+    import threading
+    from app.services import short_id
+    from app.services.link_log import LinkLog
+    from app.services.short_id import ShortIdAllocator
+
+    allocator = ShortIdAllocator("test-async-peer", name="test-async-peer")
+    monkeypatch.setattr(short_id, "short_id_allocator", allocator)
+    directory = str(tmp_path / "link-log")
+    link_log, peer = LinkLog(directory), LinkLog(directory)
+    link_log.open()
+    peer.open()
+    threads = []
+    lookup_peers = link_log.lookup_peers
+
+    def record_thread(sort_ids):
+        threads.append(threading.current_thread())
+        return lookup_peers(sort_ids)
+
+    try:
+        peer.append("asyncpr", "https://async-peer.com")
+        with (
+            patch("app.services.link.link_log", link_log),
+            patch.object(link_log, "lookup_peers", record_thread),
+        ):
+            async with AsyncSession(async_engine) as async_session:
+                service = AsyncLinkService(session=async_session)
+                assert await service.get_original_link("asyncpr") == (
+                    "https://async-peer.com"
+                )
+                expanded = await service.expand_links(["asyncpr"], metadata=False)
+                assert expanded["asyncpr"]["original_url"] == "https://async-peer.com"
+
+        assert threads
+        assert threading.main_thread() not in threads
+    finally:
+        peer.close()
+        link_log.close()
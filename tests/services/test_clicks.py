@@ -0,0 +1,123 @@
+"""Tests for write-behind click accounting."""
+
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import select
+from app.core.config import config
+from app.core.exception import DbException
+from app.db.schema import Links
+from app.services.clicks import ClickBuffer
+from app.services.link import LinkService
+
+
+def _create_link(session, url="https://clicks.com") -> str:
+    service = LinkService(session=session)
+    return service.generate_new_link(original_link=url).split("/")[-1]
+
+
+def test_click_buffer_aggregates_per_sort_id():
+    """Test clicks for the same short ID are summed in memory."""
+    buffer = ClickBuffer()
+    buffer.record("abc1234")
+    buffer.record("abc1234")
+    buffer.record("xyz9876")
+
+    pending = buffer.drain()
+    assert pending["abc1234"][0] == 2
+    assert pending["xyz9876"][0] == 1
+    assert len(buffer) == 0
+
+
+def test_click_buffer_requests_flush_when_full():
+    """Test the on_full callback fires once max_pending is reached."""
+    calls = []
+    buffer = ClickBuffer(max_pending=2, on_full=lambda: calls.append(1))
+    buffer.record("a")
+    assert calls == []
+    buffer.record("b")
+    assert calls == [1]
+
+
+def test_click_buffer_flush_updates_links(session):
+    """Test a flush adds the buffered clicks to the links table."""
+    sort_id = _create_link(session)
+    buffer = ClickBuffer()
+    at = datetime(2026, 1, 1, 12, 0, 0)
+    for _ in range(3):
+        buffer.record(sort_id, at=at)
+
+    assert buffer.flush(session) == 1
+    assert buffer.flush(session) == 0
+
+    link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+    session.refresh(link)
+    assert link.clicks == 3
+    assert link.last_accessed_at.replace(tzinfo=None) == at
+
+
+def test_click_buffer_flush_failure_keeps_counts(session):
+    """Test counters are kept for the next flush when the update fails."""
+    buffer = ClickBuffer()
+    buffer.record("abc1234", clicks=4)
+
+    with patch.object(session, "connection", side_effect=SQLAlchemyError("down")):
+        with pytest.raises(DbException):
+            buffer.flush(session)
+
+    assert buffer.drain()["abc1234"][0] == 4
+
+
+def test_get_original_link_batched_mode(session, monkeypatch):
+    """Test batched mode buffers the click instead of committing it."""
+    from app.services import link as link_module
+
+    sort_id = _create_link(session, "https://batched.com")
+    buffer = ClickBuffer()
+    monkeypatch.setattr(config, "click_write_mode", "batched")
+    monkeypatch.setattr(link_module, "click_buffer", buffer)
+
+    service = LinkService(session=session)
+    assert service.get_original_link(sort_id=sort_id) == "https://batched.com"
+    assert service.get_original_link(sort_id=sort_id) == "https://batched.com"
+    assert service.get_original_link(sort_id="zzzzzzz").endswith("/404")
+
+    link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+    session.refresh(link)
+    assert link.clicks == 0
+
+    buffer.flush(session)
+    session.refresh(link)
+    assert link.clicks == 2
+
+
+def test_sharded_mode_spreads_and_reconciles_clicks(session, monkeypatch):
+    """Test sharded clicks count immediately and reconcile into links."""
+    from app.db.schema import LinkClickShards
+    from app.services.clicks import reconcile_click_shards
+
+    sort_id = _create_link(session, "https://sharded.com")
+    monkeypatch.setattr(config, "click_write_mode", "sharded")
+    monkeypatch.setattr(config, "click_shard_count", 4)
+
+    service = LinkService(session=session)
+    for _ in range(10):
+        assert service.get_original_link(sort_id=sort_id) == "https://sharded.com"
+
+    shards = session.exec(
+        select(LinkClickShards).where(LinkClickShards.sort_id == sort_id)
+    ).all()
+    assert 1 <= len(shards) <= 4
+    assert sum(shard.clicks for shard in shards) == 10
+    assert service.get_click_count(sort_id) == 10
+
+    assert reconcile_click_shards(session) >= 1
+    assert reconcile_click_shards(session) == 0
+
+    link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+    session.refresh(link)
+    assert link.clicks == 10
+    assert link.last_accessed_at is not None
+    assert service.get_click_count(sort_id) == 10
+    assert service.get_click_count("zzzzzzz") == 0
@@ -0,0 +1,103 @@
+"""Tests for group commit of concurrent link creation."""
+
+import asyncio
+import pytest
+from unittest.mock import patch
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.exception import AppException
+from app.db.schema import Links
+from app.services.group_commit import LinkGroupCommit
+from app.services.link import AsyncLinkService
+
+
+async def _create_concurrently(committer, async_engine, urls):
+    async def create(url):
+        async with AsyncSession(async_engine) as async_session:
+            return await committer.create(async_session, url)
+
+    return await asyncio.gather(*(create(url) for url in urls), return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_group_commit_creates_links_in_one_batch(async_engine, session):
+    """Test concurrent creates share one transaction and get their own links."""
+    committer = LinkGroupCommit(enabled=True, window=0.05, max_batch=100)
+    urls = [f"https://group.com/{i}" for i in range(5)] + ["https://group.com/0"]
+
+    with patch.object(
+        AsyncLinkService,
+        "generate_new_links",
+        autospec=True,
+        side_effect=AsyncLinkService.generate_new_links,
+    ) as batch:
+        links = await _create_concurrently(committer, async_engine, urls)
+
+    assert batch.call_count == 1
+    assert len(set(links)) == 5
+    assert links[0] == links[5]
+    for url, link in zip(urls, links):
+        stored = session.exec(
+            select(Links).where(Links.sort_id == link.split("/")[-1])
+        ).one()
+        assert stored.original_url == url
+
+    stats = committer.stats()
+    assert stats["batch_size"]["count"] == 1
+    assert stats["batch_size"]["sum"] == 6
+    assert stats["latency_s"]["count"] == 6
+
+
+@pytest.mark.asyncio
+async def test_group_commit_closes_full_batches_early(async_engine):
+    """Test a group is committed as soon as it holds max_batch requests."""
+    committer = LinkGroupCommit(enabled=True, window=10, max_batch=3)
+    urls = [f"https://group-full.com/{i}" for i in range(3)]
+
+    links = await asyncio.wait_for(
+        _create_concurrently(committer, async_engine, urls), timeout=5
+    )
+
+    assert all(link.startswith("http") for link in links)
+
+
+@pytest.mark.asyncio
+async def test_group_commit_caps_groups_at_max_batch(async_engine):
+    """Test requests beyond max_batch are carried over to the next group."""
+    committer = LinkGroupCommit(enabled=True, window=0.05, max_batch=3)
+    urls = [f"https://group-capped.com/{i}" for i in range(7)]
+
+    links = await _create_concurrently(committer, async_engine, urls)
+
+    assert len(set(links)) == 7
+    stats = committer.stats()
+    assert stats["batch_size"]["count"] == 3
+    assert stats["batch_size"]["sum"] == 7
+    assert stats["batch_size"]["buckets"]["8"] == 0
+
+
+@pytest.mark.asyncio
+async def test_group_commit_failure_reaches_every_caller(async_engine):
+    """Test each request of a failed group gets an error."""
+    committer = LinkGroupCommit(enabled=True, window=0.05)
+    urls = [f"https://group-failed.com/{i}" for i in range(3)]
+
+    with patch.object(
+        AsyncLinkService, "generate_new_links", side_effect=AppException("boom")
+    ):
+        results = await _create_concurrently(committer, async_engine, urls)
+
+    assert all(isinstance(result, AppException) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_group_commit_disabled_creates_each_link(async_engine):
+    """Test disabled group commit creates links one by one and still measures."""
+    committer = LinkGroupCommit(enabled=False)
+
+    links = await _create_concurrently(
+        committer, async_engine, ["https://group-off.com/a", "https://group-off.com/b"]
+    )
+
+    assert len(set(links)) == 2
+    assert committer.stats()["batch_size"]["buckets"]["1"] == 2
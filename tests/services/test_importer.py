@@ -0,0 +1,153 @@
+"""Tests for the bulk link importer."""
+
+import gzip
+import io
+import json
+import pytest
+from unittest.mock import patch
+from sqlalchemy.exc import OperationalError
+from sqlmodel import select
+from app.cli.import_links import main
+from app.core.resolver import host_resolver
+from app.db.init import Database
+from app.db.schema import ImportCheckpoints, Links
+from app.services import short_id
+from app.services.importer import LinkImporter, read_records
+from app.services.link import url_hash
+from app.services.short_id import ShortIdAllocator
+
+
+@pytest.fixture
+def database(engine):
+    """Database handle on the test database, as the import CLI builds it."""
+    database = Database(str(engine.url), pool_size=1, max_overflow=0)
+    yield database
+    database.engine.dispose()
+
+
+def test_read_records_formats(tmp_path):
+    """Test CSV, NDJSON and gzipped input yield the same records."""
+    csv_path = tmp_path / "links.csv"
+    csv_path.write_text("original_url,sort_id\nhttps://a.com,abc1234\n")
+    ndjson_path = tmp_path / "links.ndjson.gz"
+    with gzip.open(ndjson_path, "wt") as f:
+        f.write(json.dumps({"original_url": "https://a.com", "sort_id": "abc1234"}))
+        f.write("\n\n")
+
+    expected = [{"original_url": "https://a.com", "sort_id": "abc1234"}]
+    assert list(read_records(str(csv_path))) == expected
+    assert list(read_records(str(ndjson_path))) == expected
+
+
+def test_import_links(database, session):
+    """Test valid rows are normalized and loaded, invalid ones rejected."""
+    rejects = io.StringIO()
+    records = [
+        {"original_url": "HTTPS://Import.com/A", "sort_id": "imp0001", "clicks": "7"},
+        {"url": "https://import.com/b"},
+        {"original_url": "not a url"},
+        {"original_url": "https://import.com/c", "sort_id": "short"},
+        {"original_url": "https://import.com/dup", "sort_id": "imp0001"},
+    ]
+    importer = LinkImporter(database, job="test-import", rejects=rejects)
+
+    report = importer.run(records)
+
+    assert report["records"] == 5
+    assert report["inserted"] == 2
+    assert report["skipped"] == 1
+    assert report["invalid"] == 2
+    positions = [json.loads(line)["position"] for line in rejects.getvalue().splitlines()]
+    assert positions == [2, 3]
+
+    link = session.exec(select(Links).where(Links.sort_id == "imp0001")).one()
+    assert link.original_url == "https://import.com/A"
+    assert link.url_hash == url_hash("https://import.com/A")
+    assert link.clicks == 7
+    generated = session.exec(
+        select(Links).where(Links.original_url == "https://import.com/b")
+    ).one()
+    assert len(generated.sort_id) == 7
+
+
+def test_import_resumes_after_last_chunk(database, session):
+    """Test a failed run resumes after its last committed chunk."""
+    records = [{"original_url": f"https://resume.com/{i}"} for i in range(5)]
+
+    def crash_after_three():
+        yield from records[:3]
+        raise RuntimeError("connection lost")
+
+    with pytest.raises(RuntimeError):
+        LinkImporter(database, job="test-resume", chunk_size=2).run(crash_after_three())
+
+    checkpoint = session.get(ImportCheckpoints, "test-resume")
+    assert (checkpoint.position, checkpoint.inserted) == (2, 2)
+
+    report = LinkImporter(database, job="test-resume", chunk_size=2).run(records)
+
+    assert report["resumed_at"] == 2
+    assert report["inserted"] == 3
+    links = session.exec(
+        select(Links).where(Links.original_url.like("https://resume.com/%"))
+    ).all()
+    assert len(links) == 5
+    session.refresh(checkpoint)
+    assert (checkpoint.position, checkpoint.inserted) == (5, 5)
+
+
+def test_import_retries_taken_generated_ids(database, session):
+    """Test a generated ID that is already taken is replaced, not dropped."""
+    session.add(Links(original_url="https://taken.com", sort_id="taken01"))
+    session.commit()
+    importer = LinkImporter(database, job="test-taken")
+    ids = iter(["taken01", "fresh01"])
+
+    with patch.object(importer, "_new_sort_id", side_effect=lambda: next(ids)):
+        report = importer.run([{"original_url": "https://generated.com"}])
+
+    assert (report["inserted"], report["skipped"]) == (1, 0)
+    link = session.exec(select(Links).where(Links.sort_id == "fresh01")).one()
+    assert link.original_url == "https://generated.com/"
+
+
+def test_import_with_allocator(database, session, monkeypatch):
+    """Test allocator blocks are reserved without a second pooled connection."""
+    allocator = ShortIdAllocator("test-import", block_size=2, name="test-import")
+    monkeypatch.setattr(short_id, "short_id_allocator", allocator)
+    session.add(Links(original_url="https://taken.com", sort_id=allocator.encode(0)))
+    session.commit()
+    records = [{"original_url": f"https://{n}.com"} for n in range(5)]
+
+    report = LinkImporter(database, job="test-allocator", chunk_size=2).run(records)
+
+    assert (report["inserted"], report["skipped"]) == (5, 0)
+    taken = session.exec(
+        select(Links).where(Links.sort_id == allocator.encode(0))
+    ).one()
+    assert taken.original_url == "https://taken.com"
+
+
+def test_import_cli_fails_on_chunk_error(engine, tmp_path, capsys):
+    """Test the CLI exits nonzero when a chunk can't be committed."""
+    path = tmp_path / "links.ndjson"
+    path.write_text(json.dumps({"original_url": "https://a.com"}) + "\n")
+    error = OperationalError("INSERT", {}, Exception("database is locked"))
+
+    with patch.object(LinkImporter, "_load_chunk", side_effect=error):
+        code = main([str(path), "--database-url", str(engine.url)])
+
+    assert code == 1
+    assert json.loads(capsys.readouterr().out.splitlines()[-1])["failed"] is True
+
+
+def test_import_skips_dns_by_default(database):
+    """Test host names are only resolved when asked for."""
+    with patch.object(host_resolver, "is_private", return_value=False) as resolve:
+        LinkImporter(database, job="test-dns").prepare_row(0, {"url": "https://a.com"})
+        resolve.assert_not_called()
+
+        LinkImporter(database, job="test-dns", resolve_hosts=True).prepare_row(
+            0, {"url": "https://a.com"}
+        )
+        resolve.assert_called_once()
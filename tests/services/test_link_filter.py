@@ -0,0 +1,97 @@
+"""Tests for the short ID filter on the redirect path."""
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from app.db.init import db
+from app.db.schema import Links
+from app.services.link import LinkService
+from app.services.link_filter import LinkFilter
+
+
+@pytest.fixture(autouse=True)
+def filter_database(engine, monkeypatch):
+    """Rechecks refresh from the process-wide engine, point it at the test DB."""
+    monkeypatch.setattr(db, "engine", engine)
+
+
+def test_link_filter_not_ready_allows_everything():
+    """Test an unbuilt filter never rejects a short ID."""
+    link_filter = LinkFilter()
+
+    assert not link_filter.ready
+    assert link_filter.might_contain("abc1234")
+
+
+def test_link_filter_build_and_refresh(session):
+    """Test the filter covers existing links and picks up new ones."""
+    service = LinkService(session=session)
+    existing = service.generate_new_link("https://filter.com").split("/")[-1]
+
+    link_filter = LinkFilter(min_capacity=100)
+    link_filter.build(session)
+    assert link_filter.might_contain(existing)
+    assert not link_filter.might_contain("!!!!!!!")
+    assert link_filter.stats()["rejected"] == 1
+
+    created = service.generate_new_link("https://filter-new.com").split("/")[-1]
+    link_filter.refresh(session)
+    assert link_filter.might_contain(created)
+
+
+def test_get_original_link_short_circuits_definite_miss(session):
+    """Test a confirmed miss returns the 404 page without a lookup."""
+    link_filter = LinkFilter(min_capacity=100)
+    link_filter.build(session)
+    service = LinkService(session=session)
+
+    with patch("app.services.link.link_filter", link_filter):
+        with patch.object(session, "exec") as mock_exec:
+            assert service.get_original_link("!!!!!!!").endswith("/404")
+            mock_exec.assert_not_called()
+
+        created = service.generate_new_link("https://filter-add.com").split("/")[-1]
+        assert link_filter.might_contain(created)
+        assert service.get_original_link(created) == "https://filter-add.com"
+
+
+def test_link_filter_rechecks_links_of_other_workers(session):
+    """Test a link another worker just created is found before the refresh."""
+    service = LinkService(session=session)
+    link_filter = LinkFilter(min_capacity=100)
+    other_worker = LinkFilter(min_capacity=100)
+    link_filter.build(session)
+    other_worker.build(session)
+
+    with patch("app.services.link.link_filter", other_worker):
+        created = service.generate_new_link("https://other-worker.com")
+    sort_id = created.split("/")[-1]
+
+    with patch("app.services.link.link_filter", link_filter):
+        assert service.get_original_link(sort_id) == "https://other-worker.com"
+        expanded = service.expand_links([sort_id, "!!!!!!!"], metadata=False)
+    assert expanded == {sort_id: {"original_url": "https://other-worker.com"}}
+    assert link_filter.stats()["stale"] == 1
+
+
+def test_link_filter_refresh_picks_up_back_dated_links(session):
+    """Test rows inserted with an old created_at still reach the filter."""
+    service = LinkService(session=session)
+    service.generate_new_link("https://filter-recent.com")
+    link_filter = LinkFilter(min_capacity=100)
+    link_filter.build(session)
+
+    # Like an imported link or one drained from the link log after an outage
+    session.add(
+        Links(
+            original_url="https://filter-old.com/",
+            sort_id="oldlink",
+            created_at=datetime.now(timezone.utc) - timedelta(days=365),
+        )
+    )
+    session.commit()
+    link_filter.refresh(session)
+
+    assert link_filter.might_contain("oldlink")
+    with patch("app.services.link.link_filter", link_filter):
+        assert service.get_original_link("oldlink") == "https://filter-old.com/"
@@ -0,0 +1,266 @@
+"""Tests for the link write-ahead log."""
+
+import os
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+from sqlalchemy.exc import OperationalError
+from sqlmodel import select
+from app.core.exception import AppException, DbException
+from app.db.schema import Links
+from app.services import short_id
+from app.services.link import LinkService
+from app.services.link_log import (
+    LinkLog,
+    LinkRecord,
+    encode_record,
+    read_segment,
+)
+from app.services.short_id import ShortIdAllocator
+
+
+@pytest.fixture(autouse=True)
+def allocator(monkeypatch):
+    """The link log requires SHORT_ID_KEY."""
+    allocator = ShortIdAllocator("test-link-log", name="test-link-log")
+    monkeypatch.setattr(short_id, "short_id_allocator", allocator)
+    return allocator
+
+
+@pytest.fixture
+def link_log(tmp_path):
+    """An open link log in a temporary directory."""
+    log = LinkLog(str(tmp_path / "link-log"))
+    log.open()
+    yield log
+    log.close()
+
+
+def _segments(log):
+    return sorted(
+        name for name in os.listdir(log.slot_directory) if name.endswith(".log")
+    )
+
+
+def test_read_segment_stops_at_torn_frame(tmp_path):
+    """Test records are read up to a frame cut short by a crash."""
+    path = tmp_path / "links-000000000001.log"
+    record = LinkRecord("logged1", "https://log.com/", datetime.now(timezone.utc))
+    frame = encode_record(record)
+    path.write_bytes(frame + frame[:-3])
+
+    records, valid = read_segment(str(path))
+
+    assert records == [record]
+    assert valid == len(frame)
+
+
+def test_link_log_append_and_lookup(link_log):
+    """Test appended links are served until drained."""
+    link_log.append("logget1", "https://log.com/get")
+
+    assert link_log.get("logget1") == "https://log.com/get"
+    assert link_log.find("https://log.com/get") == "logget1"
+    assert link_log.stats()["undrained"] == 1
+
+
+def test_link_log_drain_inserts_and_deletes_segments(link_log, session):
+    """Test draining inserts the records and removes their segments."""
+    link_log.append("logdrn1", "https://log.com/drain-1")
+    link_log.append("logdrn2", "https://log.com/drain-2")
+
+    assert link_log.drain(session) == 2
+
+    rows = session.exec(
+        select(Links).where(Links.sort_id.in_(["logdrn1", "logdrn2"]))
+    ).all()
+    assert {row.original_url for row in rows} == {
+        "https://log.com/drain-1",
+        "https://log.com/drain-2",
+    }
+    assert all(row.url_hash for row in rows)
+    assert link_log.get("logdrn1") is None
+    assert len(_segments(link_log)) == 1
+    assert link_log.drain(session) == 0
+
+
+def test_link_log_recovers_after_restart(tmp_path, session):
+    """Test undrained records survive a restart and are drained once."""
+    directory = str(tmp_path / "link-log")
+    log = LinkLog(directory)
+    log.open()
+    log.append("logrcv1", "https://log.com/recover")
+    log.close()
+
+    log = LinkLog(directory)
+    log.open()
+    try:
+        assert log.get("logrcv1") == "https://log.com/recover"
+        assert log.drain(session) == 1
+    finally:
+        log.close()
+
+    rows = session.exec(select(Links).where(Links.sort_id == "logrcv1")).all()
+    assert len(rows) == 1
+
+
+def test_link_log_drain_during_append(link_log, session):
+    """Test a drain between the write and the fsync leaves nothing indexed."""
+    sync = link_log._sync
+
+    def drain_then_sync(ticket):
+        link_log.drain(session)
+        sync(ticket)
+
+    with patch.object(link_log, "_sync", side_effect=drain_then_sync):
+        link_log.append("lograce", "https://log.com/race")
+
+    assert link_log.get("lograce") is None
+    assert link_log.find("https://log.com/race") is None
+    assert link_log.stats()["undrained"] == 0
+    row = session.exec(select(Links).where(Links.sort_id == "lograce")).one()
+    assert row.original_url == "https://log.com/race"
+
+
+def test_link_log_find_waits_for_fsync(link_log):
+    """Test dedupe doesn't hand out a link before it is durable."""
+    with patch.object(link_log, "_sync"):
+        link_log.append("lognsyn", "https://log.com/unsynced")
+
+    assert link_log.get("lognsyn") == "https://log.com/unsynced"
+    assert link_log.find("https://log.com/unsynced") is None
+
+
+def test_link_log_replay_is_harmless(link_log, session):
+    """Test a segment drained twice does not duplicate or fail."""
+    link_log.append("logrpl1", "https://log.com/replay")
+    link_log.drain(session)
+    link_log.append("logrpl1", "https://log.com/replay")
+
+    assert link_log.drain(session) == 1
+    rows = session.exec(select(Links).where(Links.sort_id == "logrpl1")).all()
+    assert len(rows) == 1
+
+
+def test_link_log_failed_drain_keeps_segments(link_log, session):
+    """Test records stay in the log when the database is unavailable."""
+    link_log.append("logfai1", "https://log.com/failed")
+
+    with patch.object(
+        session, "connection", side_effect=OperationalError("down", {}, Exception())
+    ):
+        with pytest.raises(DbException):
+            link_log.drain(session)
+
+    assert link_log.get("logfai1") == "https://log.com/failed"
+    assert link_log.drain(session) == 1
+
+
+def test_link_log_requires_short_id_key(tmp_path, monkeypatch):
+    """Test the log refuses random short IDs it can't check for collisions."""
+    monkeypatch.setattr(short_id, "short_id_allocator", None)
+    log = LinkLog(str(tmp_path / "link-log"))
+    with pytest.raises(AppException):
+        log.open()
+    assert not log.enabled
+
+
+def test_link_log_workers_share_directory(link_log, session):
+    """Test workers get their own slots and see each other's undrained links."""
+    peer = LinkLog(link_log.directory)
+    peer.open()
+    try:
+        assert peer.slot_directory != link_log.slot_directory
+        link_log.append("logpeer", "https://log.com/peer")
+
+        assert peer.get("logpeer") is None
+        assert peer.lookup_peers(["logpeer", "lognone"]) == {
+            "logpeer": "https://log.com/peer"
+        }
+
+        # Drained meanwhile, the segment is gone and the row inserted
+        link_log.drain(session)
+        assert peer.lookup_peers(["logpeer"]) == {"logpeer": "https://log.com/peer"}
+        assert peer.lookup_peers(["logpeer"]) == {}
+    finally:
+        peer.close()
+
+
+def test_link_log_adopts_orphaned_slots(tmp_path, session):
+    """Test segments of a slot no worker holds are recovered by another."""
+    directory = str(tmp_path / "link-log")
+    first, second = LinkLog(directory), LinkLog(directory)
+    first.open()
+    second.open()
+    first.append("logorp1", "https://log.com/orphan-1")
+    second.append("logorp2", "https://log.com/orphan-2")
+    first.close()
+    second.close()
+
+    log = LinkLog(directory)
+    log.open()
+    try:
+        assert log.get("logorp1") == "https://log.com/orphan-1"
+        assert log.get("logorp2") == "https://log.com/orphan-2"
+        assert log.drain(session) == 2
+    finally:
+        log.close()
+    assert not [n for n in os.listdir(second.slot_directory) if n.endswith(".log")]
+
+
+def test_link_service_accepts_links_into_log(link_log, session):
+    """Test new links are accepted into the log and redirect before draining."""
+    service = LinkService(session=session)
+    with patch("app.services.link.link_log", link_log):
+        short_link = service.generate_new_link("https://log.com/service")
+        sort_id = short_link.split("/")[-1]
+
+        assert service.generate_new_link("https://log.com/service") == short_link
+        statement = select(Links).where(Links.sort_id == sort_id)
+        assert session.exec(statement).first() is None
+        assert service.get_original_link(sort_id) == "https://log.com/service"
+
+        link_log.drain(session)
+        assert service.get_original_link(sort_id) == "https://log.com/service"
+
+    link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+    assert link.clicks == 1
+
+
+def test_link_service_accepts_batches_into_log(link_log, session):
+    """Test batch creation goes through the log with a single fsync."""
+    service = LinkService(session=session)
+    with patch("app.services.link.link_log", link_log):
+        logged = service.generate_new_link("https://log.com/batch-0")
+        with patch("app.services.link_log.os.fsync") as fsync:
+            short_links = service.generate_new_links(
+                ["https://log.com/batch-0", "https://log.com/batch-1"] * 2
+            )
+
+        assert fsync.call_count == 1
+        assert short_links[0] == short_links[2] == logged
+        assert short_links[1] == short_links[3] != logged
+        service_link = short_links[1].split("/")[-1]
+        statement = select(Links).where(Links.sort_id == service_link)
+        assert session.exec(statement).first() is None
+        assert service.get_original_link(service_link) == "https://log.com/batch-1"
+
+        assert link_log.drain(session) == 2
+    assert session.exec(statement).one().original_url == "https://log.com/batch-1"
+
+
+def test_link_service_serves_peer_links(link_log, session):
+    """Test a link another worker accepted redirects before it is drained."""
+    peer = LinkLog(link_log.directory)
+    peer.open()
+    try:
+        peer.append("logsrv2", "https://log.com/other-worker")
+        service = LinkService(session=session)
+        with patch("app.services.link.link_log", link_log):
+            original_url = service.get_original_link("logsrv2")
+            assert original_url == "https://log.com/other-worker"
+            assert service.expand_links(["logsrv2"]) == {
+                "logsrv2": {"original_url": "https://log.com/other-worker"}
+            }
+    finally:
+        peer.close()
@@ -43,3 +43,118 @@ def test_get_original_link_not_found(session):
     service = LinkService(session=session)
     retrieved_url = service.get_original_link(sort_id="nonexist")
     assert retrieved_url == "http://localhost:9000/404"
+
+
+def test_lookup_original_url_served_from_cache(session):
+    """Test a second lookup is served from the cache."""
+    from app.services.link import link_cache
+
+    service = LinkService(session=session)
+    short_link = service.generate_new_link(original_link="https://cached.com")
+    sort_id = short_link.split("/")[-1]
+
+    assert service._lookup_original_url(sort_id) == "https://cached.com"
+    hits = link_cache.hits
+    assert service._lookup_original_url(sort_id) == "https://cached.com"
+    assert link_cache.hits == hits + 1
+    assert service._lookup_original_url("zzzzzzz") is None
+
+
+def test_cached_link_invalidated_on_update_and_delete(session):
+    """Test changing or deleting a link drops it from the cache."""
+    from app.services.link import link_cache
+
+    service = LinkService(session=session)
+    short_link = service.generate_new_link(original_link="https://before.com")
+    sort_id = short_link.split("/")[-1]
+    service._lookup_original_url(sort_id)
+
+    link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+    link.original_url = "https://after.com"
+    session.add(link)
+    session.commit()
+    assert link_cache.get(sort_id) is None
+    assert service._lookup_original_url(sort_id) == "https://after.com"
+
+    session.delete(link)
+    session.commit()
+    assert link_cache.get(sort_id) is None
+    assert service._lookup_original_url(sort_id) is None
+
+
+def test_generate_new_link_reuses_existing_url(session):
+    """Test a URL that was shortened before returns the same short link."""
+    from app.services.link import url_hash
+
+    service = LinkService(session=session)
+    original_url = "https://duplicate.com/campaign"
+    first = service.generate_new_link(original_link=original_url)
+    second = service.generate_new_link(original_link=original_url)
+
+    assert first == second
+    links = session.exec(
+        select(Links).where(Links.original_url == original_url)
+    ).all()
+    assert len(links) == 1
+    assert links[0].url_hash == url_hash(original_url)
+    assert len(links[0].url_hash) == 64
+
+
+def test_generate_new_link_ignores_hash_collisions(session):
+    """Test a row with the same hash but another URL is not reused."""
+    from app.services.link import url_hash
+
+    session.add(
+        Links(
+            original_url="https://other.com",
+            sort_id="hashcol",
+            url_hash=url_hash("https://collide.com"),
+        )
+    )
+    session.commit()
+
+    short_link = LinkService(session=session).generate_new_link("https://collide.com")
+    assert short_link.split("/")[-1] != "hashcol"
+
+
+def test_generate_new_links_batch(session):
+    """Test a batch reuses existing links and creates the rest at once."""
+    service = LinkService(session=session)
+    existing = service.generate_new_link("https://batch-existing.com")
+
+    short_links = service.generate_new_links(
+        ["https://batch-new.com", "https://batch-existing.com", "https://batch-new.com"]
+    )
+
+    assert short_links[1] == existing
+    assert short_links[0] == short_links[2]
+    sort_id = short_links[0].split("/")[-1]
+    link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+    assert link.original_url == "https://batch-new.com"
+
+
+def test_generate_new_links_retries_taken_ids(session, monkeypatch):
+    """Test rows that hit a taken sort_id get a new ID, the rest are kept."""
+    ids = iter(["batchA1", "batchA1", "batchB2"])
+    service = LinkService(session=session)
+    monkeypatch.setattr(service, "_next_sort_id", lambda: next(ids))
+
+    short_links = service.generate_new_links(
+        ["https://batch-retry.com/1", "https://batch-retry.com/2"]
+    )
+
+    assert [link.split("/")[-1] for link in short_links] == ["batchA1", "batchB2"]
+
+
+def test_link_service_expand_links(session):
+    """Test many short IDs are resolved at once without counting clicks."""
+    service = LinkService(session=session)
+    first = service.generate_new_link("https://expand-service.com/1").split("/")[-1]
+    second = service.generate_new_link("https://expand-service.com/2").split("/")[-1]
+
+    expanded = service.expand_links([first, second, "zzzzzzz", first])
+
+    assert set(expanded) == {first, second}
+    assert expanded[first]["original_url"] == "https://expand-service.com/1"
+    assert expanded[first]["clicks"] == 0
+    assert service.get_click_count(first) == 0
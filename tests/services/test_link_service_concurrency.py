@@ -0,0 +1,36 @@
+"""Concurrency tests for click counting on the redirect path."""
+
+from concurrent.futures import ThreadPoolExecutor
+from sqlmodel import Session, select
+from app.db.schema import Links
+from app.services.link import LinkService
+
+WORKERS = 8
+REDIRECTS_PER_WORKER = 25
+
+
+def test_parallel_redirects_do_not_lose_clicks(engine):
+    """Test parallel redirects of the same link count every click."""
+    with Session(engine) as session:
+        short_link = LinkService(session=session).generate_new_link(
+            "https://concurrent.com"
+        )
+    sort_id = short_link.split("/")[-1]
+
+    def redirect_many(_):
+        with Session(engine) as session:
+            service = LinkService(session=session)
+            return [
+                service.get_original_link(sort_id=sort_id)
+                for _ in range(REDIRECTS_PER_WORKER)
+            ]
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results = [url for urls in pool.map(redirect_many, range(WORKERS)) for url in urls]
+
+    assert results == ["https://concurrent.com"] * WORKERS * REDIRECTS_PER_WORKER
+
+    with Session(engine) as session:
+        link = session.exec(select(Links).where(Links.sort_id == sort_id)).one()
+        assert link.clicks == WORKERS * REDIRECTS_PER_WORKER
+        assert link.last_accessed_at is not None
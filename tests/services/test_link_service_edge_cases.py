@@ -75,16 +75,16 @@ def test_link_service_generate_new_link_database_error(session):
 
     with patch.object(session, "add", side_effect=IntegrityError("Insert failed")):
         with pytest.raises(DbException):
-            service.generate_new_link("https://example.com")
+            service.generate_new_link("https://example.com/insert-failed")
 
 
 def test_link_service_generate_new_link_exception(session):
     """Test generate_new_link handles general exceptions."""
     service = LinkService(session=session)
 
-    with patch.object(session, "refresh", side_effect=Exception("Refresh failed")):
+    with patch.object(service, "_next_sort_id", side_effect=Exception("ID failed")):
         with pytest.raises(AppException) as exc_info:
-            service.generate_new_link("https://example.com")
+            service.generate_new_link("https://example.com/id-failed")
         assert "Failed to generate a new link" in str(exc_info.value)
 
 
@@ -156,16 +156,27 @@ def test_link_service_get_original_link_database_error(session):
 
 
 def test_link_service_multiple_links_same_url(session):
-    """Test generating multiple links for same URL."""
+    """Test generating multiple links for same URL reuses the first one."""
     service = LinkService(session=session)
 
     link1 = service.generate_new_link("https://example.com")
     link2 = service.generate_new_link("https://example.com")
     link3 = service.generate_new_link("https://example.com")
 
+    assert link1 == link2 == link3
+
+
+def test_link_service_multiple_links_same_url_dedupe_disabled(session, monkeypatch):
+    """Test every create inserts a new link when deduplication is off."""
+    from app.core.config import config
+
+    monkeypatch.setattr(config, "link_dedupe_enabled", False)
+    service = LinkService(session=session)
+
+    link1 = service.generate_new_link("https://example.com/no-dedupe")
+    link2 = service.generate_new_link("https://example.com/no-dedupe")
+
     assert link1 != link2
-    assert link2 != link3
-    assert link1 != link3
 
 
 def test_link_service_click_count_increment(session):
@@ -174,7 +185,7 @@ def test_link_service_click_count_increment(session):
 
     service = LinkService(session=session)
 
-    short_link = service.generate_new_link("https://example.com")
+    short_link = service.generate_new_link("https://example.com/click-count")
     session.commit()
     sort_id = short_link.split("/")[-1]
 
@@ -0,0 +1,143 @@
+"""Tests for the rendered QR image cache."""
+
+import os
+from io import BytesIO
+from unittest.mock import patch
+from PIL import Image
+from qrcode import ERROR_CORRECT_L, QRCode
+from app.services.qr import (
+    QrGeneratorService,
+    QrImageCache,
+    QrStyle,
+    pack_modules,
+    qr_matrix_cache,
+    render_qr,
+    unpack_modules,
+)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def test_render_qr_png():
+    """Test a QR code is rendered as a 1-bit palette PNG in any colors."""
+    png = render_qr("https://qr.com/render", QrStyle(fill_color="#1e40af"))
+
+    assert png.startswith(PNG_SIGNATURE)
+    image = Image.open(BytesIO(png))
+    assert image.mode == "P"
+    assert image.getpalette()[:6] == [255, 255, 255, 0x1E, 0x40, 0xAF]
+    # IHDR bit depth
+    assert png[24] == 1
+
+
+def test_render_qr_png_matches_pil_drawing():
+    """Test the scaled matrix is pixel identical to qrcode's own drawing."""
+    png = render_qr("https://qr.com/pixels")
+    drawn = QrGeneratorService().generate_qr_image("https://qr.com/pixels")
+
+    rendered = Image.open(BytesIO(png)).convert("1")
+    assert rendered.tobytes() == drawn.get_image().convert("1").tobytes()
+
+
+def test_render_qr_svg():
+    """Test a QR code is rendered as one SVG path without PIL."""
+    with patch.dict("sys.modules", {"PIL": None, "PIL.Image": None}):
+        svg = render_qr(
+            "https://qr.com/svg", QrStyle(box_size=5, border=2), fmt="svg"
+        ).decode()
+
+    modules = len(QrGeneratorService(border=2).generate_matrix("https://qr.com/svg"))
+    assert svg.startswith("<svg")
+    assert f'width="{modules * 5}"' in svg
+    assert f'viewBox="0 0 {modules} {modules}"' in svg
+    assert svg.count("<path") == 1
+
+
+def test_qr_cache_renders_once():
+    """Test repeated requests for the same image are served from memory."""
+    cache = QrImageCache(max_bytes=1024 * 1024)
+    with patch("app.services.qr.render_qr", wraps=render_qr) as render:
+        first = cache.get("https://qr.com/once")
+        second = cache.get("https://qr.com/once")
+
+    assert first == second
+    assert render.call_count == 1
+    stats = cache.stats()
+    assert stats["renders"] == 1
+    assert stats["memory"]["hits"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_qr_cache_keys_by_style():
+    """Test the same data in another style is rendered separately."""
+    cache = QrImageCache(max_bytes=1024 * 1024)
+    plain = cache.get("https://qr.com/style")
+    large = cache.get("https://qr.com/style", QrStyle(box_size=20))
+    inverted = cache.get(
+        "https://qr.com/style", QrStyle(back_color="black", fill_color="white")
+    )
+
+    assert len({plain, large, inverted}) == 3
+    assert cache.stats()["renders"] == 3
+
+
+def test_qr_cache_disk_tier_survives_restart(tmp_path):
+    """Test images written to disk are served by a new cache without rendering."""
+    directory = str(tmp_path / "qr")
+    png = QrImageCache(max_bytes=1024 * 1024, directory=directory).get(
+        "https://qr.com/disk"
+    )
+
+    cache = QrImageCache(max_bytes=1024 * 1024, directory=directory)
+    with patch("app.services.qr.render_qr") as render:
+        assert cache.get("https://qr.com/disk") == png
+        assert cache.get("https://qr.com/disk") == png
+
+    render.assert_not_called()
+    assert cache.stats()["disk_hits"] == 1
+    assert cache.stats()["memory"]["hits"] == 1
+
+
+def test_qr_cache_unwritable_disk_tier_still_renders(tmp_path):
+    """Test a broken disk tier only falls back to rendering."""
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = QrImageCache(max_bytes=1024 * 1024, directory=str(blocker))
+
+    assert cache.get("https://qr.com/broken").startswith(PNG_SIGNATURE)
+    assert not os.path.isdir(str(blocker))
+
+
+def test_qr_cache_keys_by_format(tmp_path):
+    """Test each format is cached and stored on disk separately."""
+    cache = QrImageCache(max_bytes=1024 * 1024, directory=str(tmp_path / "qr"))
+    png = cache.get("https://qr.com/format")
+    svg = cache.get("https://qr.com/format", fmt="svg")
+
+    assert png.startswith(PNG_SIGNATURE)
+    assert svg.startswith(b"<svg")
+    names = [name for _, _, files in os.walk(tmp_path / "qr") for name in files]
+    assert sorted(name.rsplit(".", 1)[1] for name in names) == ["png", "svg"]
+
+
+def test_pack_modules_round_trip():
+    """Test packed matrices unpack to the same modules, rows padded to bytes."""
+    modules = QrGeneratorService(border=0).generate_matrix("https://qr.com/pack")
+    packed = pack_modules(modules)
+
+    assert packed[0] == len(modules) == 29
+    assert len(packed) == 1 + 29 * 4
+    assert unpack_modules(packed) == modules
+
+
+def test_qr_matrix_is_shared_by_styles():
+    """Test other sizes and colors of an image reuse the cached matrix."""
+    qr_matrix_cache.clear()
+    with patch("qrcode.QRCode.make", autospec=True, side_effect=QRCode.make) as make:
+        render_qr("https://qr.com/matrix")
+        render_qr("https://qr.com/matrix", QrStyle(box_size=3, fill_color="red"))
+        render_qr("https://qr.com/matrix", QrStyle(border=0), fmt="svg")
+        render_qr("https://qr.com/matrix", QrStyle(error_correction=ERROR_CORRECT_L))
+
+    assert make.call_count == 2
+    assert qr_matrix_cache.stats()["hits"] == 2
@@ -0,0 +1,81 @@
+"""Tests for the QR render pool."""
+
+import asyncio
+import threading
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+from app.services.qr import QrImageCache, QrStyle, render_qr
+from app.services.qr_pool import QrRenderPool, get_qr, get_qr_many
+
+
+def _block(started: threading.Event, release: threading.Event) -> str:
+    started.set()
+    release.wait(5)
+    return "done"
+
+
+@pytest.mark.asyncio
+async def test_qr_pool_runs_in_threadpool():
+    """Test jobs run in the threadpool when no worker processes are set."""
+    pool = QrRenderPool(workers=0, max_pending=4)
+
+    image = await pool.run(render_qr, "https://qrpool.com/thread")
+
+    assert image == render_qr("https://qrpool.com/thread")
+    assert pool.stats()["pending"] == 0
+    assert pool.stats()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_qr_pool_rejects_when_saturated():
+    """Test jobs over the queue depth fail fast with a 503."""
+    pool = QrRenderPool(workers=0, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+    running = asyncio.create_task(pool.run(_block, started, release))
+    await asyncio.to_thread(started.wait, 5)
+
+    assert pool.saturated
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(render_qr, "https://qrpool.com/rejected")
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers["Retry-After"] == "1"
+
+    release.set()
+    assert await running == "done"
+    assert not pool.saturated
+    assert pool.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_qr_pool_renders_in_worker_processes():
+    """Test images rendered by worker processes match local renders."""
+    pool = QrRenderPool(workers=1, max_pending=4)
+    pool.start()
+    try:
+        image = await pool.run(render_qr, "https://qrpool.com/process", QrStyle(), "svg")
+        assert pool.stats()["workers"] == 1
+    finally:
+        pool.shutdown()
+
+    assert image == render_qr("https://qrpool.com/process", fmt="svg")
+    assert pool.stats()["workers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_qr_many_renders_misses_in_one_job():
+    """Test cached images are reused and the misses are rendered together."""
+    cache = QrImageCache(max_bytes=1024 * 1024)
+    pool = QrRenderPool(workers=0, max_pending=4)
+    data = ["https://qrpool.com/a", "https://qrpool.com/b", "https://qrpool.com/c"]
+
+    with patch("app.services.qr_pool.qr_image_cache", cache), patch(
+        "app.services.qr_pool.qr_render_pool", pool
+    ):
+        first = await get_qr(data[1])
+        images = await get_qr_many(data)
+
+    assert images[1] == first
+    assert images == [render_qr(value) for value in data]
+    assert pool.stats()["completed"] == 2
+    assert cache.stats()["renders"] == 3
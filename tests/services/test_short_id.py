@@ -0,0 +1,104 @@
+"""Tests for the block-allocated short ID generator."""
+
+import pytest
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.exception import AppException
+from app.db.schema import IdBlocks, Links
+from app.services import short_id
+from app.services.link import AsyncLinkService, LinkService
+from app.services.short_id import (
+    ALPHABET,
+    FeistelPermutation,
+    ShortIdAllocator,
+    encode_base62,
+)
+
+
+def test_feistel_permutation_is_a_bijection():
+    """Test every value in the domain maps to a distinct value in the domain."""
+    permutation = FeistelPermutation(b"secret", domain=1000)
+    assert sorted(permutation.permute(i) for i in range(1000)) == list(range(1000))
+
+
+def test_feistel_permutation_depends_on_key():
+    """Test different keys give different permutations."""
+    first = FeistelPermutation(b"one", domain=62**7)
+    second = FeistelPermutation(b"two", domain=62**7)
+    assert [first.permute(i) for i in range(5)] != [second.permute(i) for i in range(5)]
+
+
+def test_encode_base62():
+    """Test values are encoded with a fixed length."""
+    assert encode_base62(0, 7) == ALPHABET[0] * 7
+    assert encode_base62(62**7 - 1, 7) == ALPHABET[-1] * 7
+    assert len({encode_base62(i, 3) for i in range(62**2)}) == 62**2
+
+
+def test_allocator_rejects_exhausted_space():
+    """Test counter values past the ID space raise."""
+    allocator = ShortIdAllocator("key", length=2)
+    with pytest.raises(AppException):
+        allocator.encode(62**2)
+
+
+def test_allocators_share_counter_without_collisions(engine, session):
+    """Test two workers reserving blocks from one counter never collide."""
+    first = ShortIdAllocator("test-workers", block_size=50, name="test-workers")
+    second = ShortIdAllocator("test-workers", block_size=50, name="test-workers")
+
+    ids = [allocator.next_id(engine) for _ in range(120) for allocator in (first, second)]
+
+    assert len(set(ids)) == 240
+    assert all(len(sort_id) == 7 and set(sort_id) <= set(ALPHABET) for sort_id in ids)
+    counter = session.get(IdBlocks, "test-workers")
+    # Each allocator reserved three blocks of 50
+    assert counter.next_value == 300
+
+
+@pytest.mark.asyncio
+async def test_allocator_async_reserves_blocks(async_engine):
+    """Test the async variant reserves from the same counter."""
+    allocator = ShortIdAllocator("test-async", block_size=10, name="test-async")
+    ids = [await allocator.next_id_async(async_engine) for _ in range(25)]
+    assert len(set(ids)) == 25
+
+
+def test_link_service_uses_allocator(session, monkeypatch):
+    """Test new links take their IDs from the allocator when configured."""
+    allocator = ShortIdAllocator("test-service", block_size=10, name="test-service")
+    monkeypatch.setattr(short_id, "short_id_allocator", allocator)
+    expected = ShortIdAllocator("test-service", name="test-service").encode(0)
+
+    short_link = LinkService(session=session).generate_new_link("https://alloc.com")
+    assert short_link.split("/")[-1] == expected
+
+
+def test_link_service_retries_taken_ids(session, monkeypatch):
+    """Test an allocated ID taken by an older random link is skipped."""
+    allocator = ShortIdAllocator("test-retry", block_size=10, name="test-retry")
+    monkeypatch.setattr(short_id, "short_id_allocator", allocator)
+    taken = allocator.encode(0)
+    session.add(Links(original_url="https://legacy.com", sort_id=taken))
+    session.commit()
+
+    short_link = LinkService(session=session).generate_new_link("https://new.com")
+
+    assert short_link.split("/")[-1] == allocator.encode(1)
+    legacy = session.exec(select(Links).where(Links.sort_id == taken)).one()
+    assert legacy.original_url == "https://legacy.com"
+
+
+@pytest.mark.asyncio
+async def test_async_link_service_uses_allocator(async_engine, monkeypatch):
+    """Test the async service allocates IDs without blocking the loop."""
+    allocator = ShortIdAllocator(
+        "test-async-service", block_size=10, name="test-async-service"
+    )
+    monkeypatch.setattr(short_id, "short_id_allocator", allocator)
+
+    async with AsyncSession(async_engine) as async_session:
+        service = AsyncLinkService(session=async_session)
+        short_link = await service.generate_new_link("https://async-alloc.com")
+
+    assert short_link.split("/")[-1] == allocator.encode(0)
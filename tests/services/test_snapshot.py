@@ -0,0 +1,122 @@
+"""Tests for the memory-mapped redirect snapshot."""
+
+import pytest
+from datetime import datetime, timezone
+from sqlmodel import select
+from app.core.config import config
+from app.core.exception import AppException
+from app.db.schema import Links
+from app.services.link import LinkService
+from app.services.snapshot import (
+    RedirectSnapshot,
+    SnapshotReader,
+    build_snapshot,
+    write_snapshot,
+)
+
+
+def test_write_and_read_snapshot(tmp_path):
+    """Test every written mapping can be looked up again."""
+    path = str(tmp_path / "links.snap")
+    links = {f"id{i:05d}": f"https://example.com/{i}" for i in range(500)}
+    write_snapshot(path, links, watermark=None)
+
+    reader = SnapshotReader(path)
+    assert reader.entry_count == 500
+    assert all(reader.get(key) == url for key, url in links.items())
+    assert reader.get("missing") is None
+    assert dict(reader.items()) == links
+
+
+def test_snapshot_rejects_invalid_file(tmp_path):
+    """Test a file without the snapshot header is rejected."""
+    path = tmp_path / "broken.snap"
+    path.write_bytes(b"not a snapshot at all, definitely not")
+
+    with pytest.raises(AppException):
+        SnapshotReader(str(path))
+
+
+def test_build_snapshot_full_and_delta(session, tmp_path):
+    """Test a delta build keeps old links and adds new ones."""
+    path = str(tmp_path / "links.snap")
+    service = LinkService(session=session)
+    first = service.generate_new_link("https://snap-one.com").split("/")[-1]
+
+    total = build_snapshot(session, path, full=True)
+    assert total == len(session.exec(select(Links.id)).all())
+    assert SnapshotReader(path).get(first) == "https://snap-one.com"
+
+    second = service.generate_new_link("https://snap-two.com").split("/")[-1]
+    build_snapshot(session, path)
+
+    reader = SnapshotReader(path)
+    assert reader.get(first) == "https://snap-one.com"
+    assert reader.get(second) == "https://snap-two.com"
+
+
+def test_build_snapshot_delta_follows_inserted_at(session, tmp_path):
+    """Test a delta build picks up links with a back-dated created_at."""
+    path = str(tmp_path / "links.snap")
+    build_snapshot(session, path, full=True)
+
+    session.add(
+        Links(
+            original_url="https://snap-imported.com",
+            sort_id="snpold1",
+            created_at=datetime(2015, 1, 1, tzinfo=timezone.utc),
+        )
+    )
+    session.commit()
+    build_snapshot(session, path)
+
+    assert SnapshotReader(path).get("snpold1") == "https://snap-imported.com"
+
+
+def test_build_snapshot_delta_drops_deleted_links(session, tmp_path):
+    """Test a delta build rebuilds the snapshot once links were deleted."""
+    path = str(tmp_path / "links.snap")
+    service = LinkService(session=session)
+    gone = service.generate_new_link("https://snap-gone.com").split("/")[-1]
+    build_snapshot(session, path, full=True)
+
+    session.delete(session.exec(select(Links).where(Links.sort_id == gone)).one())
+    session.commit()
+    total = build_snapshot(session, path)
+
+    assert total == len(session.exec(select(Links.id)).all())
+    assert SnapshotReader(path).get(gone) is None
+
+
+def test_redirect_snapshot_reloads_new_file(tmp_path):
+    """Test a newly published snapshot replaces the open one."""
+    path = str(tmp_path / "links.snap")
+    snapshot = RedirectSnapshot(path)
+    snapshot.reload()
+    assert snapshot.get("abc1234") is None
+
+    write_snapshot(path, {"abc1234": "https://old.com"}, watermark=None)
+    snapshot.reload()
+    assert snapshot.get("abc1234") == "https://old.com"
+
+    write_snapshot(path, {"abc1234": "https://new.com"}, watermark=None)
+    snapshot.reload()
+    assert snapshot.get("abc1234") == "https://new.com"
+
+
+def test_lookup_uses_snapshot_before_database(session, tmp_path, monkeypatch):
+    """Test batched redirects resolve from the snapshot without a query."""
+    from unittest.mock import patch
+    from app.services import link as link_module
+
+    path = str(tmp_path / "links.snap")
+    write_snapshot(path, {"snp1234": "https://from-snapshot.com"}, watermark=None)
+    snapshot = RedirectSnapshot(path)
+    snapshot.reload()
+    monkeypatch.setattr(link_module, "redirect_snapshot", snapshot)
+    monkeypatch.setattr(config, "click_write_mode", "batched")
+
+    service = LinkService(session=session)
+    with patch.object(session, "exec") as mock_exec:
+        assert service.get_original_link("snp1234") == "https://from-snapshot.com"
+        mock_exec.assert_not_called()
@@ -220,3 +220,30 @@ def test_database_session_context_manager():
         assert session is not None
         assert hasattr(session, "add")
         assert hasattr(session, "commit")
+
+
+def test_to_async_url_maps_drivers():
+    """Test sync URLs are mapped to their async drivers."""
+    from app.db.init import to_async_url
+
+    assert to_async_url("postgresql://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+    assert (
+        to_async_url("postgresql+psycopg2://u:p@host/db")
+        == "postgresql+asyncpg://u:p@host/db"
+    )
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+
+def test_async_database_session_yields_async_session():
+    """Test AsyncDatabase.session yields an AsyncSession."""
+    import asyncio
+    from sqlmodel.ext.asyncio.session import AsyncSession
+    from app.db.init import AsyncDatabase
+
+    async def get_one():
+        db = AsyncDatabase(url="sqlite:////tmp/shorty_async_test.db")
+        async for session in db.session():
+            assert isinstance(session, AsyncSession)
+        await db.engine.dispose()
+
+    asyncio.run(get_one())
@@ -119,10 +119,10 @@ def test_db_exception_handler_via_api(client, session):
 
 def test_app_exception_handler_via_redirect(client):
     """Test AppException handler through redirect endpoint."""
-    # Mock LinkService to raise AppException
-    from app.services.link import LinkService
+    # Mock AsyncLinkService to raise AppException
+    from app.services.link import AsyncLinkService
 
-    with patch.object(LinkService, "get_original_link") as mock_get:
+    with patch.object(AsyncLinkService, "get_original_link") as mock_get:
         mock_get.side_effect = AppException("Failed to find link")
 
         response = client.get("/1234567", follow_redirects=False)
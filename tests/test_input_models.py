@@ -1,6 +1,8 @@
 """Tests for input model validation."""
 
+import socket
 import pytest
+from unittest.mock import patch
 from pydantic import ValidationError
 from app.models.input import SortIDInput, OriginalUrlInput
 from urllib.parse import urlparse
@@ -230,12 +232,12 @@ def test_original_url_localhost_validator():
 
 
 def test_original_url_private_ip_validator():
-    """Test OriginalUrlInput validator blocks private IPs."""
-    # This test may not work if DNS resolution fails, but we can test the logic
-    with patch("socket.gethostbyname", return_value="192.168.1.1"):
-        with pytest.raises(ValidationError) as exc_info:
-            OriginalUrlInput(link="http://private.example.com")
-        assert "private" in str(exc_info.value).lower()
+    """Test OriginalUrlInput validator leaves resolving hostnames to callers."""
+    addresses = [(2, 1, 6, "", ("192.168.1.1", 0))]
+    with patch("socket.getaddrinfo", return_value=addresses) as lookup:
+        url = OriginalUrlInput(link="http://private.example.com")
+        lookup.assert_not_called()
+    assert url.host == "private.example.com"
 
 
 def test_original_url_length_validator():
@@ -248,7 +250,7 @@ def test_original_url_length_validator():
 
 def test_original_url_dns_failure_handling():
     """Test OriginalUrlInput validator handles DNS resolution failures."""
-    with patch("socket.gethostbyname", side_effect=socket.gaierror("DNS failure")):
+    with patch("socket.getaddrinfo", side_effect=socket.gaierror("DNS failure")):
         # Should not raise validation error due to DNS failure
         input_data = OriginalUrlInput(link="https://nonexistent-domain-12345.com")
         assert input_data is not None
@@ -39,6 +39,32 @@ def test_redirect_not_found(client):
     assert response.headers["location"] == f"{config.site_url}/404"
 
 
+def test_redirect_default_has_no_cache_headers(client):
+    """Test redirects carry no Cache-Control unless a lifetime is configured."""
+    response = client.get("/1234567", follow_redirects=False)
+    assert "cache-control" not in response.headers
+
+
+def test_redirect_cdn_mode(client, session, monkeypatch):
+    """Test the configured status and cache lifetimes are sent for hits."""
+    from app.core.config import config
+    from app.services.link import LinkService
+
+    monkeypatch.setattr(config, "redirect_status_code", "302")
+    monkeypatch.setattr(config, "redirect_max_age", 60)
+    monkeypatch.setattr(config, "redirect_s_maxage", 3600)
+    short_link = LinkService(session=session).generate_new_link("https://cdn.com")
+
+    response = client.get(f"/{short_link.split('/')[-1]}", follow_redirects=False)
+    assert response.status_code == 302
+    assert response.headers["location"] == "https://cdn.com"
+    assert response.headers["cache-control"] == "public, max-age=60, s-maxage=3600"
+
+    response = client.get("/1234567", follow_redirects=False)
+    assert response.status_code == 302
+    assert response.headers["cache-control"] == "no-store"
+
+
 def test_robots_txt(client):
     """Test robots.txt endpoint returns proper content."""
     response = client.get("/robots.txt")
@@ -0,0 +1,105 @@
+"""Tests for the raw ASGI redirect fast path."""
+
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.exception import AppException
+from app.main import app
+from app.services.link import AsyncLinkService, LinkService
+from app.web.fast_redirect import FastRedirectMiddleware, location_headers
+
+
+@pytest.fixture
+def fast_client(client, async_engine):
+    """TestClient for the app wrapped in the fast redirect handler."""
+    fast_app = FastRedirectMiddleware(
+        app, session_factory=lambda: AsyncSession(async_engine)
+    )
+    with TestClient(fast_app, raise_server_exceptions=False) as fast_client:
+        yield fast_client
+
+
+def test_fast_redirect_matches_route_for_hits(client, fast_client, session):
+    """Test a hit returns the same status and headers as the route."""
+    short_link = LinkService(session=session).generate_new_link(
+        "https://fast.com/a path?q=ü"
+    )
+    sort_id = short_link.split("/")[-1]
+
+    expected = client.get(f"/{sort_id}", follow_redirects=False)
+    response = fast_client.get(f"/{sort_id}", follow_redirects=False)
+
+    assert response.status_code == expected.status_code == 301
+    assert response.headers["location"] == expected.headers["location"]
+    assert response.headers["content-length"] == "0"
+
+
+def test_fast_redirect_matches_route_in_cdn_mode(
+    client, fast_client, session, monkeypatch
+):
+    """Test the configured status and Cache-Control match the route."""
+    from app.core.config import config
+
+    monkeypatch.setattr(config, "redirect_status_code", "307")
+    monkeypatch.setattr(config, "redirect_s_maxage", 600)
+    short_link = LinkService(session=session).generate_new_link("https://edge.com")
+    sort_id = short_link.split("/")[-1]
+
+    expected = client.get(f"/{sort_id}", follow_redirects=False)
+    response = fast_client.get(f"/{sort_id}", follow_redirects=False)
+
+    assert response.status_code == expected.status_code == 307
+    assert response.headers["cache-control"] == expected.headers["cache-control"]
+    assert response.headers["cache-control"] == "public, s-maxage=600"
+
+
+def test_fast_redirect_matches_route_for_misses(client, fast_client):
+    """Test an unknown ID redirects to the 404 page like the route."""
+    expected = client.get("/zz99zz9", follow_redirects=False)
+    response = fast_client.get("/zz99zz9", follow_redirects=False)
+
+    assert response.status_code == expected.status_code
+    assert response.headers["location"] == expected.headers["location"]
+
+
+def test_fast_redirect_passes_invalid_ids_through(fast_client):
+    """Test malformed IDs and static routes are left to the app."""
+    with patch.object(AsyncLinkService, "get_original_link") as mock_get:
+        fast_client.get("/abc", follow_redirects=False)
+        fast_client.get("/abcdefgh", follow_redirects=False)
+        assert fast_client.get("/robots.txt").status_code == 200
+        mock_get.assert_not_called()
+
+
+def test_fast_redirect_head_matches_route(client, fast_client, session):
+    """Test HEAD is left to the app and does not count a click."""
+    short_link = LinkService(session=session).generate_new_link("https://head.com")
+    sort_id = short_link.split("/")[-1]
+
+    with patch.object(AsyncLinkService, "get_original_link") as mock_get:
+        response = fast_client.head(f"/{sort_id}", follow_redirects=False)
+        mock_get.assert_not_called()
+
+    expected = client.head(f"/{sort_id}", follow_redirects=False)
+    assert response.status_code == expected.status_code == 405
+
+
+def test_fast_redirect_app_exception(fast_client):
+    """Test service failures produce the application error response."""
+    with patch.object(AsyncLinkService, "get_original_link") as mock_get:
+        mock_get.side_effect = AppException("Failed to find link")
+        response = fast_client.get("/1234567", follow_redirects=False)
+
+    assert response.status_code == 500
+    assert response.json()["error_type"] == "application_error"
+
+
+def test_location_headers_quotes_like_redirect_response():
+    """Test the prebuilt Location header is quoted like RedirectResponse."""
+    from fastapi.responses import RedirectResponse
+
+    url = "https://example.com/a b?x=1&y=ä#frag"
+    expected = RedirectResponse(url=url, status_code=301).raw_headers
+
+    assert location_headers(url) == expected